@@ -40,11 +40,12 @@ class DataTableCustom(ft.Container):
         # Crear columnas del DataTable
         columns = [ft.DataColumn(ft.Text(col)) for col in self.df.columns]
 
-        # Crear filas del DataTable
-        rows = []
-        for i in range(len(self.df)):
-            cells = [ft.DataCell(ft.Text(str(self.df.iloc[i][col]))) for col in self.df.columns]
-            rows.append(ft.DataRow(cells=cells))
+        # Crear filas del DataTable: los textos se calculan por columnas y no celda a celda
+        texts = [self._column_texts(self.df[col]) for col in self.df.columns]
+        rows = [
+            ft.DataRow(cells=[ft.DataCell(ft.Text(text)) for text in row_texts])
+            for row_texts in zip(*texts)
+        ]
 
         # Crear el DataTable
         data_table = ft.DataTable(
@@ -77,6 +78,25 @@ class DataTableCustom(ft.Container):
             spacing=10
         )
 
+    @staticmethod
+    def _column_texts(series: pd.Series) -> list:
+        """
+        Retorna el texto de cada celda de una columna. Las columnas de Arrow de
+        texto y enteros se convierten a texto en Arrow, sin pasar por objetos de
+        Python valor a valor; el resto usa la representación de Pandas.
+        """
+        if isinstance(series.dtype, pd.ArrowDtype):
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            arrow_type = series.dtype.pyarrow_dtype
+            if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type) \
+                    or pa.types.is_integer(arrow_type):
+                texts = pc.cast(pa.array(series.array), pa.string())
+                return pc.fill_null(texts, str(pd.NA)).to_pylist()
+            # Los nulos de Arrow se muestran como <NA>, igual que al leerlos celda a celda
+            return series.astype(str).mask(series.isna(), str(pd.NA)).tolist()
+        return series.astype(str).tolist()
+
     def update_dataframe(self, new_df: pd.DataFrame, new_title: Optional[str] = None):
         """
         Actualiza el DataFrame y el título mostrado por el control.
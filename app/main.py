@@ -1,4 +1,5 @@
 import flet as ft
+import shutil
 import sys
 import os
 
@@ -24,6 +25,12 @@ from core.data_analyzer import DataAnalyzer
 from core.query_engine import QueryEngine
 from core.plot_generator import PlotGenerator
 from core.file_processor import FileProcessor
+from core.parquet_cache import ParquetCache
+from core.result_cache import QueryResultCache
+from core.query_history import QueryHistory
+
+# Directorio con los volcados a disco de DuckDB, uno por sesión
+DUCKDB_TEMP_ROOT = os.path.join(os.path.expanduser("~"), ".analizador_datos", "duckdb_tmp")
 
 from constants import (
     VIEW_HOME,
@@ -39,23 +46,76 @@ from constants import (
 class AppState:
     """
     Una clase simple para manejar el estado compartido de la aplicación.
-    Almacena el DataFrame cargado y el nombre del archivo.
+    Almacena el DataFrame (o el LazyDataset de DuckDB) cargado y el nombre del archivo.
+    Si se indica un QueryEngine, los datos se registran en él al cargarse como
+    'my_table' y se añaden a su catálogo con el nombre del archivo, para poder
+    cruzarlos con otros archivos cargados antes.
     """
-    def __init__(self):
+    def __init__(self, query_engine=None):
+        self.query_engine = query_engine  # Motor SQL de la sesión (registra el DataFrame cargado)
         self.df = None  # Aquí se almacenará el DataFrame de Pandas
+        self.dataset = None  # LazyDataset de DuckDB cuando se usa la carga diferida
         self.loaded_file_name = None  # Para almacenar el nombre del archivo cargado
+        self.preview_head = None  # Primeras filas del archivo cuando df es una muestra
         self.current_theme = ft.ThemeMode.LIGHT  # Tema actual
 
-    def load_dataframe(self, dataframe, file_name=None):
-        """Carga el DataFrame y el nombre del archivo en el estado."""
+    def load_dataframe(self, dataframe, file_name=None, preview_head=None):
+        """
+        Carga el DataFrame y el nombre del archivo en el estado. Si el DataFrame es
+        una muestra de vista previa, preview_head son las primeras filas del archivo.
+        """
+        self._close_dataset()
         self.df = dataframe
+        self.preview_head = preview_head
         self.loaded_file_name = file_name
+        if self.query_engine is not None and dataframe is not None:
+            self.query_engine.register_dataframe(dataframe, source=file_name)
+            # Las muestras de vista previa no van al catálogo: un JOIN sobre ellas sería engañoso
+            if file_name and preview_head is None:
+                self.query_engine.add_table(dataframe, source=file_name)
+            # Las tablas derivadas con actualización automática se recalculan con los datos nuevos
+            self.query_engine.refresh_stale_tables()
         print(f"AppState: DataFrame cargado desde {file_name if file_name else 'memoria'}")
 
+    def load_dataset(self, dataset, file_name=None):
+        """Carga un LazyDataset de DuckDB (sin materializar) y el nombre del archivo."""
+        self._close_dataset()
+        self.df = None
+        self.preview_head = None
+        self.dataset = dataset
+        if self.query_engine is not None:
+            self.query_engine.register_dataset(dataset)
+            self.query_engine.add_table(dataset, source=file_name)
+            self.query_engine.refresh_stale_tables()
+        self.loaded_file_name = file_name
+        print(f"AppState: Dataset diferido abierto desde {file_name if file_name else 'memoria'}")
+
+    def _close_dataset(self):
+        """Libera el LazyDataset anterior, si lo hay."""
+        if self.dataset is not None:
+            self.dataset.close()
+            self.dataset = None
+
     def get_dataframe(self):
         """Retorna el DataFrame cargado."""
         return self.df
 
+    def get_dataset(self):
+        """Retorna el LazyDataset cargado (None si los datos están en Pandas)."""
+        return self.dataset
+
+    def is_preview(self):
+        """Indica si el DataFrame cargado es una muestra de vista previa."""
+        return self.df is not None and "sample_info" in self.df.attrs
+
+    def get_data(self):
+        """Retorna los datos cargados: el LazyDataset si existe, si no el DataFrame."""
+        return self.dataset if self.dataset is not None else self.df
+
+    def has_data(self):
+        """Indica si hay datos cargados, en Pandas o en DuckDB."""
+        return self.df is not None or self.dataset is not None
+
     def get_loaded_file_name(self):
         """Retorna el nombre del archivo cargado."""
         return self.loaded_file_name
@@ -75,16 +135,37 @@ def main(page: ft.Page):
     page.theme_mode = ft.ThemeMode.LIGHT
     page.padding = ft.padding.only(left=10)
 
-    # Estado de la aplicación
-    app_state = AppState()
+    # Base de datos persistente de DuckDB (opcional), compartida por el cargador y el motor SQL:
+    # guarda los datasets importados y los resultados entre sesiones. Sin ella, todo vive en memoria.
+    database_path = os.environ.get("ANALIZADOR_DUCKDB")
+    if database_path:
+        database_path = os.path.expanduser(database_path)
+        os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
 
     # Instancias de las clases de la capa core
-    data_loader = DataLoader()
+    data_loader = DataLoader(cache=ParquetCache(), database=database_path)
     data_analyzer = DataAnalyzer()
-    query_engine = QueryEngine()
+    # Conexión de DuckDB persistente para toda la sesión, con caché de resultados.
+    # Cada sesión usa como mucho la mitad de los núcleos y una memoria acotada (lo que
+    # no cabe se vuelca a disco), y las consultas se detienen a los 2 minutos, para que
+    # una consulta costosa no deje sin recursos al resto de sesiones del servidor.
+    query_engine = QueryEngine(
+        database=database_path or ':memory:',
+        result_cache=QueryResultCache(),
+        threads=max(1, (os.cpu_count() or 2) // 2),
+        memory_limit="2GB",
+        temp_directory=os.path.join(DUCKDB_TEMP_ROOT, page.session_id),
+        query_timeout_seconds=120,
+        history=QueryHistory(),
+    )
+    # Al cerrarse la sesión se cierra su conexión y se borra su directorio temporal
+    page.on_close = lambda _: query_engine.close()
     plot_generator = PlotGenerator()
     file_processor = FileProcessor()
 
+    # Estado de la aplicación (registra cada DataFrame cargado en el motor SQL)
+    app_state = AppState(query_engine=query_engine)
+
     # Referencia al NavigationRail
     navigation_rail_ref = ft.Ref[ft.NavigationRail]()
 
@@ -113,7 +194,7 @@ def main(page: ft.Page):
     # Instancias de las vistas, pasando app_state y las clases de core/
     # Es crucial pasar las instancias de core a las vistas que las usarán
     home_page = HomePage(page, app_state)
-    file_upload_page = FileUploadPage(page, app_state, data_loader=data_loader)
+    file_upload_page = FileUploadPage(page, app_state, data_loader=data_loader, data_analyzer=data_analyzer)
     data_display_page = DataDisplayPage(page, app_state, data_analyzer=data_analyzer, plot_generator=plot_generator)
     query_page = QueryPage(page, app_state, query_engine=query_engine)
     library_page = LibraryPage(page, app_state)
@@ -240,5 +321,7 @@ def main(page: ft.Page):
 
 
 if __name__ == "__main__":
+    # Volcados de sesiones anteriores que no se cerraron (p. ej. si se detuvo el servidor)
+    shutil.rmtree(DUCKDB_TEMP_ROOT, ignore_errors=True)
     #ft.app(target=main, assets_dir="assets")    # Para ejecutar en modo desktop
     ft.app(target=main, assets_dir="assets", view=ft.AppView.WEB_BROWSER)     # Para ejecutar en modo web
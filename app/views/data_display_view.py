@@ -2,6 +2,7 @@ import flet as ft
 import pandas as pd
 from core.data_analyzer import DataAnalyzer
 from core.plot_generator import PlotGenerator
+from core.lazy_dataset import LazyDataset
 from app.controls.data_table_custom import DataTableCustom
 from app.controls.plot_container import PlotContainer
 
@@ -21,6 +22,8 @@ class DataDisplayPage(ft.Container): # Hereda de ft.Container
         self.data_table_preview = DataTableCustom(title="Vista Previa de Datos")
         self.histogram_plot_container = PlotContainer(title="Histograma (Ejemplo)")
         self.scatterplot_plot_container = PlotContainer(title="Diagrama de Dispersión (Ejemplo)")
+        # Método de la matriz de correlación de "Análisis Avanzado"
+        self.correlation_method = 'pearson'
 
         self.tabs_content_area = ft.Container(expand=True, ref=ft.Ref())
         self.analysis_tabs = ft.Tabs( # Hacerlo una propiedad de la instancia
@@ -37,7 +40,7 @@ class DataDisplayPage(ft.Container): # Hereda de ft.Container
 
     def _build_content(self): # Renombrado de build a _build_content
         """Construye la interfaz de la vista."""
-        df = self.app_state.get_dataframe()
+        df = self.app_state.get_data() # DataFrame o LazyDataset de DuckDB
 
         if df is None:
             return ft.Column(
@@ -51,7 +54,7 @@ class DataDisplayPage(ft.Container): # Hereda de ft.Container
             )
 
         # --- Contenido para la pestaña "Vista Previa Datos" ---
-        self.data_table_preview.update_dataframe(df.head(10), "Primeras 10 Filas del Dataset")
+        self.data_table_preview.update_dataframe(*self._preview_table_input(df))
         tab_content_preview = ft.Column(
             [
                 self.data_table_preview
@@ -62,12 +65,77 @@ class DataDisplayPage(ft.Container): # Hereda de ft.Container
         )
 
         # --- Contenido para la pestaña "Análisis Básico" ---
+        tab_content_basic_analysis = self._basic_analysis_content(df)
+
+        # --- Contenido para la pestaña "Análisis Avanzado" (con ejemplos de gráficos) ---
+        plot_elements = []
+        # Solo se traen a Pandas las columnas que usan los gráficos
+        plot_df = self._plot_input(df, ['Edad', 'Ingresos'])
+        # Asegúrate de que las columnas existan y sean del tipo correcto antes de generar
+        if 'Edad' in plot_df.columns and pd.api.types.is_numeric_dtype(plot_df['Edad']):
+            hist_base64 = self.plot_generator.generate_histogram(plot_df, 'Edad', title='Distribución de Edades')
+            if hist_base64:
+                self.histogram_plot_container.update_plot(hist_base64, "Histograma de Edades")
+                plot_elements.append(self.histogram_plot_container)
+        else:
+            plot_elements.append(ft.Text("No se pudo generar histograma de 'Edad' (columna no encontrada o no numérica)."))
+
+        if 'Edad' in plot_df.columns and 'Ingresos' in plot_df.columns and \
+           pd.api.types.is_numeric_dtype(plot_df['Edad']) and pd.api.types.is_numeric_dtype(plot_df['Ingresos']):
+            scatter_base64 = self.plot_generator.generate_scatterplot(plot_df, 'Edad', 'Ingresos', title='Edad vs Ingresos')
+            if scatter_base64:
+                self.scatterplot_plot_container.update_plot(scatter_base64, "Dispersión de Edad vs Ingresos")
+                plot_elements.append(self.scatterplot_plot_container)
+        else:
+            plot_elements.append(ft.Text("No se pudo generar diagrama de dispersión de 'Edad' vs 'Ingresos' (columnas no encontradas o no numéricas)."))
+
+        tab_content_advanced_analysis = ft.Column(
+            [
+                ft.Text("Análisis Avanzado y Visualizaciones:", weight=ft.FontWeight.BOLD),
+                ft.Text("Aquí se mostrarán gráficos y análisis más complejos."),
+                ft.Divider(),
+                *plot_elements,
+            ],
+            spacing=10,
+            expand=True,
+            scroll=ft.ScrollMode.ADAPTIVE
+        )
+
+        # Establece el contenido inicial del área de pestañas
+        # Esto se hará en _handle_tab_change o al cargar la vista por primera vez
+        # self.tabs_content_area.content = tab_content_preview
+
+        # Retorna el Column principal, ya que el contenedor padre (self) lo contiene.
+        return ft.Column(
+            [
+                ft.Text("Análisis Dataset", size=24, weight=ft.FontWeight.BOLD),
+                ft.Text(f"Dataset: {self.app_state.loaded_file_name or 'No cargado'}"),
+                *self._sample_notice(df),
+                self.analysis_tabs,
+                self.tabs_content_area,
+            ],
+            spacing=15,
+            expand=True,
+            scroll=ft.ScrollMode.ADAPTIVE
+        )
+
+    def _basic_analysis_content(self, df):
+        """
+        Construye la pestaña "Análisis Básico" a partir del perfil de columnas de
+        DataAnalyzer (un solo recorrido de los datos, guardado en caché).
+        """
         df_info = self.data_analyzer.get_dataframe_info(df)
         desc_stats_df = self.data_analyzer.get_descriptive_statistics(df)
+        profile = self.data_analyzer.get_profile(df)
 
         desc_stats_text_lines = []
         if not desc_stats_df.empty:
-            desc_stats_text_lines.append("Estadísticas Descriptivas de Columnas Numéricas:")
+            desc_stats_text_lines.append(self._stats_heading(df_info))
+            rank_errors = desc_stats_df.attrs.get("quantile_rank_error")
+            if rank_errors:
+                desc_stats_text_lines.append(
+                    "  (Cuartiles estimados con bocetos; error de rango máximo: "
+                    + ", ".join(f"{col} ±{error:.2%}" for col, error in rank_errors.items()) + ")")
             for index, row in desc_stats_df.iterrows():
                 desc_stats_text_lines.append(f"  - Columna '{index}':")
                 for stat, value in row.items():
@@ -75,15 +143,47 @@ class DataDisplayPage(ft.Container): # Hereda de ft.Container
         else:
             desc_stats_text_lines.append("No hay columnas numéricas para estadísticas descriptivas.")
 
-        tab_content_basic_analysis = ft.Column(
+        column_summary = []
+        if profile is not None:
+            column_summary = [
+                ft.Text("Resumen por columna (valores distintos estimados):"),
+                *[ft.Text(f"  - {col}: {profile.summary_text(col)}") for col in profile.columns],
+            ]
+
+        approximate_switch = ft.Switch(
+            label="Estadísticas aproximadas (bocetos, para datos muy grandes)",
+            value=self.data_analyzer.use_approximate(df),
+            on_change=self._handle_approximate_change,
+        )
+        # Perfil repartido por columnas entre procesos (solo DataFrames de Pandas)
+        in_memory = isinstance(df, pd.DataFrame)
+        parallel_switch = ft.Switch(
+            label="Perfil en paralelo (procesos, para tablas anchas)",
+            value=self.data_analyzer.use_parallel(df),
+            visible=in_memory,
+            on_change=self._handle_parallel_change,
+        )
+        scaling_text = ft.Text("", selectable=True)
+        scaling_button = ft.OutlinedButton(
+            "Medir escalado por núcleos",
+            icon=ft.Icons.SPEED,
+            visible=in_memory,
+            on_click=lambda _: self._show_scaling_report(df, scaling_text),
+            tooltip="Perfila los datos con 1, 2, 4... procesos y muestra la aceleración obtenida",
+        )
+
+        return ft.Column(
             [
-                ft.Text(f"Número total de filas (registros): {df_info['num_rows']}"),
+                ft.Row([approximate_switch, parallel_switch, scaling_button], spacing=10, wrap=True),
+                scaling_text,
+                ft.Text(self._num_rows_text(df_info)),
                 ft.Text(f"Número total de columnas: {df_info['num_cols']}"),
-                ft.Text(f"Nombres de columnas: {', '.join(df_info['columns'])}"),
+                ft.Text(f"Nombres de columnas: {', '.join(str(col) for col in df_info['columns'])}"),
                 ft.Text("Tipos de datos por columna:"),
                 *[ft.Text(f"  - {col}: {dtype}") for col, dtype in df_info['dtypes'].items()],
                 ft.Text("Valores faltantes por columna:"),
                 *[ft.Text(f"  - {col}: {count}") for col, count in df_info['missing_values'].items()],
+                *column_summary,
                 ft.Divider(),
                 ft.Text("\n".join(desc_stats_text_lines)),
             ],
@@ -92,30 +192,67 @@ class DataDisplayPage(ft.Container): # Hereda de ft.Container
             scroll=ft.ScrollMode.ADAPTIVE
         )
 
-        # --- Contenido para la pestaña "Análisis Avanzado" (con ejemplos de gráficos) ---
+    def _handle_approximate_change(self, e):
+        """Activa o desactiva el modo aproximado de DataAnalyzer y recalcula la pestaña."""
+        self.data_analyzer.approximate = e.control.value
+        df = self.app_state.get_data()
+        if df is None:
+            return
+        self.tabs_content_area.content = self._basic_analysis_content(df)
+        if self.page is not None:
+            self.page.update()
+
+    def _handle_parallel_change(self, e):
+        """Activa o desactiva el modo paralelo de DataAnalyzer (afecta a los próximos perfiles)."""
+        self.data_analyzer.parallel = e.control.value
+
+    def _show_scaling_report(self, df, scaling_text):
+        """Mide el perfil en paralelo con distinto número de procesos y muestra la aceleración."""
+        scaling_text.value = "Midiendo el escalado..."
+        if self.page is not None:
+            self.page.update()
+        report = self.data_analyzer.get_scaling_report(df)
+        if not report:
+            scaling_text.value = "No se pudo medir el escalado (ver la consola)."
+        else:
+            scaling_text.value = "Escalado del perfil en paralelo:\n" + "\n".join(
+                f"  - {entry['workers']} procesos: {entry['seconds']:.2f} s "
+                f"(x{entry['speedup']:.2f}, eficiencia {entry['efficiency']:.0%})"
+                for entry in report
+            )
+        if self.page is not None:
+            self.page.update()
+
+    def _advanced_analysis_content(self, df):
+        """
+        Construye la pestaña "Análisis Avanzado": matriz de correlación de las
+        columnas numéricas (mapa de calor y pares más relacionados) y los gráficos
+        de ejemplo.
+        """
         plot_elements = []
-        # Asegúrate de que las columnas existan y sean del tipo correcto antes de generar
-        if 'Edad' in df.columns and pd.api.types.is_numeric_dtype(df['Edad']):
-            hist_base64 = self.plot_generator.generate_histogram(df, 'Edad', title='Distribución de Edades')
+        # Solo se traen a Pandas las columnas que usan los gráficos
+        plot_df = self._plot_input(df, ['Edad', 'Ingresos'])
+        if 'Edad' in plot_df.columns and pd.api.types.is_numeric_dtype(plot_df['Edad']):
+            hist_base64 = self.plot_generator.generate_histogram(plot_df, 'Edad', title='Distribución de Edades')
             if hist_base64:
                 self.histogram_plot_container.update_plot(hist_base64, "Histograma de Edades")
                 plot_elements.append(self.histogram_plot_container)
         else:
             plot_elements.append(ft.Text("No se pudo generar histograma de 'Edad' (columna no encontrada o no numérica)."))
 
-        if 'Edad' in df.columns and 'Ingresos' in df.columns and \
-           pd.api.types.is_numeric_dtype(df['Edad']) and pd.api.types.is_numeric_dtype(df['Ingresos']):
-            scatter_base64 = self.plot_generator.generate_scatterplot(df, 'Edad', 'Ingresos', title='Edad vs Ingresos')
+        if 'Edad' in plot_df.columns and 'Ingresos' in plot_df.columns and \
+           pd.api.types.is_numeric_dtype(plot_df['Edad']) and pd.api.types.is_numeric_dtype(plot_df['Ingresos']):
+            scatter_base64 = self.plot_generator.generate_scatterplot(plot_df, 'Edad', 'Ingresos', title='Edad vs Ingresos')
             if scatter_base64:
                 self.scatterplot_plot_container.update_plot(scatter_base64, "Dispersión de Edad vs Ingresos")
                 plot_elements.append(self.scatterplot_plot_container)
         else:
             plot_elements.append(ft.Text("No se pudo generar diagrama de dispersión de 'Edad' vs 'Ingresos' (columnas no encontradas o no numéricas)."))
 
-        tab_content_advanced_analysis = ft.Column(
+        return ft.Column(
             [
                 ft.Text("Análisis Avanzado y Visualizaciones:", weight=ft.FontWeight.BOLD),
-                ft.Text("Aquí se mostrarán gráficos y análisis más complejos."),
+                *self._correlation_content(df),
                 ft.Divider(),
                 *plot_elements,
             ],
@@ -124,26 +261,106 @@ class DataDisplayPage(ft.Container): # Hereda de ft.Container
             scroll=ft.ScrollMode.ADAPTIVE
         )
 
-        # Establece el contenido inicial del área de pestañas
-        # Esto se hará en _handle_tab_change o al cargar la vista por primera vez
-        # self.tabs_content_area.content = tab_content_preview
-
-        # Retorna el Column principal, ya que el contenedor padre (self) lo contiene.
-        return ft.Column(
-            [
-                ft.Text("Análisis Dataset", size=24, weight=ft.FontWeight.BOLD),
-                ft.Text(f"Dataset: {self.app_state.loaded_file_name or 'No cargado'}"),
-                self.analysis_tabs,
-                self.tabs_content_area,
-            ],
-            spacing=15,
-            expand=True,
-            scroll=ft.ScrollMode.ADAPTIVE
+    def _correlation_content(self, df):
+        """
+        Controles de la matriz de correlación: selector de método, mapa de calor,
+        pares más correlacionados y dispersión del par más fuerte. La matriz está en
+        caché en DataAnalyzer, así que cambiar de pestaña no la recalcula.
+        """
+        method_dropdown = ft.Dropdown(
+            label="Método de correlación",
+            width=220,
+            dense=True,
+            value=self.correlation_method,
+            options=[ft.dropdown.Option('pearson', "Pearson (lineal)"),
+                     ft.dropdown.Option('spearman', "Spearman (rangos)")],
+            on_change=self._handle_correlation_method_change,
         )
+        corr = self.data_analyzer.get_correlation_matrix(df, self.correlation_method)
+        if corr.empty:
+            return [method_dropdown, ft.Text("Se necesitan al menos dos columnas numéricas para la correlación.")]
+
+        controls = [method_dropdown]
+        heatmap_base64 = self.plot_generator.generate_correlation_heatmap(corr)
+        if heatmap_base64:
+            # Contenedores nuevos en cada construcción: update_plot exige que ya estén en la página
+            controls.append(PlotContainer(heatmap_base64, title="Mapa de Calor de Correlaciones"))
+        if corr.attrs.get("sampled"):
+            controls.append(ft.Text(
+                f"Calculada sobre una muestra aleatoria de {corr.attrs['rows_used']:,} de "
+                f"{corr.attrs['total_rows']:,} filas ({corr.attrs['seconds']:.2f} s).",
+                color=ft.Colors.GREY_600,
+            ))
+
+        pairs = self.data_analyzer.get_strongest_correlations(df, self.correlation_method)
+        if not pairs.empty:
+            controls.append(ft.Text("Pares de columnas más correlacionados:"))
+            controls += [ft.Text(f"  - {row.column_a} ~ {row.column_b}: {row.correlation:+.3f}")
+                         for row in pairs.itertuples(index=False)]
+            strongest = pairs.iloc[0]
+            pair_df = self._plot_input(df, [strongest["column_a"], strongest["column_b"]])
+            scatter_base64 = self.plot_generator.generate_scatterplot(
+                pair_df, strongest["column_a"], strongest["column_b"])
+            if scatter_base64:
+                controls.append(PlotContainer(
+                    scatter_base64, title=f"Par más correlacionado: {strongest['column_a']} vs {strongest['column_b']}"))
+        return controls
+
+    def _handle_correlation_method_change(self, e):
+        """Cambia el método de correlación y recalcula la pestaña (o la toma de la caché)."""
+        self.correlation_method = e.control.value
+        df = self.app_state.get_data()
+        if df is None:
+            return
+        self.tabs_content_area.content = self._advanced_analysis_content(df)
+        if self.page is not None:
+            self.page.update()
+
+    def _preview_table_input(self, data):
+        """
+        Retorna (DataFrame, título) para la tabla de vista previa. Si los datos son
+        una muestra, se muestran las primeras filas reales del archivo.
+        """
+        if self.app_state.is_preview() and self.app_state.preview_head is not None:
+            return self.app_state.preview_head.head(10), "Primeras 10 Filas del Archivo"
+        return data.head(10), "Primeras 10 Filas del Dataset"
+
+    def _num_rows_text(self, df_info):
+        """Texto del número de filas; indica si es una estimación a partir de una muestra."""
+        if df_info['approximate']:
+            return f"Número total de filas (estimado): {df_info['num_rows']:,}"
+        return f"Número total de filas (registros): {df_info['num_rows']}"
+
+    def _stats_heading(self, df_info):
+        """Encabezado de las estadísticas descriptivas (aproximadas si vienen de una muestra)."""
+        if df_info['approximate']:
+            return "Estadísticas Descriptivas de Columnas Numéricas (aproximadas, sobre la muestra):"
+        return "Estadísticas Descriptivas de Columnas Numéricas:"
+
+    def _sample_notice(self, data):
+        """Aviso de vista previa por muestreo (lista vacía si los datos están completos)."""
+        sample_info = self.data_analyzer.get_sample_info(data)
+        if not sample_info:
+            return []
+        return [ft.Text(
+            f"⚠️ Vista previa por muestreo ({sample_info['sample_rows']:,} filas): los análisis y "
+            "gráficos son aproximados. Carga el archivo completo para resultados exactos.",
+            color=ft.Colors.ORANGE_700,
+        )]
+
+    def _plot_input(self, data, columns):
+        """
+        Retorna un DataFrame de Pandas con las columnas pedidas que existan en los datos.
+        Si los datos son un LazyDataset, solo esas columnas se traen desde DuckDB.
+        """
+        available = [col for col in columns if col in data.columns]
+        if isinstance(data, LazyDataset):
+            return data.to_pandas(columns=available) if available else pd.DataFrame()
+        return data[available]
 
     def _handle_tab_change(self, e): # Renombrado de handle_tab_change a _handle_tab_change
         """Maneja el cambio de pestaña."""
-        df = self.app_state.get_dataframe()
+        df = self.app_state.get_data() # DataFrame o LazyDataset de DuckDB
         if df is None: # Si no hay DataFrame, no intentes construir contenido dinámico
             self.tabs_content_area.content = ft.Text("No hay datos cargados para mostrar en esta pestaña.")
             if self.page is not None:
@@ -155,66 +372,12 @@ class DataDisplayPage(ft.Container): # Hereda de ft.Container
         # Esto asegura que los datos más recientes del DataFrame se reflejen
         # y que los gráficos se generen con los datos actuales.
         if selected_tab_index == 0:
-            self.data_table_preview.update_dataframe(df.head(10), "Primeras 10 Filas del Dataset")
+            self.data_table_preview.update_dataframe(*self._preview_table_input(df))
             self.tabs_content_area.content = ft.Column([self.data_table_preview], spacing=10, expand=True, scroll=ft.ScrollMode.ADAPTIVE)
         elif selected_tab_index == 1:
-            df_info = self.data_analyzer.get_dataframe_info(df)
-            desc_stats_df = self.data_analyzer.get_descriptive_statistics(df)
-            desc_stats_text_lines = []
-            if not desc_stats_df.empty:
-                desc_stats_text_lines.append("Estadísticas Descriptivas de Columnas Numéricas:")
-                for index, row in desc_stats_df.iterrows():
-                    desc_stats_text_lines.append(f"  - Columna '{index}':")
-                    for stat, value in row.items():
-                        desc_stats_text_lines.append(f"    {stat}: {value:.2f}")
-            else:
-                desc_stats_text_lines.append("No hay columnas numéricas para estadísticas descriptivas.")
-
-            self.tabs_content_area.content = ft.Column(
-                [
-                    ft.Text(f"Número total de filas (registros): {df_info['num_rows']}"),
-                    ft.Text(f"Número total de columnas: {df_info['num_cols']}"),
-                    ft.Text(f"Nombres de columnas: {', '.join(df_info['columns'])}"),
-                    ft.Text("Tipos de datos por columna:"),
-                    *[ft.Text(f"  - {col}: {dtype}") for col, dtype in df_info['dtypes'].items()],
-                    ft.Text("Valores faltantes por columna:"),
-                    *[ft.Text(f"  - {col}: {count}") for col, count in df_info['missing_values'].items()],
-                    ft.Divider(),
-                    ft.Text("\n".join(desc_stats_text_lines)),
-                ],
-                spacing=10,
-                expand=True,
-                scroll=ft.ScrollMode.ADAPTIVE
-            )
+            # El perfil de columnas está en caché: cambiar de pestaña no vuelve a recorrer los datos
+            self.tabs_content_area.content = self._basic_analysis_content(df)
         elif selected_tab_index == 2:
-            plot_elements = []
-            if 'Edad' in df.columns and pd.api.types.is_numeric_dtype(df['Edad']):
-                hist_base64 = self.plot_generator.generate_histogram(df, 'Edad', title='Distribución de Edades')
-                if hist_base64:
-                    self.histogram_plot_container.update_plot(hist_base64, "Histograma de Edades")
-                    plot_elements.append(self.histogram_plot_container)
-            else:
-                plot_elements.append(ft.Text("No se pudo generar histograma de 'Edad' (columna no encontrada o no numérica)."))
-
-            if 'Edad' in df.columns and 'Ingresos' in df.columns and \
-               pd.api.types.is_numeric_dtype(df['Edad']) and pd.api.types.is_numeric_dtype(df['Ingresos']):
-                scatter_base64 = self.plot_generator.generate_scatterplot(df, 'Edad', 'Ingresos', title='Edad vs Ingresos')
-                if scatter_base64:
-                    self.scatterplot_plot_container.update_plot(scatter_base64, "Dispersión de Edad vs Ingresos")
-                    plot_elements.append(self.scatterplot_plot_container)
-            else:
-                plot_elements.append(ft.Text("No se pudo generar diagrama de dispersión de 'Edad' vs 'Ingresos' (columnas no encontradas o no numéricas)."))
-
-            self.tabs_content_area.content = ft.Column(
-                [
-                    ft.Text("Análisis Avanzado y Visualizaciones:", weight=ft.FontWeight.BOLD),
-                    ft.Text("Aquí se mostrarán gráficos y análisis más complejos."),
-                    ft.Divider(),
-                    *plot_elements,
-                ],
-                spacing=10,
-                expand=True,
-                scroll=ft.ScrollMode.ADAPTIVE
-            )
+            self.tabs_content_area.content = self._advanced_analysis_content(df)
         if self.page is not None:
             self.page.update()
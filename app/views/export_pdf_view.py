@@ -60,10 +60,9 @@ class ExportPDFPage(ft.Container): # Hereda de ft.Container
         Maneja el evento de clic del botón para exportar a PDF.
         Aquí es donde irá la lógica principal de generación del PDF.
         """
-        df = self.app_state.get_dataframe()
         file_name = self.app_state.get_loaded_file_name()
 
-        if df is None:
+        if not self.app_state.has_data():
             self.export_status_text.value = "Error: No hay datos cargados para exportar."
             self.export_status_text.color = ft.Colors.RED_ACCENT_700
             if self.page is not None:
@@ -1,14 +1,18 @@
 import flet as ft
 import pandas as pd
 import io
+from typing import Optional
 from core.data_loader import DataLoader
+from core.data_analyzer import DataAnalyzer
+from core.load_job import LoadCancelledError, LoadJob
 from constants import VIEW_DISPLAY
 
 class FileUploadPage(ft.Container):
     """
     Vista mejorada para cargar y validar archivos de datos.
     """
-    def __init__(self, page: ft.Page, app_state, data_loader: DataLoader):
+    def __init__(self, page: ft.Page, app_state, data_loader: DataLoader,
+                 data_analyzer: Optional[DataAnalyzer] = None):
         super().__init__(
             padding=20,
             expand=True,
@@ -17,6 +21,8 @@ class FileUploadPage(ft.Container):
         self.page = page
         self.app_state = app_state
         self.data_loader = data_loader
+        # Perfil de columnas en caché, compartido con la vista de análisis
+        self.data_analyzer = data_analyzer
         
         # Elementos UI
         self.file_path_text = ft.Text("Ningún archivo seleccionado.", size=14)
@@ -28,6 +34,128 @@ class FileUploadPage(ft.Container):
             visible=False
         )
         
+        # Carga en segundo plano en curso (LoadJob) y reporte de la última optimización
+        self.current_job = None
+        self.optimization_report = None
+        self.cancel_button = ft.OutlinedButton(
+            "Cancelar",
+            icon=ft.Icons.CANCEL,
+            visible=False,
+            on_click=lambda _: self._cancel_load(),
+            tooltip="Detiene la carga en curso",
+        )
+
+        # Modo de carga diferida: el archivo se abre en DuckDB sin materializarlo
+        self.lazy_switch = ft.Switch(
+            label="Carga diferida con DuckDB (archivos grandes)",
+            value=False,
+            tooltip="Abre el archivo como vista de DuckDB; solo se traen a memoria vistas previas y resultados",
+        )
+
+        # Base de datos persistente: importar el archivo una vez y abrirlo en otras sesiones
+        has_database = self.data_loader.database is not None
+        self.store_switch = ft.Switch(
+            label="Guardar en la base de datos",
+            value=False,
+            visible=has_database,
+            tooltip="Importa el archivo como tabla de DuckDB (columnar y comprimida); "
+                    "en las siguientes sesiones se abre al instante",
+        )
+        self.stored_dropdown = ft.Dropdown(label="Datasets guardados", width=260, dense=True)
+        self.stored_row = ft.Row(
+            [
+                self.stored_dropdown,
+                ft.OutlinedButton("Abrir", icon=ft.Icons.STORAGE, on_click=lambda _: self._open_stored_dataset()),
+            ],
+            spacing=10,
+            visible=has_database,
+        )
+        self._refresh_stored_datasets()
+
+        # Vista previa por muestreo: primeras filas y una muestra aleatoria del archivo
+        self.preview_switch = ft.Switch(
+            label="Vista previa rápida (muestra)",
+            value=False,
+            tooltip="Lee una muestra aleatoria en pocos segundos; después puede cargarse el archivo completo",
+        )
+        # Archivo de la última vista previa (ruta, nombre), para cargarlo completo a petición
+        self.preview_source = None
+        self.full_load_button = ft.OutlinedButton(
+            "Cargar archivo completo",
+            icon=ft.Icons.DOWNLOAD,
+            visible=False,
+            on_click=lambda _: self._start_full_load(),
+            tooltip="Reemplaza la muestra por el archivo completo",
+        )
+        # CSV que crece por el final: se leen solo las filas añadidas desde la carga
+        self.append_button = ft.OutlinedButton(
+            "Cargar filas nuevas",
+            icon=ft.Icons.PLAYLIST_ADD,
+            visible=False,
+            on_click=lambda _: self._load_appended_rows(),
+            tooltip="Lee solo las filas añadidas al final del CSV y actualiza las estadísticas con ellas",
+        )
+
+        # Selector de columnas: antes de cargar se lee solo el esquema del archivo
+        self.column_picker_switch = ft.Switch(
+            label="Elegir columnas antes de cargar",
+            value=False,
+            tooltip="Lee solo el esquema y carga únicamente las columnas marcadas",
+        )
+        # Archivo pendiente de cargar (ruta, nombre) y casillas de sus columnas
+        self.pending_source = None
+        self.column_checkboxes = []
+        self.column_picker_list = ft.Column(scroll=ft.ScrollMode.AUTO, height=220, spacing=0)
+        self.column_picker = ft.Container(
+            ft.Column([
+                ft.Text("Columnas a cargar:", weight=ft.FontWeight.BOLD),
+                self.column_picker_list,
+                ft.Row([
+                    ft.TextButton("Todas", on_click=lambda _: self._set_all_columns(True)),
+                    ft.TextButton("Ninguna", on_click=lambda _: self._set_all_columns(False)),
+                    ft.OutlinedButton("Descartar", on_click=lambda _: self._hide_column_picker()),
+                    ft.ElevatedButton("Cargar columnas", icon=ft.Icons.CHECK,
+                                      on_click=lambda _: self._load_selected_columns()),
+                ], spacing=10, wrap=True),
+            ], spacing=5),
+            border=ft.border.all(1, ft.Colors.GREY_300),
+            border_radius=5,
+            padding=10,
+            visible=False,
+        )
+
+        # Optimización de tipos tras la carga (reduce la memoria del DataFrame)
+        self.optimize_switch = ft.Switch(
+            label="Optimizar tipos de datos",
+            value=False,
+            tooltip="Reduce enteros/flotantes, convierte texto repetido en categorías y parsea fechas",
+        )
+
+        # Columnas respaldadas por Arrow: la carga, las consultas y la tabla comparten buffers
+        self.arrow_switch = ft.Switch(
+            label="Columnas Arrow",
+            value=True,
+            tooltip="Mantiene los datos en formato Arrow (sin copias ni conversiones entre la carga, "
+                    "las consultas SQL y las vistas)",
+        )
+
+        # Motor de parseo de CSV ('auto' lo elige según el tamaño del archivo)
+        self.engine_dropdown = ft.Dropdown(
+            label="Motor CSV",
+            width=160,
+            value="auto",
+            options=[ft.dropdown.Option(engine) for engine in DataLoader.CSV_ENGINES],
+            tooltip="pandas: clásico; pyarrow y duckdb: lectores multihilo",
+        )
+
+        # Botón para invalidar las copias Parquet guardadas de archivos ya cargados
+        self.clear_cache_button = ft.TextButton(
+            "Vaciar caché de archivos",
+            icon=ft.Icons.DELETE_SWEEP,
+            on_click=lambda _: self._clear_file_cache(),
+            tooltip="Elimina las copias Parquet usadas para acelerar las cargas repetidas",
+        )
+
         # FilePicker
         self.file_picker = ft.FilePicker(on_result=self.handle_file_picker_result)
         self.page.overlay.append(self.file_picker)
@@ -37,11 +165,22 @@ class FileUploadPage(ft.Container):
             "Seleccionar Archivo",
             icon=ft.Icons.UPLOAD_FILE,
             on_click=lambda _: self.file_picker.pick_files(
-                allowed_extensions=["xlsx", "csv"],
-                dialog_title="Seleccione un archivo de datos"
+                allowed_extensions=["xlsx", "csv", "parquet"],
+                allow_multiple=True,
+                dialog_title="Seleccione uno o varios archivos de datos"
             ),
         )
         
+        # Botón para cargar todas las partes de una carpeta como un único dataset
+        self.select_folder_button = ft.ElevatedButton(
+            "Cargar Carpeta",
+            icon=ft.Icons.FOLDER_OPEN,
+            on_click=lambda _: self.file_picker.get_directory_path(
+                dialog_title="Seleccione una carpeta con archivos CSV/XLSX/Parquet"
+            ),
+            tooltip="Carga en paralelo todos los archivos de la carpeta en un único dataset",
+        )
+        
         # Botones de validación avanzada
         self.validation_buttons = ft.ResponsiveRow([
             ft.ElevatedButton(
@@ -104,11 +243,18 @@ class FileUploadPage(ft.Container):
         return ft.Column(
             [
                 ft.Text("Cargar Archivo de Datos", size=24, weight=ft.FontWeight.BOLD),
-                ft.Text("Formatos soportados: XLSX (Excel) y CSV", size=14, color=ft.Colors.GREY_600),
+                ft.Text("Formatos soportados: XLSX (Excel), CSV y Parquet", size=14, color=ft.Colors.GREY_600),
                 ft.Divider(height=20),
                 
                 # Sección de carga
-                ft.Row([self.select_button, self.loading_indicator], spacing=10),
+                ft.Row([self.select_button, self.select_folder_button, self.cancel_button,
+                        self.full_load_button, self.append_button, self.loading_indicator], spacing=10),
+                ft.Row([self.engine_dropdown, self.lazy_switch, self.store_switch, self.preview_switch,
+                        self.column_picker_switch, self.optimize_switch, self.arrow_switch,
+                        self.clear_cache_button],
+                       spacing=10, wrap=True),
+                self.stored_row,
+                self.column_picker,
                 self.progress_bar,
                 self.file_path_text,
                 
@@ -145,6 +291,14 @@ class FileUploadPage(ft.Container):
             self.page.add(snack)
             self.page.update()
     
+    def _clear_file_cache(self):
+        """Vacía la caché Parquet del DataLoader, si está configurada."""
+        if self.data_loader.cache is None:
+            self.show_notification("La caché de archivos no está habilitada.", ft.Colors.ORANGE)
+            return
+        removed = self.data_loader.cache.invalidate()
+        self.show_notification(f"Caché vaciada: {removed} archivo(s) eliminado(s).", ft.Colors.BLUE)
+
     def _clear_results(self):
         """Limpia todos los resultados de validación."""
         self.validation_results.controls = [
@@ -154,12 +308,26 @@ class FileUploadPage(ft.Container):
             self.page.update()
     
     def handle_file_picker_result(self, e: ft.FilePickerResultEvent):
-        """Maneja el resultado de la selección de archivos."""
+        """
+        Maneja el resultado de la selección de archivos. La carga completa se
+        ejecuta en segundo plano, de modo que la interfaz sigue respondiendo y
+        la carga puede cancelarse. Una carpeta o varios archivos se cargan como
+        un único dataset con una columna de origen. Con la vista previa rápida
+        activada, solo se lee una muestra del archivo; con el selector de columnas,
+        primero se lee el esquema para elegir qué columnas cargar.
+        """
         self._reset_ui()
         
-        if e.files:
-            selected_file = e.files[0]
-            self.file_path_text.value = f"Archivo seleccionado: {selected_file.name}"
+        if e.path or e.files:
+            if e.path:
+                # Carpeta seleccionada con "Cargar Carpeta"
+                sources, selected_name = e.path, e.path
+            elif len(e.files) > 1:
+                sources = [f.path for f in e.files]
+                selected_name = f"{len(e.files)} archivos"
+            else:
+                sources, selected_name = e.files[0].path, e.files[0].name
+            self.file_path_text.value = f"Archivo seleccionado: {selected_name}"
             
             # Mostrar indicadores de carga
             self.progress_bar.visible = True
@@ -167,33 +335,376 @@ class FileUploadPage(ft.Container):
             if self.page:
                 self.page.update()
             
-            try:
-                # Cargar archivo
-                df, loaded_name = self.data_loader.load_data_from_file(selected_file.path)
-                
-                if df is not None:
-                    self.app_state.load_dataframe(df, loaded_name)
-                    self._show_success_message(loaded_name)
-                    self.show_notification(f"Archivo '{loaded_name}' cargado exitosamente!", ft.Colors.GREEN)
-                else:
-                    self._show_error_message(selected_file.name)
-                    
-            except Exception as ex:
-                self._show_error_message(selected_file.name)
-                print(f"Error al cargar archivo: {str(ex)}")
-                self.show_notification(f"Error: {str(ex)}", ft.Colors.RED)
-                
-            finally:
-                self._hide_loading_indicators()
+            multi_source = self.data_loader.is_multi_source(sources)
+            if self.store_switch.value and not multi_source:
+                self._import_to_database(e.files[0])
+                return
+            if self.lazy_switch.value and not multi_source:
+                self._open_lazy_dataset(e.files[0])
+                return
+            if self.preview_switch.value and not multi_source:
+                self._load_preview(e.files[0])
+                return
+            if self.column_picker_switch.value and not multi_source:
+                self._show_column_picker(sources, selected_name)
+                return
+
+            self._submit_load(sources, selected_name)
         else:
             self.file_path_text.value = "Carga cancelada."
             if self.page:
                 self.page.update()
+
+    def _submit_load(self, sources, selected_name, columns=None):
+        """
+        Inicia la carga completa en segundo plano (un archivo o varias partes).
+        Si se indican columnas, solo esas se leen del archivo.
+        """
+        multi_source = self.data_loader.is_multi_source(sources)
+        try:
+            if multi_source:
+                # Varias partes: se cargan en paralelo en un pool de procesos
+                load_kwargs = dict(optimize_dtypes=self.optimize_switch.value)
+            else:
+                # Cargar archivo por lotes para mostrar el avance real
+                load_kwargs = dict(
+                    chunksize=DataLoader.DEFAULT_CHUNKSIZE,
+                    optimize_dtypes=self.optimize_switch.value,
+                    engine=self.engine_dropdown.value or "auto",
+                    dtype_backend="pyarrow" if self.arrow_switch.value else "numpy",
+                )
+                if columns is not None:
+                    load_kwargs["columns"] = columns
+            # El manejador y los controles se preparan antes de iniciar la carga: si
+            # termina enseguida, _handle_load_done debe reconocerla como la actual
+            self.current_job = LoadJob(sources)
+            self.select_button.disabled = True
+            self.select_folder_button.disabled = True
+            self.cancel_button.visible = True
+            if self.page:
+                self.page.update()
+            self.data_loader.submit_load(
+                sources,
+                progress_callback=self._update_load_progress,
+                done_callback=lambda job: self._handle_load_done(job, selected_name),
+                job=self.current_job,
+                **load_kwargs,
+            )
+        except Exception as ex:
+            self.current_job = None
+            self.cancel_button.visible = False
+            self.select_button.disabled = False
+            self.select_folder_button.disabled = False
+            self._show_error_message(selected_name)
+            print(f"Error al cargar archivo: {str(ex)}")
+            self.show_notification(f"Error: {str(ex)}", ft.Colors.RED)
+            self._hide_loading_indicators()
+
+    def _show_column_picker(self, file_path, selected_name):
+        """Lee solo el esquema del archivo y muestra una casilla por columna."""
+        schema = self.data_loader.scan_schema(file_path)
+        self._hide_loading_indicators()
+        if schema is None:
+            self._show_error_message(selected_name)
+            return
+        self.pending_source = (file_path, selected_name)
+        self.column_checkboxes = [
+            ft.Checkbox(label=f"{col} ({dtype})", value=True, data=col) for col, dtype in schema.items()
+        ]
+        self.column_picker_list.controls = self.column_checkboxes
+        self.column_picker.visible = True
+        self.upload_status_text.value = f"📑 {len(schema)} columnas en '{selected_name}'. Marque las que desea cargar."
+        self.upload_status_text.color = ft.Colors.BLUE_GREY_400
+        if self.page:
+            self.page.update()
+
+    def _set_all_columns(self, value):
+        """Marca o desmarca todas las columnas del selector."""
+        for checkbox in self.column_checkboxes:
+            checkbox.value = value
+        if self.page:
+            self.page.update()
+
+    def _hide_column_picker(self):
+        """Oculta el selector de columnas y descarta el archivo pendiente."""
+        self.pending_source = None
+        self.column_checkboxes = []
+        self.column_picker_list.controls = []
+        self.column_picker.visible = False
+        if self.page:
+            self.page.update()
+
+    def _load_selected_columns(self):
+        """Carga el archivo pendiente leyendo solo las columnas marcadas."""
+        if self.pending_source is None:
+            return
+        selected = [checkbox.data for checkbox in self.column_checkboxes if checkbox.value]
+        if not selected:
+            self.show_notification("Seleccione al menos una columna.", ft.Colors.ORANGE)
+            return
+        # Si están todas marcadas, se hace una carga normal (que además puede usar la caché)
+        columns = selected if len(selected) < len(self.column_checkboxes) else None
+        file_path, selected_name = self.pending_source
+        self._hide_column_picker()
+        self.progress_bar.visible = True
+        self.loading_indicator.visible = True
+        if self.page:
+            self.page.update()
+        self._submit_load(file_path, selected_name, columns=columns)
+
+    def _load_preview(self, selected_file):
+        """Carga una muestra del archivo (vista previa rápida) en lugar del archivo completo."""
+        try:
+            sample, loaded_name = self.data_loader.load_preview(selected_file.path)
+            if sample is not None:
+                self.app_state.load_dataframe(sample, loaded_name, preview_head=self.data_loader.last_preview_head)
+                self.optimization_report = None
+                self.preview_source = (selected_file.path, selected_file.name)
+                self.full_load_button.visible = True
+                self._show_success_message(loaded_name)
+                self._show_sample_info(sample.attrs["sample_info"])
+                self.show_notification(f"Vista previa de '{loaded_name}' lista (muestra).", ft.Colors.GREEN)
+            else:
+                self._show_error_message(selected_file.name)
+        except Exception as ex:
+            self._show_error_message(selected_file.name)
+            print(f"Error en la vista previa: {str(ex)}")
+            self.show_notification(f"Error: {str(ex)}", ft.Colors.RED)
+        finally:
+            self._hide_loading_indicators()
+
+    def _start_full_load(self):
+        """Carga completo el archivo de la última vista previa."""
+        if self.preview_source is None:
+            return
+        path, name = self.preview_source
+        self.preview_source = None
+        self.full_load_button.visible = False
+        self.upload_status_text.value = ""
+        self._clear_results()
+        self.progress_bar.visible = True
+        self.loading_indicator.visible = True
+        if self.page:
+            self.page.update()
+        self._submit_load(path, name)
+
+    def _load_appended_rows(self):
+        """Añade a los datos cargados las filas nuevas del CSV de origen."""
+        df = self.app_state.get_dataframe()
+        if df is None:
+            return
+        new_rows, file_name = self.data_loader.load_appended_rows(df)
+        if new_rows is None:
+            self.append_button.visible = False
+            self.show_notification("El archivo cambió además de crecer: vuelve a cargarlo.", ft.Colors.ORANGE)
+            return
+        if new_rows.empty:
+            self.show_notification("No hay filas nuevas en el archivo.", ft.Colors.BLUE)
+            return
+        try:
+            if self.data_analyzer is not None:
+                # Las estadísticas se actualizan recorriendo solo las filas nuevas
+                combined = self.data_analyzer.append_rows(df, new_rows)
+            else:
+                combined = pd.concat([df, new_rows], ignore_index=True)
+                combined.attrs = {**df.attrs, **new_rows.attrs}
+        except ValueError as ex:
+            print(f"Error al añadir filas: {str(ex)}")
+            self.show_notification(f"Error: {str(ex)}", ft.Colors.RED)
+            return
+        self.app_state.load_dataframe(combined, file_name)
+        self.upload_status_text.value = (f"✅ {len(new_rows):,} filas nuevas añadidas a '{file_name}' "
+                                         f"({len(combined):,} filas en total).")
+        self.upload_status_text.color = ft.Colors.GREEN
+        self.show_notification(f"{len(new_rows):,} filas nuevas cargadas.", ft.Colors.GREEN)
+
+    def _open_lazy_dataset(self, selected_file):
+        """Abre el archivo como vista de DuckDB sin cargarlo en memoria (solo lee el esquema)."""
+        try:
+            dataset, loaded_name = self.data_loader.open_lazy_dataset(selected_file.path)
+            if dataset is not None:
+                self.app_state.load_dataset(dataset, loaded_name)
+                self._show_success_message(loaded_name)
+                self.show_notification(f"Archivo '{loaded_name}' abierto en modo diferido.", ft.Colors.GREEN)
+            else:
+                self._show_error_message(selected_file.name)
+        except Exception as ex:
+            self._show_error_message(selected_file.name)
+            print(f"Error al abrir archivo: {str(ex)}")
+            self.show_notification(f"Error: {str(ex)}", ft.Colors.RED)
+        finally:
+            self._hide_loading_indicators()
+
+    def _import_to_database(self, selected_file):
+        """Importa el archivo como tabla de la base de datos persistente y lo abre en modo diferido."""
+        try:
+            dataset, table_name = self.data_loader.import_to_database(selected_file.path)
+            if dataset is not None:
+                self.app_state.load_dataset(dataset, table_name)
+                self._refresh_stored_datasets()
+                self._show_success_message(selected_file.name)
+                self.show_notification(f"Archivo '{selected_file.name}' guardado como tabla '{table_name}'.",
+                                       ft.Colors.GREEN)
+            else:
+                self._show_error_message(selected_file.name)
+        except Exception as ex:
+            self._show_error_message(selected_file.name)
+            print(f"Error al importar archivo: {str(ex)}")
+            self.show_notification(f"Error: {str(ex)}", ft.Colors.RED)
+        finally:
+            self._hide_loading_indicators()
+
+    def _refresh_stored_datasets(self):
+        """Actualiza la lista de tablas de la base de datos persistente."""
+        names = self.data_loader.list_stored_datasets()
+        self.stored_dropdown.options = [ft.dropdown.Option(name) for name in names]
+        if self.stored_dropdown.value not in names:
+            self.stored_dropdown.value = None
+
+    def _open_stored_dataset(self):
+        """Abre una tabla guardada sin leer el archivo original."""
+        table_name = self.stored_dropdown.value
+        if not table_name:
+            self.show_notification("Elige un dataset guardado.", ft.Colors.ORANGE)
+            return
+        self._reset_ui()
+        dataset, loaded_name = self.data_loader.open_stored_dataset(table_name)
+        if dataset is not None:
+            self.app_state.load_dataset(dataset, loaded_name)
+            self.file_path_text.value = f"Dataset guardado: {loaded_name}"
+            self._show_success_message(loaded_name)
+        else:
+            self._show_error_message(table_name)
+        if self.page:
+            self.page.update()
+
+    def _handle_load_done(self, job: LoadJob, selected_name):
+        """Recibe el resultado de la carga en segundo plano (se llama desde el hilo de la carga)."""
+        if job is not self.current_job:
+            return # Resultado de una carga anterior ya reemplazada
+        self.current_job = None
+        self.cancel_button.visible = False
+        self.select_button.disabled = False
+        self.select_folder_button.disabled = False
+
+        try:
+            df, loaded_name = job.result()
+
+            if df is not None:
+                self.app_state.load_dataframe(df, loaded_name)
+                self.append_button.visible = "source_file" in df.attrs
+                self.optimization_report = job.optimization_report
+                self._show_success_message(loaded_name)
+                self._show_engine_timing(job.engine_timing)
+                self._show_sources_report(job.sources_report)
+                self._show_optimization_report()
+                self.show_notification(f"Archivo '{loaded_name}' cargado exitosamente!", ft.Colors.GREEN)
+            else:
+                self._show_error_message(selected_name)
+                self._show_sources_report(job.sources_report)
+
+        except LoadCancelledError:
+            self.upload_status_text.value = f"⏹️ Carga de '{selected_name}' cancelada."
+            self.upload_status_text.color = ft.Colors.ORANGE_700
+            self.show_notification("Carga cancelada.", ft.Colors.ORANGE)
+        except Exception as ex:
+            self._show_error_message(selected_name)
+            print(f"Error al cargar archivo: {str(ex)}")
+            self.show_notification(f"Error: {str(ex)}", ft.Colors.RED)
+
+        finally:
+            self._hide_loading_indicators()
+
+    def _cancel_load(self):
+        """Cancela la carga en curso; la lectura se detiene en el siguiente lote."""
+        if self.current_job is not None:
+            self.current_job.cancel()
+            self.upload_status_text.value = "Cancelando carga..."
+            if self.page:
+                self.page.update()
     
+    def _update_load_progress(self, bytes_read, total_bytes, rows_read):
+        """Actualiza la barra de progreso con los bytes y filas leídos."""
+        if total_bytes:
+            fraction = min(bytes_read / total_bytes, 1.0)
+            self.progress_bar.value = fraction
+            self.upload_status_text.value = f"Cargando... {fraction:.0%} ({rows_read:,} filas leídas)"
+        else:
+            # Tamaño total desconocido (p. ej. hojas XLSX sin dimensión declarada)
+            self.progress_bar.value = None
+            self.upload_status_text.value = f"Cargando... ({rows_read:,} filas leídas)"
+        self.upload_status_text.color = ft.Colors.BLUE_GREY_400
+        if self.page:
+            self.page.update()
+
+    def _format_bytes(self, num_bytes):
+        """Formatea un número de bytes en la unidad más legible."""
+        for unit in ("B", "KB", "MB", "GB"):
+            if num_bytes < 1024 or unit == "GB":
+                return f"{num_bytes:,.1f} {unit}"
+            num_bytes /= 1024
+
+    def _optimization_report_text(self):
+        """Retorna el texto del reporte de optimización de la última carga, o None."""
+        report = self.optimization_report
+        if not report:
+            return None
+        before, after = report["bytes_before"], report["bytes_after"]
+        saved_pct = (1 - after / before) * 100 if before else 0.0
+        lines = [f"🗜️ Optimización de tipos: {self._format_bytes(before)} → "
+                 f"{self._format_bytes(after)} ({saved_pct:.1f}% menos)"]
+        lines += [f"- {col}: {old} → {new}" for col, (old, new) in report["columns"].items()]
+        return "\n".join(lines)
+
+    def _show_engine_timing(self, timing):
+        """Muestra qué motor parseó el CSV y cuánto tardó."""
+        if timing:
+            engine, seconds = timing
+            self.validation_results.controls.append(
+                ft.Text(f"⏱️ Motor de parseo: {engine} ({seconds:.2f} s)", selectable=True)
+            )
+
+    def _show_sources_report(self, report):
+        """Muestra el tiempo y las filas de cada parte, y los problemas de esquema."""
+        if not report:
+            return
+        lines = [f"🧩 Carga de {len(report['parts'])} partes ({report['total_seconds']:.2f} s):"]
+        lines += [f"- {part['source']}: {part['rows']:,} filas en {part['seconds']:.2f} s"
+                  for part in report["parts"]]
+        if report["schema_issues"]:
+            lines.append("Diferencias de esquema:")
+            lines += [f"- {issue['message']}" for issue in report["schema_issues"]]
+        self.validation_results.controls.append(ft.Text("\n".join(lines), selectable=True))
+
+    def _sample_info_text(self, sample_info):
+        """Retorna el texto que describe una muestra de vista previa."""
+        total = sample_info.get("estimated_total_rows")
+        total_text = f"{total:,}" if total is not None else "desconocido"
+        if not sample_info["complete"]:
+            total_text = f"~{total_text} (estimado)"
+        return (f"🔎 Vista previa por muestreo: {sample_info['sample_rows']:,} filas de "
+                f"{sample_info['rows_scanned']:,} recorridas en {sample_info['seconds']:.2f} s. "
+                f"Filas del archivo: {total_text}. Los resultados son aproximados.")
+
+    def _show_sample_info(self, sample_info):
+        """Muestra el tamaño de la muestra y el total estimado de filas del archivo."""
+        self.validation_results.controls.append(ft.Text(self._sample_info_text(sample_info), selectable=True))
+
+    def _show_optimization_report(self):
+        """Muestra en los resultados el ahorro de memoria de la optimización de tipos."""
+        text = self._optimization_report_text()
+        if text:
+            self.validation_results.controls.append(ft.Text(text, selectable=True))
+
     def _reset_ui(self):
         """Reinicia la UI a su estado inicial."""
         self.upload_status_text.value = ""
         self.file_path_text.value = "Ningún archivo seleccionado."
+        self.preview_source = None
+        self.full_load_button.visible = False
+        self.append_button.visible = False
+        self.pending_source = None
+        self.column_picker.visible = False
         self._clear_results()
     
     def _show_success_message(self, filename):
@@ -209,6 +720,7 @@ class FileUploadPage(ft.Container):
     def _hide_loading_indicators(self):
         """Oculta los indicadores de carga."""
         self.progress_bar.visible = False
+        self.progress_bar.value = None # Vuelve al modo indeterminado para la próxima carga
         self.loading_indicator.visible = False
         if self.page:
             self.page.update()
@@ -217,13 +729,21 @@ class FileUploadPage(ft.Container):
         """Muestra diferentes tipos de información sobre los datos."""
         self._clear_results()
         df = self.app_state.get_dataframe()
+        dataset = self.app_state.get_dataset()
         
-        if df is None:
+        if df is None and dataset is None:
             self.show_notification("No hay datos cargados para validar.", ft.Colors.ORANGE)
             return
         
         try:
-            if info_type == "shape":
+            profile = None
+            if self.data_analyzer is not None and info_type in ("nulls", "nulls_percent"):
+                profile = self.data_analyzer.get_profile(dataset if dataset is not None else df)
+
+            if dataset is not None:
+                result = self._dataset_info(dataset, info_type, profile)
+
+            elif info_type == "shape":
                 rows, cols = df.shape
                 result = f"📐 Forma del DataFrame:\nFilas: {rows}\nColumnas: {cols}"
             
@@ -233,14 +753,17 @@ class FileUploadPage(ft.Container):
                 )
             
             elif info_type == "nulls":
-                nulls = df.isnull().sum()
+                nulls = profile.missing_values() if profile else df.isnull().sum()
                 result = "⚠️ Valores nulos por columna:\n" + "\n".join(
                     f"- {col}: {count}" for col, count in nulls.items()
                 )
             
             elif info_type == "nulls_percent":
-                obs, _ = df.shape
-                nulls_pct = (df.isnull().sum() * 100 / obs).round(2)
+                if profile:
+                    nulls_pct = profile.null_percent()
+                else:
+                    obs, _ = df.shape
+                    nulls_pct = (df.isnull().sum() * 100 / obs).round(2)
                 result = "📉 Porcentaje de valores nulos:\n" + "\n".join(
                     f"- {col}: {pct}%" for col, pct in nulls_pct.items()
                 )
@@ -248,12 +771,19 @@ class FileUploadPage(ft.Container):
             elif info_type == "info":
                 # Usamos StringIO para capturar la salida de info()
                 buffer = io.StringIO()
-                df.info(buf=buffer)
+                df.info(buf=buffer, memory_usage='deep') # Memoria real, incluido el texto
                 result = "📋 Información completa:\n" + buffer.getvalue()
+                optimization_text = self._optimization_report_text()
+                if optimization_text:
+                    result += "\n" + optimization_text
             
             else:
                 result = "Tipo de validación no reconocido"
             
+            sample_info = df.attrs.get("sample_info") if df is not None else None
+            if sample_info:
+                result = self._sample_info_text(sample_info) + "\n\n" + result
+
             # Mostrar resultados
             self.validation_results.controls.append(
                 ft.Text(result, selectable=True)
@@ -262,4 +792,42 @@ class FileUploadPage(ft.Container):
                 self.page.update()
             
         except Exception as e:
-            self.show_notification(f"Error en validación: {str(e)}", ft.Colors.RED)
\ No newline at end of file
+            self.show_notification(f"Error en validación: {str(e)}", ft.Colors.RED)
+
+    def _dataset_info(self, dataset, info_type, profile=None):
+        """
+        Calcula la información de validación en DuckDB para un dataset diferido. Los
+        nulos se toman del perfil de columnas, si se indica.
+        """
+        if info_type == "shape":
+            rows, cols = dataset.shape
+            return f"📐 Forma del Dataset (DuckDB):\nFilas: {rows}\nColumnas: {cols}"
+
+        if info_type == "dtypes":
+            return "📊 Tipos de datos (DuckDB):\n" + "\n".join(
+                f"- {col}: {dtype}" for col, dtype in dataset.dtypes.items()
+            )
+
+        if info_type == "nulls":
+            nulls = profile.missing_values() if profile else dataset.missing_values()
+            return "⚠️ Valores nulos por columna:\n" + "\n".join(
+                f"- {col}: {count}" for col, count in nulls.items()
+            )
+
+        if info_type == "nulls_percent":
+            obs = dataset.num_rows
+            nulls = profile.missing_values() if profile else dataset.missing_values()
+            return "📉 Porcentaje de valores nulos:\n" + "\n".join(
+                f"- {col}: {round(count * 100 / obs, 2) if obs else 0.0}%" for col, count in nulls.items()
+            )
+
+        if info_type == "info":
+            nulls = dataset.missing_values()
+            rows, cols = dataset.shape
+            lines = [f"Dataset diferido: {dataset.file_name}",
+                     f"Filas: {rows}, Columnas: {cols}",
+                     "Columna | No nulos | Tipo"]
+            lines += [f"{col} | {rows - nulls[col]} | {dtype}" for col, dtype in dataset.dtypes.items()]
+            return "📋 Información completa:\n" + "\n".join(lines)
+
+        return "Tipo de validación no reconocido"
\ No newline at end of file
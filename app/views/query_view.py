@@ -1,6 +1,11 @@
+import datetime
+import os
+import re
 import flet as ft
 import pandas as pd
 from core.query_engine import QueryEngine
+from core.query_guard import QueryCancelledError, QueryLimitError
+from core.prepared_statements import query_parameters
 from app.controls.data_table_custom import DataTableCustom
 
 class QueryPage(ft.Container): # Hereda de ft.Container
@@ -19,10 +24,102 @@ class QueryPage(ft.Container): # Hereda de ft.Container
             multiline=True,
             min_lines=3,
             max_lines=5,
-            expand=True
+            expand=True,
+            on_change=lambda _: self._refresh_parameter_form(),
         )
+        # Formulario con un campo por cada parámetro $nombre de la consulta
+        self.param_fields = {}
+        self.params_row = ft.Row(spacing=10, wrap=True, visible=False)
         self.results_table_display = DataTableCustom(title="Resultados de la Consulta")
         self.query_status = ft.Text("", ref=ft.Ref())
+        self.execute_button = ft.ElevatedButton(
+            "Ejecutar Consulta",
+            icon=ft.Icons.PLAY_ARROW,
+            on_click=self.handle_execute_query
+        )
+        # Visible solo mientras hay una consulta en ejecución
+        self.cancel_button = ft.OutlinedButton(
+            "Cancelar",
+            icon=ft.Icons.STOP,
+            visible=False,
+            on_click=self.handle_cancel_query
+        )
+
+        # Resultado paginado de la última consulta: solo se trae la página visible
+        self.query_cursor = None
+        self.current_page = 0
+        self.page_info_text = ft.Text("", size=12, color=ft.Colors.GREY_600)
+        self.prev_page_button = ft.IconButton(
+            ft.Icons.CHEVRON_LEFT, tooltip="Página anterior", disabled=True,
+            on_click=lambda _: self._show_page(self.current_page - 1),
+        )
+        self.next_page_button = ft.IconButton(
+            ft.Icons.CHEVRON_RIGHT, tooltip="Página siguiente", disabled=True,
+            on_click=lambda _: self._show_page(self.current_page + 1),
+        )
+        self.pagination_row = ft.Row(
+            [self.prev_page_button, self.page_info_text, self.next_page_button],
+            visible=False,
+        )
+
+        # Modo de profiling: la consulta se ejecuta con el profiling de DuckDB
+        self.profile_switch = ft.Switch(label="Perfilar consulta (EXPLAIN ANALYZE)", value=False)
+        self.profile_column = ft.Column(spacing=2)
+        self.profile_panel = ft.Container(
+            content=self.profile_column,
+            padding=10,
+            border=ft.border.all(1, ft.Colors.OUTLINE_VARIANT),
+            border_radius=8,
+            visible=False,
+        )
+
+        # Catálogo de tablas consultables: 'my_table' y los archivos cargados con su nombre
+        self.catalog_column = ft.Column(spacing=0)
+        # Compacta la base de datos persistente (solo si el motor usa un archivo)
+        self.vacuum_button = ft.TextButton(
+            "Compactar base de datos",
+            icon=ft.Icons.CLEANING_SERVICES,
+            visible=self.query_engine.is_persistent,
+            on_click=self.handle_vacuum,
+        )
+        self.catalog_panel = ft.ExpansionTile(
+            title=ft.Text("Tablas disponibles"),
+            subtitle=ft.Text("Pulsa una tabla para añadir su nombre a la consulta; se pueden combinar con JOIN",
+                             size=12),
+            controls=[self.catalog_column, self.vacuum_button],
+            initially_expanded=True,
+        )
+        self._refresh_catalog()
+
+        # Guardar el resultado de la última consulta como tabla (persistente si hay base de datos)
+        self.last_query = None
+        self.last_params = None
+        self.save_name_field = ft.TextField(label="Nombre de la tabla", width=220, dense=True)
+        self.save_result_button = ft.OutlinedButton(
+            "Guardar resultado como tabla",
+            icon=ft.Icons.SAVE,
+            disabled=True,
+            on_click=self.handle_save_result,
+        )
+        # Tabla derivada: el resultado queda en memoria (Arrow) y se recalcula si cambian sus tablas
+        self.derived_button = ft.OutlinedButton(
+            "Crear tabla derivada",
+            icon=ft.Icons.TABLE_CHART,
+            disabled=True,
+            tooltip="Guarda el resultado en memoria para consultarlo sin recalcular la consulta",
+            on_click=self.handle_create_derived,
+        )
+        self.auto_refresh_checkbox = ft.Checkbox(label="Actualizar al cambiar los datos", value=True)
+
+        # Historial de consultas con su duración (persistente entre sesiones)
+        self.history_column = ft.Column(spacing=0)
+        self.history_panel = ft.ExpansionTile(
+            title=ft.Text("Historial de consultas"),
+            subtitle=ft.Text("Duración de cada ejecución y cambio respecto a la anterior", size=12),
+            controls=[self.history_column],
+            initially_expanded=False,
+        )
+        self._refresh_history()
 
         self.content = self._build_content()
 
@@ -31,15 +128,21 @@ class QueryPage(ft.Container): # Hereda de ft.Container
         return ft.Column(
             [
                 ft.Text("Realizar Consultas SQL", size=24, weight=ft.FontWeight.BOLD),
-                ft.Text("Escribe y ejecuta consultas SQL sobre el DataFrame cargado."),
+                ft.Text("Escribe y ejecuta consultas SQL sobre los datos cargados (tabla 'my_table') "
+                        "o sobre cualquier archivo cargado antes, por su nombre de tabla. "
+                        "Usa $nombre para los valores que cambian: se piden aparte y la consulta "
+                        "se prepara una sola vez."),
+                self.catalog_panel,
                 self.query_input,
-                ft.ElevatedButton(
-                    "Ejecutar Consulta",
-                    icon=ft.Icons.PLAY_ARROW,
-                    on_click=self.handle_execute_query
-                ),
+                self.params_row,
+                ft.Row([self.execute_button, self.cancel_button, self.profile_switch]),
                 self.query_status,
+                ft.Row([self.save_name_field, self.save_result_button, self.derived_button,
+                        self.auto_refresh_checkbox], wrap=True),
+                self.profile_panel,
+                self.history_panel,
                 ft.Divider(),
+                self.pagination_row,
                 self.results_table_display, # Usa tu control personalizado para mostrar resultados
             ],
             spacing=15,
@@ -50,9 +153,10 @@ class QueryPage(ft.Container): # Hereda de ft.Container
     def handle_execute_query(self, e):
         """Maneja la ejecución de la consulta SQL."""
         df_original = self.app_state.get_dataframe()
+        dataset = self.app_state.get_dataset()
         query_str = self.query_input.value
 
-        if df_original is None:
+        if df_original is None and dataset is None:
             self.query_status.value = "Error: No hay un DataFrame cargado para consultar."
             self.query_status.color = ft.Colors.ORANGE_700
             self.results_table_display.update_dataframe(pd.DataFrame(), "Carga un archivo primero.") # Limpiar tabla
@@ -70,27 +174,418 @@ class QueryPage(ft.Container): # Hereda de ft.Container
 
         self.query_status.value = "Ejecutando consulta..."
         self.query_status.color = ft.Colors.BLUE_GREY_400
+        self._set_running(True)
         if self.page is not None:
             self.page.update()
 
+        self._close_cursor()
+        self.last_query = None
+        self.last_params = None
+        self.profile_panel.visible = False
         try:
+            # Valores de los parámetros $nombre (None si la consulta no tiene)
+            params = self._parameter_values()
             # --- Lógica REAL de ejecución de consulta con QueryEngine ---
-            result_df = self.query_engine.execute_query_on_dataframe(df_original, query_str)
+            # El resultado se lee por páginas: solo la página visible se trae a Pandas
+            if self.profile_switch.value:
+                # Con profiling la consulta se ejecuta entera y se muestra su árbol de operadores
+                if dataset is not None:
+                    self.query_cursor, profile = self.query_engine.profile_query_on_dataset(
+                        dataset, query_str, params=params)
+                else:
+                    self.query_cursor, profile = self.query_engine.profile_query_on_dataframe(
+                        df_original, query_str, params=params)
+                self._show_profile(profile)
+            elif dataset is not None:
+                # Dataset diferido: la consulta se resuelve por completo en DuckDB
+                self.query_cursor = self.query_engine.open_cursor_on_dataset(dataset, query_str, params=params)
+            else:
+                self.query_cursor = self.query_engine.open_cursor_on_dataframe(df_original, query_str,
+                                                                               params=params)
 
-            if not result_df.empty:
-                self.results_table_display.update_dataframe(result_df, "Resultados de la Consulta")
-                self.query_status.value = f"Consulta ejecutada exitosamente. Se encontraron {len(result_df)} resultados."
+            first_page = self.query_cursor.page(0)
+            self.last_query = query_str
+            self.last_params = params
+            if not first_page.empty:
+                self._render_page(first_page)
+                total_rows = self.query_cursor.total_rows
+                found = f"{total_rows:,}" if total_rows is not None else "varios"
+                self.query_status.value = f"Consulta ejecutada exitosamente. Se encontraron {found} resultados."
+                if self.query_cursor.last_page_cached:
+                    stats = self.query_engine.cache_stats()
+                    self.query_status.value += (f" (resultado en caché; aciertos: {stats['hits']}, "
+                                                f"fallos: {stats['misses']})")
+                elif self.query_cursor.plan_reused:
+                    self.query_status.value += " (plan preparado reutilizado)"
                 self.query_status.color = ft.Colors.GREEN_ACCENT_700
             else:
+                self._close_cursor()
                 self.results_table_display.update_dataframe(pd.DataFrame(), "La consulta no devolvió resultados.")
                 self.query_status.value = "Consulta ejecutada, pero no hay resultados."
                 self.query_status.color = ft.Colors.AMBER_700
 
+        except QueryCancelledError as ex:
+            self._close_cursor()
+            self.results_table_display.update_dataframe(pd.DataFrame(), "Consulta cancelada.")
+            self.query_status.value = str(ex)
+            self.query_status.color = ft.Colors.AMBER_700
+        except QueryLimitError as ex:
+            self._close_cursor()
+            self.results_table_display.update_dataframe(pd.DataFrame(), "La consulta superó un límite del motor.")
+            self.query_status.value = f"Límite superado: {ex}"
+            self.query_status.color = ft.Colors.RED_ACCENT_700
         except Exception as ex:
+            self._close_cursor()
             self.results_table_display.update_dataframe(pd.DataFrame(), "Error al ejecutar la consulta.")
             self.query_status.value = f"Error: {ex}"
             self.query_status.color = ft.Colors.RED_ACCENT_700
             print(f"Error en consulta: {ex}")
 
+        self._set_running(False)
+        self.save_result_button.disabled = self.last_query is None
+        self.derived_button.disabled = self.last_query is None
+        self._refresh_history()
+        self._refresh_catalog()
         if self.page is not None:
-            self.page.update()
\ No newline at end of file
+            self.page.update()
+
+    def handle_cancel_query(self, e):
+        """Cancela la consulta en ejecución (Flet atiende este evento en otro hilo)."""
+        if self.query_engine.cancel():
+            self.query_status.value = "Cancelando consulta..."
+            self.query_status.color = ft.Colors.AMBER_700
+            if self.page is not None:
+                self.page.update()
+
+    def _set_running(self, running):
+        """Muestra el botón Cancelar y bloquea Ejecutar mientras corre una consulta."""
+        self.execute_button.disabled = running
+        self.cancel_button.visible = running
+
+    def _show_page(self, index):
+        """Trae y muestra otra página del resultado de la última consulta."""
+        if self.query_cursor is None or index < 0:
+            return
+        self._set_running(True)
+        try:
+            page_df = self.query_cursor.page(index)
+            if page_df.empty and index > 0:
+                # Fin del resultado (cuando no se conoce el total de filas)
+                self.next_page_button.disabled = True
+            else:
+                self.current_page = index
+                self._render_page(page_df)
+        except Exception as ex:
+            self.query_status.value = f"Error al leer la página: {ex}"
+            self.query_status.color = ft.Colors.RED_ACCENT_700
+            print(f"Error en consulta: {ex}")
+        self._set_running(False)
+        if self.page is not None:
+            self.page.update()
+
+    def _render_page(self, page_df):
+        """Muestra una página en la tabla y actualiza los controles de paginación."""
+        cursor = self.query_cursor
+        first_row = self.current_page * cursor.page_size + 1
+        last_row = first_row + len(page_df) - 1
+        if cursor.total_rows is not None:
+            self.page_info_text.value = (f"Filas {first_row:,}–{last_row:,} de {cursor.total_rows:,} "
+                                         f"(página {self.current_page + 1} de {cursor.num_pages})")
+            has_next = self.current_page + 1 < cursor.num_pages
+        else:
+            self.page_info_text.value = f"Filas {first_row:,}–{last_row:,}"
+            has_next = len(page_df) == cursor.page_size
+        self.prev_page_button.disabled = self.current_page == 0
+        self.next_page_button.disabled = not has_next
+        self.pagination_row.visible = True
+        self.results_table_display.update_dataframe(page_df, "Resultados de la Consulta")
+
+    def _show_profile(self, profile):
+        """Muestra el árbol de operadores del perfil con su tiempo, filas y memoria."""
+        slowest = profile.slowest_operator()
+        max_seconds = slowest["seconds"] if slowest and slowest["seconds"] > 0 else None
+        header = f"Tiempo total: {profile.wall_seconds * 1000:,.1f} ms"
+        if profile.latency_seconds is not None:
+            header += f" · DuckDB: {profile.latency_seconds * 1000:,.1f} ms"
+        if profile.peak_memory_bytes:
+            header += f" · Memoria máxima: {profile.peak_memory_bytes / 1024 ** 2:,.1f} MB"
+        controls = [
+            ft.Text("Perfil de la consulta", weight=ft.FontWeight.BOLD),
+            ft.Text(header, size=12),
+        ]
+        for op in profile.operators:
+            size = f" · {op['bytes'] / 1024 ** 2:,.1f} MB" if op["bytes"] is not None else ""
+            controls.append(ft.Row(
+                [
+                    ft.Container(width=16 * op["depth"]),
+                    ft.Text(op["name"], weight=ft.FontWeight.BOLD, size=12, tooltip=op["details"] or None),
+                    ft.Text(f"{op['seconds'] * 1000:,.1f} ms · {op['rows']:,} filas{size}", size=12),
+                    ft.ProgressBar(
+                        value=op["seconds"] / max_seconds if max_seconds else 0,
+                        width=120,
+                        color=ft.Colors.RED_400 if op is slowest else ft.Colors.BLUE_300,
+                    ),
+                ],
+                spacing=8,
+            ))
+        self.profile_column.controls = controls
+        self.profile_panel.visible = True
+
+    def did_mount(self):
+        """Al mostrar la vista, actualiza el catálogo con los archivos cargados desde otras vistas."""
+        self._refresh_catalog()
+        self.update()
+
+    def _refresh_catalog(self):
+        """Actualiza la lista de tablas del catálogo del motor."""
+        items = []
+        for table in self.query_engine.list_tables():
+            source = os.path.basename(table["source"]) if table["source"] else "memoria"
+            details = [source, table["kind"]]
+            if table["rows"] is not None:
+                details.append(f"{table['rows']:,} filas")
+            columns = table["columns"]
+            details.append(f"{len(columns)} columnas: {', '.join(columns[:8])}{'…' if len(columns) > 8 else ''}")
+            if table["kind"] == "derivada":
+                details.append("se actualiza sola" if table["auto_refresh"] else "actualización manual")
+                if table["stale"]:
+                    details.append("desactualizada")
+            removable = table["name"] != self.query_engine.TABLE_NAME
+            buttons = []
+            if table["kind"] == "derivada":
+                buttons.append(ft.IconButton(
+                    ft.Icons.REFRESH,
+                    tooltip=table["error"] or "Recalcular con los datos actuales",
+                    icon_color=ft.Colors.AMBER_700 if table["stale"] else None,
+                    on_click=lambda _, name=table["name"]: self._refresh_derived(name),
+                ))
+            if removable:
+                buttons.append(ft.IconButton(
+                    ft.Icons.DELETE_OUTLINE,
+                    tooltip="Eliminar la tabla guardada" if table["kind"] == "almacenada" else "Quitar del catálogo",
+                    on_click=lambda _, name=table["name"], kind=table["kind"]: self._remove_table(name, kind),
+                ))
+            items.append(ft.ListTile(
+                title=ft.Text(table["name"], weight=ft.FontWeight.BOLD, size=13),
+                subtitle=ft.Text(" · ".join(details), size=11),
+                dense=True,
+                on_click=lambda _, name=table["name"]: self._insert_table_name(name),
+                trailing=ft.Row(buttons, tight=True, spacing=0) if buttons else None,
+            ))
+        if not items:
+            items.append(ft.Text("Carga un archivo para consultarlo.", size=12, italic=True))
+        self.catalog_column.controls = items
+
+    def _insert_table_name(self, name):
+        """Añade el nombre de una tabla al final de la consulta."""
+        current = self.query_input.value or ""
+        self.query_input.value = f"{current} {name}" if current.strip() else f"SELECT * FROM {name}"
+        if self.page is not None:
+            self.page.update()
+
+    def _remove_table(self, name, kind=None):
+        """
+        Quita una tabla del catálogo (libera el DataFrame si nada más lo usa). Las
+        tablas guardadas se borran de la base de datos, después de confirmarlo.
+        """
+        if kind != "almacenada":
+            self.query_engine.remove_table(name)
+            self._refresh_catalog()
+            if self.page is not None:
+                self.page.update()
+            return
+
+        def drop(_):
+            if self.page is not None:
+                self.page.close(dialog)
+            self.query_engine.drop_stored_table(name)
+            self.query_status.value = f"Tabla guardada '{name}' eliminada."
+            self.query_status.color = ft.Colors.AMBER_700
+            self._refresh_catalog()
+            if self.page is not None:
+                self.page.update()
+
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Eliminar tabla guardada"),
+            content=ft.Text(f"¿Eliminar la tabla '{name}' de la base de datos? No se puede deshacer."),
+            actions=[
+                ft.TextButton("Cancelar", on_click=lambda _: self.page.close(dialog)),
+                ft.TextButton("Eliminar", on_click=drop),
+            ],
+        )
+        if self.page is not None:
+            self.page.open(dialog)
+        else:
+            drop(None)
+
+    def handle_save_result(self, e):
+        """Guarda el resultado de la última consulta como tabla con el nombre indicado."""
+        name = (self.save_name_field.value or "").strip()
+        if self.last_query is None:
+            return
+        self._set_running(True)
+        if self.page is not None:
+            self.page.update()
+        try:
+            rows = self.query_engine.save_result_as_table(self.last_query, name, params=self.last_params)
+            where = "en la base de datos" if self.query_engine.is_persistent else "para esta sesión"
+            self.query_status.value = f"Resultado guardado {where} como tabla '{name}' ({rows:,} filas)."
+            self.query_status.color = ft.Colors.GREEN_ACCENT_700
+            self._refresh_catalog()
+        except Exception as ex:
+            self.query_status.value = f"Error al guardar el resultado: {ex}"
+            self.query_status.color = ft.Colors.RED_ACCENT_700
+        self._set_running(False)
+        if self.page is not None:
+            self.page.update()
+
+    def handle_create_derived(self, e):
+        """Materializa el resultado de la última consulta como tabla derivada del catálogo."""
+        name = (self.save_name_field.value or "").strip()
+        if self.last_query is None:
+            return
+        self._set_running(True)
+        if self.page is not None:
+            self.page.update()
+        try:
+            rows = self.query_engine.create_derived_table(self.last_query, name, params=self.last_params,
+                                                          auto_refresh=bool(self.auto_refresh_checkbox.value))
+            self.query_status.value = (f"Tabla derivada '{name}' creada ({rows:,} filas). "
+                                       f"Las consultas sobre ella no recalculan la consulta original.")
+            self.query_status.color = ft.Colors.GREEN_ACCENT_700
+            self._refresh_catalog()
+        except Exception as ex:
+            self.query_status.value = f"Error al crear la tabla derivada: {ex}"
+            self.query_status.color = ft.Colors.RED_ACCENT_700
+        self._set_running(False)
+        if self.page is not None:
+            self.page.update()
+
+    def _refresh_derived(self, name):
+        """Recalcula una tabla derivada con los datos actuales."""
+        try:
+            rows = self.query_engine.refresh_derived_table(name)
+            self.query_status.value = f"Tabla derivada '{name}' actualizada ({rows:,} filas)."
+            self.query_status.color = ft.Colors.GREEN_ACCENT_700
+        except Exception as ex:
+            self.query_status.value = f"Error al actualizar la tabla derivada '{name}': {ex}"
+            self.query_status.color = ft.Colors.RED_ACCENT_700
+        self._refresh_catalog()
+        if self.page is not None:
+            self.page.update()
+
+    def handle_vacuum(self, e):
+        """Compacta la base de datos persistente y muestra el tamaño del archivo."""
+        try:
+            size_before, size_after = self.query_engine.vacuum()
+            self.query_status.value = (f"Base de datos compactada: {size_before / 1024 ** 2:,.1f} MB → "
+                                       f"{size_after / 1024 ** 2:,.1f} MB.")
+            self.query_status.color = ft.Colors.GREEN_ACCENT_700
+        except Exception as ex:
+            self.query_status.value = f"Error al compactar la base de datos: {ex}"
+            self.query_status.color = ft.Colors.RED_ACCENT_700
+        if self.page is not None:
+            self.page.update()
+
+    def _refresh_history(self):
+        """Actualiza la lista del historial; al pulsar una entrada se copia su consulta."""
+        history = self.query_engine.history
+        if history is None:
+            self.history_panel.visible = False
+            return
+        items = []
+        for entry in history.entries(limit=20):
+            duration = f"{entry['seconds'] * 1000:,.1f} ms"
+            color = None
+            previous = entry.get("previous_seconds")
+            if previous and entry["status"] == "ok" and not entry.get("cached"):
+                change = entry["seconds"] / previous - 1
+                duration += f" ({change:+.0%} vs. anterior)"
+                if change > 0.5:
+                    color = ft.Colors.RED_ACCENT_700 # Posible regresión
+            details = [entry["timestamp"], duration, entry["status"]]
+            if entry.get("rows") is not None:
+                details.append(f"{entry['rows']:,} filas")
+            if entry.get("cached"):
+                details.append("caché")
+            if entry.get("profiled"):
+                details.append("perfilada")
+            items.append(ft.ListTile(
+                title=ft.Text(entry["query"], size=12, max_lines=2, overflow=ft.TextOverflow.ELLIPSIS),
+                subtitle=ft.Text(" · ".join(details), size=11, color=color),
+                dense=True,
+                on_click=lambda _, query=entry["query"], params=entry.get("params"):
+                    self._use_history_query(query, params),
+            ))
+        if not items:
+            items.append(ft.Text("Todavía no hay consultas en el historial.", size=12, italic=True))
+        self.history_column.controls = items
+
+    def _use_history_query(self, query, params=None):
+        """Copia una consulta del historial (y los valores de sus parámetros) en el formulario."""
+        self.query_input.value = query
+        self._refresh_parameter_form()
+        for name, value in (params or {}).items():
+            if name in self.param_fields:
+                self.param_fields[name].value = "" if value is None else str(value)
+        if self.page is not None:
+            self.page.update()
+
+    def _refresh_parameter_form(self):
+        """Muestra un campo por cada parámetro $nombre de la consulta, conservando los valores escritos."""
+        names = query_parameters(self.query_input.value or "")
+        fields = []
+        for name in names:
+            field = self.param_fields.get(name)
+            if field is None:
+                field = ft.TextField(label=f"${name}", width=180, dense=True,
+                                     hint_text="vacío = NULL",
+                                     on_submit=self.handle_execute_query)
+                self.param_fields[name] = field
+            fields.append(field)
+        self.params_row.controls = [ft.Text("Parámetros:", weight=ft.FontWeight.BOLD)] + fields if fields else []
+        self.params_row.visible = bool(fields)
+        if self.page is not None:
+            self.page.update()
+
+    def _parameter_values(self):
+        """Valores del formulario de parámetros, o None si la consulta no tiene parámetros."""
+        names = query_parameters(self.query_input.value or "")
+        if not names:
+            return None
+        return {name: self._parse_parameter(self.param_fields[name].value if name in self.param_fields else "")
+                for name in names}
+
+    @staticmethod
+    def _parse_parameter(text):
+        """
+        Interpreta el texto de un parámetro: vacío es NULL; enteros, decimales,
+        true/false y fechas AAAA-MM-DD toman su tipo; entre comillas, o cualquier
+        otro texto, es una cadena.
+        """
+        text = (text or "").strip()
+        if not text:
+            return None
+        if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+            return text[1:-1]
+        if re.fullmatch(r"[-+]?\d+", text):
+            return int(text)
+        if re.fullmatch(r"[-+]?(\d+\.\d*|\.\d+)([eE][-+]?\d+)?|[-+]?\d+[eE][-+]?\d+", text):
+            return float(text)
+        if text.lower() in ("true", "false"):
+            return text.lower() == "true"
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+            try:
+                return datetime.date.fromisoformat(text)
+            except ValueError:
+                return text
+        return text
+
+    def _close_cursor(self):
+        """Cierra el resultado paginado anterior y oculta la paginación."""
+        if self.query_cursor is not None:
+            self.query_cursor.close()
+            self.query_cursor = None
+        self.current_page = 0
+        self.pagination_row.visible = False
@@ -52,9 +52,10 @@ class SearchPage(ft.Container): # Hereda de ft.Container
         Realiza la búsqueda en el DataFrame cargado y actualiza DataTableCustom.
         """
         df = self.app_state.get_dataframe()
+        dataset = self.app_state.get_dataset()
         search_text = (self.search_input.value or "").strip()
 
-        if df is None:
+        if df is None and dataset is None:
             self.search_status.value = "Error: No hay un DataFrame cargado para buscar."
             self.search_status.color = ft.Colors.ORANGE_700
             self.results_table_display.update_dataframe(pd.DataFrame(), "Carga un archivo primero.")
@@ -76,7 +77,12 @@ class SearchPage(ft.Container): # Hereda de ft.Container
             self.page.update()
 
         try:
-            string_columns = df.select_dtypes(include='object').columns
+            if dataset is not None:
+                # Dataset diferido: la búsqueda se traduce a ILIKE y se ejecuta en DuckDB
+                string_columns = pd.Index(dataset.text_columns())
+            else:
+                # Incluye las columnas optimizadas como 'category' o cadenas de Arrow
+                string_columns = df.select_dtypes(include=['object', 'string', 'category']).columns
 
             if string_columns.empty:
                 self.search_status.value = "No hay columnas de texto para buscar en este DataFrame."
@@ -86,11 +92,14 @@ class SearchPage(ft.Container): # Hereda de ft.Container
                     self.page.update()
                 return
 
-            mask = df[string_columns].astype(str).apply(
-                lambda col: col.str.contains(search_text, case=False, na=False)
-            ).any(axis=1)
+            if dataset is not None:
+                df_results = dataset.search(search_text)
+            else:
+                mask = df[string_columns].astype(str).apply(
+                    lambda col: col.str.contains(search_text, case=False, na=False)
+                ).any(axis=1)
 
-            df_results = df[mask]
+                df_results = df[mask]
 
             if not df_results.empty:
                 self.results_table_display.update_dataframe(df_results, f"Resultados para '{search_text}'")
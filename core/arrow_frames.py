@@ -0,0 +1,83 @@
+import pandas as pd
+
+try:
+    import pyarrow as pa # Formato de intercambio sin copias (opcional)
+except ImportError:
+    pa = None
+
+def fetch_arrow_table(result):
+    """
+    Retorna el resultado de una consulta de DuckDB como tabla de Arrow.
+    to_arrow_table reemplaza a fetch_arrow_table en versiones recientes de DuckDB.
+    """
+    to_table = getattr(result, "to_arrow_table", None) or result.fetch_arrow_table
+    return to_table()
+
+def fetch_frame(result) -> pd.DataFrame:
+    """
+    Trae el resultado de una consulta de DuckDB a un DataFrame respaldado por
+    Arrow, sin la conversión fila a fila de fetchdf(). Sin pyarrow, usa fetchdf().
+    """
+    if pa is None:
+        return result.fetchdf()
+    return arrow_to_pandas(fetch_arrow_table(result))
+
+def arrow_to_pandas(data) -> pd.DataFrame:
+    """
+    Convierte una tabla o lote de Arrow en un DataFrame respaldado por Arrow
+    (columnas pd.ArrowDtype). Las columnas siguen apuntando a los buffers de
+    Arrow, así que no se copian datos ni se convierten tipos.
+
+    Args:
+        data (pa.Table | pa.RecordBatch): Los datos de Arrow.
+
+    Returns:
+        pd.DataFrame: El DataFrame con columnas pd.ArrowDtype.
+    """
+    return data.to_pandas(types_mapper=pd.ArrowDtype)
+
+def is_arrow_backed(df: pd.DataFrame) -> bool:
+    """Indica si todas las columnas del DataFrame son pd.ArrowDtype."""
+    return len(df.columns) > 0 and all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+
+def to_arrow_backed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte un DataFrame de NumPy en uno respaldado por Arrow (una sola copia,
+    para lectores que no producen Arrow). Conserva el índice y los attrs. Si
+    pyarrow no está instalado o alguna columna no se puede representar en Arrow
+    (p. ej. objetos de tipos mezclados), retorna el DataFrame sin cambios.
+    """
+    if pa is None or is_arrow_backed(df):
+        return df
+    try:
+        result = arrow_to_pandas(pa.Table.from_pandas(df, preserve_index=False))
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return df
+    result.index = df.index
+    result.attrs = dict(df.attrs)
+    return result
+
+def to_arrow_table(data):
+    """
+    Retorna los datos como tabla de Arrow. Las columnas pd.ArrowDtype se pasan
+    sin copia; las columnas de NumPy se convierten. El índice no se conserva.
+
+    Args:
+        data (pd.DataFrame | pa.Table): Los datos.
+
+    Returns:
+        pa.Table: La tabla de Arrow.
+    """
+    if not isinstance(data, pd.DataFrame):
+        return data
+    return pa.Table.from_pandas(data, preserve_index=False)
+
+def scan_source(df):
+    """
+    Retorna el objeto que conviene registrar en DuckDB para consultar el DataFrame:
+    si está respaldado por Arrow, su tabla de Arrow (DuckDB la lee sin copia ni
+    conversión de tipos); si no, el propio DataFrame.
+    """
+    if pa is not None and isinstance(df, pd.DataFrame) and is_arrow_backed(df):
+        return to_arrow_table(df)
+    return df
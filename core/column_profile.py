@@ -0,0 +1,211 @@
+import time
+import duckdb
+import numpy as np
+import pandas as pd
+from typing import Optional
+from core.arrow_frames import scan_source
+from core.lazy_dataset import NUMERIC_TYPE_PREFIXES, LazyDataset, quote_identifier
+
+class ColumnProfile:
+    """
+    Perfil de las columnas de un DataFrame o LazyDataset: por cada columna, el
+    número de valores, los nulos, una estimación de valores distintos, el mínimo
+    y el máximo, y en las numéricas la media, la desviación típica y los cuartiles;
+    en las no numéricas, los valores más frecuentes.
+
+    Todo se calcula en una sola consulta de agregación de DuckDB (un único
+    recorrido de los datos, en paralelo), en lugar de un recorrido por cada
+    estadística (isnull().sum(), describe(), value_counts()...). Los valores
+    distintos se estiman con HyperLogLog y los más frecuentes con approx_top_k.
+    En un DataFrame los cuartiles se calculan con NumPy (exactos, como describe());
+    en un LazyDataset, con approx_quantile de DuckDB para no traer los datos. Con
+    exact_quantiles=False quedan sin calcular, para rellenarlos con un boceto
+    (ColumnSketch) y su cota de error en 'quantile_rank_error'.
+    """
+
+    # Estadísticas de describe() (mismo orden e índice que DataFrame.describe())
+    DESCRIBE_STATS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+    QUANTILES = (0.25, 0.5, 0.75)
+
+    def __init__(self, num_rows: int, columns: dict, dtypes: dict, seconds: float,
+                 approximate: bool = False):
+        """
+        Args:
+            num_rows (int): Filas de los datos perfilados.
+            columns (dict): Columna -> diccionario con 'name', 'type' (tipo de DuckDB), 'numeric',
+                       'count', 'nulls', 'distinct', 'min', 'max', 'mean', 'std',
+                       'quantiles' (25%, 50%, 75%), 'quantile_rank_error' (cota del error
+                       de rango si los cuartiles son de un boceto) y 'top_values'.
+            dtypes (dict): Columna -> tipo a mostrar (el de Pandas en un DataFrame).
+            seconds (float): Duración del cálculo.
+            approximate (bool): Si los datos son una muestra (vista previa).
+        """
+        self.num_rows = num_rows
+        self.columns = columns
+        self.dtypes = dtypes
+        self.seconds = seconds
+        self.approximate = approximate
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, top_k: int = 5, exact_quantiles: bool = True):
+        """
+        Perfila un DataFrame. Se consulta con una conexión de DuckDB propia, sin
+        copiarlo (las columnas Arrow se leen directamente).
+
+        Args:
+            df (pd.DataFrame): Los datos.
+            top_k (int): Valores más frecuentes a guardar por columna no numérica.
+            exact_quantiles (bool): Si es False, no se calculan los cuartiles.
+
+        Returns:
+            ColumnProfile: El perfil.
+        """
+        started = time.perf_counter()
+        connection = duckdb.connect()
+        try:
+            connection.register("perfil", scan_source(df))
+            _, profiled = cls._profile_table(connection, "perfil", top_k, quantiles_in_sql=False)
+        finally:
+            connection.close()
+        # DuckDB puede renombrar columnas (nombres no textuales o repetidos): se asocian por posición
+        columns = {}
+        for i, (column, stats) in enumerate(zip(df.columns, profiled)):
+            if exact_quantiles and stats["numeric"] and stats["count"]:
+                stats["quantiles"] = cls._numpy_quantiles(df.iloc[:, i])
+            columns[column] = stats
+        dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        return cls(len(df), columns, dtypes, time.perf_counter() - started,
+                   approximate="sample_info" in df.attrs)
+
+    @classmethod
+    def from_dataset(cls, dataset: LazyDataset, top_k: int = 5):
+        """
+        Perfila un LazyDataset en DuckDB, sobre un cursor propio y sin traer las
+        filas a Pandas. Los cuartiles son aproximados (approx_quantile).
+
+        Returns:
+            ColumnProfile: El perfil.
+        """
+        started = time.perf_counter()
+        cursor = dataset.cursor()
+        try:
+            num_rows, profiled = cls._profile_table(cursor, dataset.table_name, top_k, quantiles_in_sql=True)
+        finally:
+            cursor.close()
+        columns = {stats["name"]: stats for stats in profiled}
+        return cls(num_rows, columns, {name: stats["type"] for name, stats in columns.items()},
+                   time.perf_counter() - started)
+
+    @classmethod
+    def _profile_table(cls, connection: duckdb.DuckDBPyConnection, table_name: str, top_k: int,
+                       quantiles_in_sql: bool):
+        """
+        Calcula las estadísticas de todas las columnas de la tabla en una sola consulta.
+
+        Returns:
+            tuple: (filas de la tabla, lista con las estadísticas de cada columna en orden).
+        """
+        table = quote_identifier(table_name)
+        types = connection.execute(f"DESCRIBE {table}").fetchall()
+        aggregates = ["COUNT(*)"]
+        for name, column_type, *_ in types:
+            col = quote_identifier(name)
+            aggregates += [f"COUNT({col})", f"APPROX_COUNT_DISTINCT({col})", f"MIN({col})", f"MAX({col})"]
+            if column_type.startswith(NUMERIC_TYPE_PREFIXES):
+                aggregates += [f"AVG({col})", f"STDDEV_SAMP({col})"]
+                if quantiles_in_sql:
+                    quantiles = ", ".join(str(q) for q in cls.QUANTILES)
+                    aggregates.append(f"APPROX_QUANTILE({col}, [{quantiles}])")
+            else:
+                aggregates.append(f"APPROX_TOP_K({col}, {int(top_k)})")
+        values = iter(connection.execute(f"SELECT {', '.join(aggregates)} FROM {table}").fetchall()[0])
+
+        num_rows = next(values)
+        columns = []
+        for name, column_type, *_ in types:
+            numeric = column_type.startswith(NUMERIC_TYPE_PREFIXES)
+            count = next(values)
+            stats = {
+                "name": name,
+                "type": column_type,
+                "numeric": numeric,
+                "count": count,
+                "nulls": num_rows - count,
+                "distinct": next(values),
+                "min": next(values),
+                "max": next(values),
+                "mean": None,
+                "std": None,
+                "quantiles": None,
+                "quantile_rank_error": None,
+                "top_values": [],
+            }
+            if numeric:
+                stats["mean"] = next(values)
+                stats["std"] = next(values)
+                if quantiles_in_sql:
+                    stats["quantiles"] = next(values)
+            else:
+                stats["top_values"] = [value for value in next(values) or [] if value is not None]
+            columns.append(stats)
+        return num_rows, columns
+
+    @classmethod
+    def _numpy_quantiles(cls, series: pd.Series):
+        """Cuartiles exactos (interpolación lineal, como describe()) de los valores no nulos."""
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return None
+        return [float(q) for q in np.quantile(values, cls.QUANTILES)]
+
+    def missing_values(self) -> dict:
+        """Retorna un diccionario columna -> número de valores nulos."""
+        return {name: stats["nulls"] for name, stats in self.columns.items()}
+
+    def null_percent(self) -> dict:
+        """Retorna un diccionario columna -> porcentaje de valores nulos (redondeado a 2 decimales)."""
+        return {name: round(stats["nulls"] * 100 / self.num_rows, 2) if self.num_rows else 0.0
+                for name, stats in self.columns.items()}
+
+    def numeric_columns(self) -> list:
+        """Retorna los nombres de las columnas numéricas."""
+        return [name for name, stats in self.columns.items() if stats["numeric"]]
+
+    def describe(self) -> pd.DataFrame:
+        """
+        Retorna las estadísticas de las columnas numéricas con el formato de
+        DataFrame.describe() (estadísticas como índice). Vacío si no hay numéricas.
+        Si hay cuartiles de bocetos, `attrs['quantile_rank_error']` tiene su cota de
+        error por columna.
+        """
+        result = {}
+        for name in self.numeric_columns():
+            stats = self.columns[name]
+            quantiles = stats["quantiles"] or [None] * len(self.QUANTILES)
+            values = [stats["count"], stats["mean"], stats["std"], stats["min"], *quantiles, stats["max"]]
+            result[name] = [float(v) if v is not None else float('nan') for v in values]
+        if not result:
+            return pd.DataFrame()
+        desc = pd.DataFrame(result, index=self.DESCRIBE_STATS)
+        if self.approximate:
+            desc.attrs["approximate"] = True
+        rank_errors = {name: self.columns[name]["quantile_rank_error"] for name in result
+                       if self.columns[name]["quantile_rank_error"] is not None}
+        if rank_errors:
+            desc.attrs["quantile_rank_error"] = rank_errors
+        return desc
+
+    def top_values(self, column: str) -> list:
+        """Retorna los valores más frecuentes (estimados) de una columna no numérica."""
+        return self.columns[column]["top_values"]
+
+    def summary_text(self, column: str, max_values: Optional[int] = 5) -> str:
+        """Resumen de una columna en una línea: distintos, rango y valores más frecuentes."""
+        stats = self.columns[column]
+        parts = [f"~{stats['distinct']:,} distintos"]
+        if stats["min"] is not None:
+            parts.append(f"rango {stats['min']} – {stats['max']}")
+        if stats["top_values"]:
+            parts.append("más frecuentes: " + ", ".join(str(v) for v in stats["top_values"][:max_values]))
+        return "; ".join(parts)
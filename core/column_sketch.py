@@ -0,0 +1,367 @@
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+import numpy as np
+import pandas as pd
+from core.lazy_dataset import NUMERIC_TYPE_PREFIXES, LazyDataset, quote_identifier
+
+# Multiplicadores y sumandos de las funciones hash de cada fila del Count-Min. Son fijos
+# para que dos bocetos construidos por separado (p. ej. en hilos distintos) se puedan combinar.
+_CMS_SEEDS = np.random.default_rng(20240917).integers(1, 2 ** 63, size=(2, 8), dtype=np.uint64) | np.uint64(1)
+
+def hash_values(values: np.ndarray) -> np.ndarray:
+    """Hash de 64 bits de cada valor (el mismo valor y tipo da siempre el mismo hash)."""
+    return pd.util.hash_array(values, categorize=False)
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Número de bits significativos de cada entero sin signo (vectorizado con frexp)."""
+    _, exponents = np.frexp(values.astype(np.float64))
+    return exponents
+
+class ColumnSketch:
+    """
+    Resumen aproximado y combinable (sketch) de los valores de una columna, para
+    estadísticas sobre cientos de millones de filas sin ordenar ni contar todo:
+
+    - Valores distintos: HyperLogLog (2**precision registros; error relativo
+      típico 1.04 / sqrt(2**precision)).
+    - Cuantiles (solo columnas numéricas): compactadores estilo KLL de capacidad
+      quantile_k. Se lleva la cota (determinista) del error de rango acumulado
+      en cada compactación.
+    - Valores más frecuentes: resumen Misra-Gries de top_capacity contadores, que
+      nunca sobreestima (cota inferior), y Count-Min, que nunca subestima (cota
+      superior): el conteo real está siempre entre ambos.
+
+    Todas las estructuras se combinan con merge(): cada trozo de los datos se
+    resume por separado (en paralelo, ver sketch_frame y sketch_dataset) y los
+    resúmenes se combinan en uno solo, con las mismas garantías.
+    """
+
+    def __init__(self, numeric: bool, hll_precision: int = 14, quantile_k: int = 2048,
+                 cms_width: int = 4096, cms_depth: int = 5, top_capacity: int = 256, seed: int = 0):
+        """
+        Args:
+            numeric (bool): Si la columna es numérica (se calculan cuantiles).
+            hll_precision (int): Bits de índice de HyperLogLog (entre 4 y 18).
+            quantile_k (int): Elementos por nivel del boceto de cuantiles.
+            cms_width (int): Columnas del Count-Min (potencia de 2).
+            cms_depth (int): Filas (funciones hash) del Count-Min, como máximo 8.
+            top_capacity (int): Contadores del resumen Misra-Gries.
+            seed (int): Semilla de las compactaciones aleatorias de los cuantiles.
+        """
+        if cms_width & (cms_width - 1) or not 1 <= cms_depth <= _CMS_SEEDS.shape[1]:
+            raise ValueError("ColumnSketch Error: cms_width debe ser potencia de 2 y cms_depth estar entre 1 y 8.")
+        self.numeric = numeric
+        self.hll_precision = hll_precision
+        self.quantile_k = quantile_k
+        self.cms_width = cms_width
+        self.cms_depth = cms_depth
+        self.top_capacity = top_capacity
+        self.count = 0
+        self._registers = np.zeros(2 ** hll_precision, dtype=np.uint8)
+        self._levels = []
+        self._rank_error = 0.0
+        self._min = None
+        self._max = None
+        self._cms = np.zeros((cms_depth, cms_width), dtype=np.int64)
+        # valor -> [conteo Misra-Gries, hash del valor]
+        self._top = {}
+        # Total descontado a los contadores Misra-Gries (cota del conteo que falta)
+        self._top_decrement = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """
+        Añade un trozo de valores al boceto. Los nulos se ignoran.
+
+        Args:
+            values (np.ndarray | pd.Series): Los valores del trozo.
+        """
+        values = pd.Series(values).dropna().to_numpy()
+        if self.numeric:
+            values = values.astype(np.float64, copy=False)
+        if not len(values):
+            return
+        hashes = hash_values(values)
+        self.count += len(values)
+        self._update_hll(hashes)
+        self._update_cms(hashes)
+        self._update_top(values)
+        if self.numeric:
+            self._update_quantiles(values)
+
+    def _update_hll(self, hashes: np.ndarray):
+        """Guarda en cada registro el máximo de la posición del primer bit a 1."""
+        p = self.hll_precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        # El bit centinela limita el rango a 64 - p + 1 cuando el resto del hash es 0
+        rest = (hashes << np.uint64(p)) | np.uint64(1 << (p - 1))
+        ranks = (64 - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self._registers, index, ranks)
+
+    def _cms_indexes(self, hashes: np.ndarray):
+        """Columna del Count-Min de cada hash, para cada fila (hash multiplicativo)."""
+        shift = np.uint64(64 - int(math.log2(self.cms_width)))
+        for row in range(self.cms_depth):
+            yield row, ((hashes * _CMS_SEEDS[0, row] + _CMS_SEEDS[1, row]) >> shift).astype(np.intp)
+
+    def _update_cms(self, hashes: np.ndarray):
+        """Suma cada valor en su columna de cada fila del Count-Min."""
+        for row, indexes in self._cms_indexes(hashes):
+            self._cms[row] += np.bincount(indexes, minlength=self.cms_width)
+
+    def _update_top(self, values: np.ndarray):
+        """Cuenta el trozo (exacto) y lo añade al resumen Misra-Gries."""
+        counts = pd.Series(values).value_counts(sort=True)
+        if len(counts) > self.top_capacity:
+            floor = int(counts.iloc[self.top_capacity])
+            counts = counts.iloc[:self.top_capacity] - floor
+            counts = counts[counts > 0]
+            self._top_decrement += floor
+        chunk_hashes = hash_values(counts.index.to_numpy())
+        for value, count, value_hash in zip(counts.index, counts.to_numpy(), chunk_hashes):
+            entry = self._top.get(value)
+            if entry is None:
+                self._top[value] = [int(count), value_hash]
+            else:
+                entry[0] += int(count)
+        self._trim_top()
+
+    def _trim_top(self):
+        """Deja como mucho top_capacity contadores restando el siguiente conteo (Misra-Gries)."""
+        if len(self._top) <= self.top_capacity:
+            return
+        counts = sorted((entry[0] for entry in self._top.values()), reverse=True)
+        floor = counts[self.top_capacity]
+        self._top = {value: [entry[0] - floor, entry[1]] for value, entry in self._top.items()
+                     if entry[0] > floor}
+        self._top_decrement += floor
+
+    def _update_quantiles(self, values: np.ndarray):
+        """
+        Añade el trozo al boceto de cuantiles. Un trozo grande se ordena una vez y se
+        muestrea cada 2**j elementos (equivale a j compactaciones seguidas) directamente
+        en el nivel j.
+        """
+        minimum, maximum = float(values.min()), float(values.max())
+        self._min = minimum if self._min is None else min(self._min, minimum)
+        self._max = maximum if self._max is None else max(self._max, maximum)
+        level = max(0, math.ceil(math.log2(len(values) / self.quantile_k))) if len(values) > self.quantile_k else 0
+        if level:
+            stride = 2 ** level
+            values = np.sort(values)[self._rng.integers(stride)::stride]
+            self._rank_error += stride
+        self._add_to_level(level, values)
+        self._compact()
+
+    def _add_to_level(self, level: int, values: np.ndarray):
+        """Añade valores (de peso 2**level) a un nivel del boceto de cuantiles."""
+        while len(self._levels) <= level:
+            self._levels.append(np.empty(0, dtype=np.float64))
+        self._levels[level] = np.concatenate([self._levels[level], values])
+
+    def _compact(self):
+        """
+        Compacta los niveles que superan quantile_k: se ordenan y se sube al nivel
+        siguiente uno de cada dos elementos (desde una posición al azar). Cada
+        compactación del nivel h añade como mucho 2**h al error de rango.
+        """
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self.quantile_k:
+                items = np.sort(items)
+                even = len(items) - len(items) % 2
+                self._levels[level] = items[even:]
+                self._add_to_level(level + 1, items[self._rng.integers(2):even:2])
+                self._rank_error += 2 ** level
+            level += 1
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        """
+        Combina otro boceto de la misma columna (con los mismos parámetros) en este.
+
+        Returns:
+            ColumnSketch: Este mismo boceto, ya combinado.
+        """
+        if (self.hll_precision, self.cms_width, self.cms_depth) != \
+                (other.hll_precision, other.cms_width, other.cms_depth):
+            raise ValueError("ColumnSketch Error: Solo se pueden combinar bocetos con los mismos parámetros.")
+        self.count += other.count
+        np.maximum(self._registers, other._registers, out=self._registers)
+        self._cms += other._cms
+        for value, (count, value_hash) in other._top.items():
+            entry = self._top.get(value)
+            if entry is None:
+                self._top[value] = [count, value_hash]
+            else:
+                entry[0] += count
+        self._top_decrement += other._top_decrement
+        self._trim_top()
+        if other._min is not None:
+            self._min = other._min if self._min is None else min(self._min, other._min)
+            self._max = other._max if self._max is None else max(self._max, other._max)
+        for level, items in enumerate(other._levels):
+            self._add_to_level(level, items)
+        self._rank_error += other._rank_error
+        self._compact()
+        return self
+
+    def distinct(self) -> int:
+        """Estimación de HyperLogLog del número de valores distintos."""
+        m = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self._registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self._registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Corrección para pocos valores: conteo lineal de registros vacíos
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def quantiles(self, quantiles):
+        """
+        Cuantiles aproximados de una columna numérica.
+
+        Args:
+            quantiles (iterable): Probabilidades entre 0 y 1.
+
+        Returns:
+            list: El valor de cada cuantil (None si no hay valores o la columna no es numérica).
+        """
+        if not self.numeric or not self.count:
+            return [None for _ in quantiles]
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+        result = []
+        for q in quantiles:
+            if q <= 0:
+                result.append(self._min)
+            elif q >= 1:
+                result.append(self._max)
+            else:
+                position = min(int(np.searchsorted(cumulative, q * cumulative[-1])), len(values) - 1)
+                result.append(float(values[position]))
+        return result
+
+    def top_values(self, n: int = 10) -> pd.DataFrame:
+        """
+        Valores más frecuentes con su conteo estimado y las cotas del conteo real.
+
+        Returns:
+            pd.DataFrame: Columnas 'value', 'count' (estimación), 'lower' y 'upper'
+                          (el conteo real está entre ambas), ordenado por 'count'.
+        """
+        if not self._top:
+            return pd.DataFrame(columns=["value", "count", "lower", "upper"])
+        values = list(self._top)
+        lower = np.array([self._top[value][0] for value in values], dtype=np.int64)
+        hashes = np.array([self._top[value][1] for value in values], dtype=np.uint64)
+        cms = np.full(len(values), np.iinfo(np.int64).max, dtype=np.int64)
+        for row, indexes in self._cms_indexes(hashes):
+            cms = np.minimum(cms, self._cms[row][indexes])
+        # Misra-Gries falta como mucho lo descontado; Count-Min nunca subestima
+        upper = np.minimum(cms, lower + self._top_decrement)
+        result = pd.DataFrame({"value": values, "count": upper, "lower": lower, "upper": upper})
+        return result.sort_values("count", ascending=False, kind="stable").head(n).reset_index(drop=True)
+
+    def error_bounds(self) -> dict:
+        """
+        Cotas de error de las estimaciones.
+
+        Returns:
+            dict: 'distinct_relative_error' (error típico relativo de HyperLogLog),
+                  'quantile_rank_error' (fracción máxima de filas de desvío del rango
+                  de un cuantil), 'top_count_error' (máximo que puede faltar a un
+                  conteo de Misra-Gries) y 'count_min_error' (exceso máximo del
+                  Count-Min con probabilidad 'count_min_confidence').
+        """
+        return {
+            "distinct_relative_error": 1.04 / math.sqrt(len(self._registers)),
+            "quantile_rank_error": self._rank_error / self.count if self.numeric and self.count else None,
+            "top_count_error": self._top_decrement,
+            "count_min_error": math.e / self.cms_width * self.count,
+            "count_min_confidence": 1 - math.exp(-self.cms_depth),
+        }
+
+def _sketch_chunk(chunk: dict, numeric: dict, options: dict, seed: int) -> dict:
+    """Construye los bocetos de las columnas de un trozo (se ejecuta en un hilo)."""
+    sketches = {}
+    for name, values in chunk.items():
+        sketch = ColumnSketch(numeric[name], seed=seed, **options)
+        sketch.update(values)
+        sketches[name] = sketch
+    return sketches
+
+def _build_parallel(chunks, numeric: dict, max_workers: Optional[int], options: dict) -> dict:
+    """
+    Resume cada trozo en un hilo del pool y combina los bocetos a medida que terminan.
+    Como mucho hay 2 * max_workers trozos en memoria a la vez.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    result = {name: ColumnSketch(is_numeric, **options) for name, is_numeric in numeric.items()}
+    pending = set()
+
+    def collect(done):
+        for future in done:
+            for name, sketch in future.result().items():
+                result[name].merge(sketch)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for seed, chunk in enumerate(chunks):
+            pending.add(executor.submit(_sketch_chunk, chunk, numeric, options, seed))
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(pending)
+    return result
+
+def sketch_frame(df: pd.DataFrame, columns: Optional[list] = None, chunk_rows: int = 1_000_000,
+                 max_workers: Optional[int] = None, **options) -> dict:
+    """
+    Construye en paralelo los bocetos de las columnas de un DataFrame, por trozos de
+    chunk_rows filas que se combinan al terminar.
+
+    Args:
+        df (pd.DataFrame): Los datos.
+        columns (list, optional): Columnas a resumir. Por defecto, todas.
+        chunk_rows (int): Filas por trozo.
+        max_workers (int, optional): Hilos. Por defecto, uno por núcleo.
+        **options: Parámetros de ColumnSketch (hll_precision, quantile_k...).
+
+    Returns:
+        dict: Columna -> ColumnSketch.
+    """
+    columns = list(df.columns) if columns is None else columns
+    numeric = {col: pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+               for col in columns}
+    chunks = ({col: df[col].iloc[start:start + chunk_rows] for col in columns}
+              for start in range(0, len(df), chunk_rows))
+    return _build_parallel(chunks, numeric, max_workers, options)
+
+def sketch_dataset(dataset: LazyDataset, columns: Optional[list] = None, chunk_rows: int = 1_000_000,
+                   max_workers: Optional[int] = None, **options) -> dict:
+    """
+    Igual que sketch_frame, pero sobre un LazyDataset: DuckDB lee el archivo en lotes
+    de Arrow de chunk_rows filas, sin cargarlo entero en memoria.
+
+    Returns:
+        dict: Columna -> ColumnSketch.
+    """
+    dtypes = dataset.dtypes
+    columns = list(dtypes) if columns is None else columns
+    numeric = {col: dtypes[col].startswith(NUMERIC_TYPE_PREFIXES) for col in columns}
+    cursor = dataset.cursor()
+    try:
+        select_list = ", ".join(quote_identifier(col) for col in columns)
+        result = cursor.execute(f"SELECT {select_list} FROM {quote_identifier(dataset.table_name)}")
+        # to_arrow_reader reemplaza a fetch_record_batch en versiones recientes de DuckDB
+        open_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+        reader = open_reader(chunk_rows)
+        chunks = ({col: batch.column(i).drop_null().to_numpy(zero_copy_only=False)
+                   for i, col in enumerate(columns)} for batch in reader)
+        return _build_parallel(chunks, numeric, max_workers, options)
+    finally:
+        cursor.close()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# Métodos de correlación admitidos
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+def correlation_matrix(values: np.ndarray, method: str = 'pearson', block_size: int = 128) -> np.ndarray:
+    """
+    Matriz de correlación entre las columnas de una matriz de datos (filas x columnas).
+
+    Se calcula por bloques de block_size columnas con productos de matrices (BLAS),
+    en lugar de un recorrido por cada par de columnas: cada bloque de la matriz de
+    resultado sale de unos pocos productos entre dos bloques de columnas, y la
+    memoria temporal queda acotada a filas x block_size. Como DataFrame.corr(), los
+    nulos (NaN) se excluyen por pares: cada correlación usa las filas en las que
+    ambas columnas tienen valor.
+
+    Args:
+        values (np.ndarray): Datos en float64, con NaN como nulo.
+        method (str): 'pearson' o 'spearman' (Pearson sobre los rangos de cada
+               columna; con nulos, los rangos se calculan por columna y no por par).
+        block_size (int): Columnas por bloque.
+
+    Returns:
+        np.ndarray: Matriz columnas x columnas (NaN en los pares sin al menos dos
+                    filas en común o con una columna constante).
+
+    Raises:
+        ValueError: Si el método no es válido.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Método de correlación no soportado: {method}")
+    if method == 'spearman':
+        values = pd.DataFrame(values, copy=False).rank(method='average').to_numpy(dtype=np.float64)
+
+    num_columns = values.shape[1]
+    mask = ~np.isnan(values)
+    has_nulls = not mask.all()
+    # Centrar cada columna en su media evita la cancelación de las sumas grandes
+    with np.errstate(invalid='ignore', divide='ignore'):
+        counts = mask.sum(axis=0)
+        means = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+    centered = np.where(mask, values - means, 0.0)
+    weights = mask.astype(np.float64) if has_nulls else None
+
+    result = np.empty((num_columns, num_columns), dtype=np.float64)
+    starts = range(0, num_columns, block_size)
+    for i in starts:
+        block_i = slice(i, min(i + block_size, num_columns))
+        for j in starts:
+            if j < i:
+                continue
+            block_j = slice(j, min(j + block_size, num_columns))
+            if has_nulls:
+                block = _pairwise_block(centered[:, block_i], weights[:, block_i],
+                                        centered[:, block_j], weights[:, block_j])
+            else:
+                block = _complete_block(centered[:, block_i], centered[:, block_j], len(values))
+            result[block_i, block_j] = block
+            result[block_j, block_i] = block.T
+    return np.clip(result, -1.0, 1.0, out=result)
+
+def _complete_block(x: np.ndarray, y: np.ndarray, num_rows: int) -> np.ndarray:
+    """Correlación entre dos bloques de columnas centradas, sin nulos."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        norm_x = np.sqrt(np.einsum('ij,ij->j', x, x))
+        norm_y = np.sqrt(np.einsum('ij,ij->j', y, y))
+        block = (x.T @ y) / np.outer(norm_x, norm_y)
+    if num_rows < 2:
+        block[:] = np.nan
+    return block
+
+def _pairwise_block(x: np.ndarray, mask_x: np.ndarray, y: np.ndarray, mask_y: np.ndarray) -> np.ndarray:
+    """
+    Correlación entre dos bloques de columnas centradas (nulos a 0) usando solo las
+    filas en que cada par tiene valor: las sumas por par salen de productos con las
+    máscaras de valores presentes.
+    """
+    n = mask_x.T @ mask_y
+    sum_x = x.T @ mask_y
+    sum_y = mask_x.T @ y
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = x.T @ y - sum_x * sum_y / n
+        var_x = (x * x).T @ mask_y - sum_x * sum_x / n
+        var_y = mask_x.T @ (y * y) - sum_y * sum_y / n
+        block = cov / np.sqrt(var_x * var_y)
+    block[n < 2] = np.nan
+    return block
@@ -1,10 +1,437 @@
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+import duckdb
+import numpy as np
 import pandas as pd
+from typing import Optional
+from core.column_profile import ColumnProfile
+from core.column_sketch import sketch_dataset, sketch_frame
+from core.correlation import CORRELATION_METHODS, correlation_matrix
+from core.lazy_dataset import LazyDataset, quote_identifier
+from core.parallel_profiler import ParallelProfiler
+from core.running_stats import RunningStats
 
 class DataAnalyzer:
     """
     Clase encargada de realizar análisis básicos sobre un DataFrame de Pandas.
+    También acepta un LazyDataset de DuckDB, en cuyo caso los cálculos se
+    ejecutan en DuckDB sin materializar los datos.
+
+    Si el DataFrame es una muestra (vista previa de DataLoader.load_preview), los
+    resultados se marcan como aproximados.
+
+    La información básica y las estadísticas descriptivas salen de un ColumnProfile,
+    calculado en un solo recorrido de los datos y guardado en caché mientras los
+    datos sean los mismos, así que las vistas pueden pedirlos varias veces sin
+    volver a recorrer el DataFrame.
+
+    En modo aproximado (automático a partir de APPROXIMATE_ROWS filas), los
+    cuartiles y los valores más frecuentes salen de bocetos combinables
+    (ColumnSketch) construidos en paralelo por trozos, en lugar de ordenar o
+    contar todos los valores; los resultados incluyen sus cotas de error.
+
+    En modo paralelo (automático en tablas anchas y grandes si hay varios núcleos),
+    el perfil exacto de un DataFrame se reparte por columnas entre los procesos de
+    un ParallelProfiler, que leen los datos de memoria compartida.
+
+    Las matrices de correlación (Pearson o Spearman) de las columnas numéricas se
+    calculan por bloques con productos de matrices, sobre una muestra aleatoria de
+    filas si los datos superan CORRELATION_SAMPLE_ROWS, y se guardan en la misma caché.
+
+    Para datos que crecen por el final (p. ej. un CSV al que se añaden filas),
+    append_rows actualiza agregados acumulados (RunningStats) solo con las filas
+    nuevas y deriva de ellos el perfil, sin volver a recorrer las anteriores.
     """
 
+    # Filas a partir de las cuales se usa el modo aproximado si no se fuerza
+    APPROXIMATE_ROWS = 50_000_000
+
+    # Filas a partir de las cuales la correlación se calcula sobre una muestra aleatoria
+    CORRELATION_SAMPLE_ROWS = 200_000
+
+    # Columnas y celdas a partir de las cuales se usa el modo paralelo si no se fuerza
+    PARALLEL_COLUMNS = 64
+    PARALLEL_CELLS = 5_000_000
+
+    def __init__(self, max_profiles: int = 4, approximate: Optional[bool] = None,
+                 parallel: Optional[bool] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_profiles (int): Perfiles que se conservan en caché (uno por conjunto de datos).
+            approximate (bool, optional): True o False fuerzan el modo aproximado;
+                       None lo activa según APPROXIMATE_ROWS.
+            parallel (bool, optional): True o False fuerzan el modo paralelo; None lo
+                       activa según PARALLEL_COLUMNS y PARALLEL_CELLS si hay varios núcleos.
+            max_workers (int, optional): Procesos del modo paralelo. Por defecto, uno por núcleo.
+        """
+        self.max_profiles = max_profiles
+        self.approximate = approximate
+        self.parallel = parallel
+        self.max_workers = max_workers
+        # Pool de procesos del modo paralelo (se crea en el primer uso)
+        self._parallel_profiler = None
+        # (id(datos), tipo) -> (referencia débil a los datos, fecha del archivo, valor)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def use_approximate(self, df) -> bool:
+        """Indica si las estadísticas de estos datos se calculan en modo aproximado."""
+        if self.approximate is not None:
+            return self.approximate
+        if df is None:
+            return False
+        num_rows = df.num_rows if isinstance(df, LazyDataset) else len(df)
+        return num_rows >= self.APPROXIMATE_ROWS
+
+    def use_parallel(self, df) -> bool:
+        """Indica si el perfil de estos datos se calcula en el pool de procesos."""
+        if not isinstance(df, pd.DataFrame) or not ParallelProfiler.is_available():
+            return False
+        if self.parallel is not None:
+            return self.parallel
+        return ((self.max_workers or os.cpu_count() or 1) > 1 and len(df.columns) >= self.PARALLEL_COLUMNS
+                and len(df) * len(df.columns) >= self.PARALLEL_CELLS)
+
+    def _get_parallel_profiler(self) -> ParallelProfiler:
+        """Retorna el ParallelProfiler del modo paralelo, creándolo si hace falta."""
+        if self._parallel_profiler is None:
+            self._parallel_profiler = ParallelProfiler(max_workers=self.max_workers)
+        return self._parallel_profiler
+
+    def close(self):
+        """Detiene los procesos del modo paralelo, si se crearon."""
+        if self._parallel_profiler is not None:
+            self._parallel_profiler.close()
+            self._parallel_profiler = None
+
+    def _cache_get(self, df, kind):
+        """Retorna el valor en caché de esos datos (None si no está o cambiaron)."""
+        mtime = os.path.getmtime(df.file_path) if isinstance(df, LazyDataset) else None
+        key = (id(df), kind)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0]() is df and cached[1] == mtime:
+                self._cache.move_to_end(key)
+                return cached[2]
+        return None
+
+    def _cache_put(self, df, kind, value):
+        """Guarda un valor calculado sobre esos datos (perfil o boceto de una columna)."""
+        mtime = os.path.getmtime(df.file_path) if isinstance(df, LazyDataset) else None
+        with self._lock:
+            self._cache[(id(df), kind)] = (weakref.ref(df), mtime, value)
+            self._cache.move_to_end((id(df), kind))
+            # Un perfil y los bocetos de sus columnas por conjunto de datos
+            datasets = list(dict.fromkeys(key[0] for key in self._cache))
+            for stale in datasets[:-self.max_profiles]:
+                for key in [key for key in self._cache if key[0] == stale]:
+                    del self._cache[key]
+
+    def get_profile(self, df):
+        """
+        Retorna el perfil de columnas de los datos (ver ColumnProfile), calculándolo
+        solo la primera vez. En un LazyDataset se recalcula si cambia el archivo.
+
+        Args:
+            df (pd.DataFrame | LazyDataset): Los datos a perfilar.
+
+        Returns:
+            ColumnProfile: El perfil, o None si no hay datos o DuckDB no puede
+                           perfilarlos (p. ej. columnas con listas u objetos).
+                           En modo aproximado, los cuartiles de un DataFrame
+                           salen de bocetos (ver get_sketches).
+        """
+        if df is None or (isinstance(df, pd.DataFrame) and len(df.columns) == 0):
+            return None
+        approximate = self.use_approximate(df)
+        profile = self._cache_get(df, ("perfil", approximate))
+        if profile is not None:
+            return profile
+
+        started = time.perf_counter()
+        profile = self._parallel_profile(df) if not approximate and self.use_parallel(df) else None
+        parallel = profile is not None
+        try:
+            if isinstance(df, LazyDataset):
+                # En DuckDB los cuartiles ya son aproximados (approx_quantile)
+                profile = ColumnProfile.from_dataset(df)
+            elif profile is None:
+                profile = ColumnProfile.from_dataframe(df, exact_quantiles=not approximate)
+        except duckdb.Error as e:
+            print(f"DataAnalyzer Error: No se pudo calcular el perfil de columnas: {e}")
+            return None
+        if approximate and isinstance(df, pd.DataFrame):
+            numeric = [col for col, stats in profile.columns.items() if stats["numeric"] and stats["count"]]
+            for col, sketch in self.get_sketches(df, numeric).items():
+                stats = profile.columns[col]
+                stats["quantiles"] = sketch.quantiles(ColumnProfile.QUANTILES)
+                stats["quantile_rank_error"] = sketch.error_bounds()["quantile_rank_error"]
+            profile.seconds = time.perf_counter() - started
+        mode = " (modo aproximado)" if approximate else " (en paralelo)" if parallel else ""
+        print(f"DataAnalyzer: Perfil de {len(profile.columns)} columnas calculado en {profile.seconds:.2f} s{mode}.")
+
+        self._cache_put(df, ("perfil", approximate), profile)
+        return profile
+
+    def _parallel_profile(self, df: pd.DataFrame):
+        """Perfil en el pool de procesos; None si falla (se calcula entonces en serie)."""
+        try:
+            return self._get_parallel_profiler().profile(df)
+        except (RuntimeError, ValueError, TypeError, NotImplementedError) as e:
+            # Columnas que Arrow no representa (p. ej. objetos mezclados) o pool caído
+            print(f"DataAnalyzer Error: Falló el perfil en paralelo, se calcula en serie: {e}")
+            self.close()
+            return None
+
+    def get_scaling_report(self, df: pd.DataFrame, worker_counts: Optional[list] = None):
+        """
+        Mide cuánto acelera el perfil en paralelo según el número de procesos (ver
+        ParallelProfiler.scaling_report).
+
+        Args:
+            df (pd.DataFrame): Los datos.
+            worker_counts (list, optional): Procesos a probar. Por defecto, 1, 2, 4...
+                   hasta el número de núcleos.
+
+        Returns:
+            list: Un diccionario por número de procesos con 'workers', 'seconds',
+                  'speedup' y 'efficiency', o None si no se puede medir (datos
+                  de DuckDB, sin pyarrow o columnas que Arrow no representa).
+        """
+        if not isinstance(df, pd.DataFrame) or not ParallelProfiler.is_available():
+            print("DataAnalyzer Error: El informe de escalado requiere un DataFrame y pyarrow.")
+            return None
+        try:
+            return ParallelProfiler(max_workers=self.max_workers).scaling_report(df, worker_counts)
+        except (RuntimeError, ValueError, TypeError, NotImplementedError) as e:
+            print(f"DataAnalyzer Error: No se pudo medir el escalado: {e}")
+            return None
+
+    def get_sketches(self, df, columns: list):
+        """
+        Retorna los bocetos (ColumnSketch) de las columnas pedidas. Los que no están
+        en caché se construyen juntos, en paralelo por trozos, en un solo recorrido.
+
+        Args:
+            df (pd.DataFrame | LazyDataset): Los datos.
+            columns (list): Las columnas.
+
+        Returns:
+            dict: Columna -> ColumnSketch.
+        """
+        sketches = {col: self._cache_get(df, ("boceto", col)) for col in columns}
+        missing = [col for col, sketch in sketches.items() if sketch is None]
+        if missing:
+            if isinstance(df, LazyDataset):
+                built = sketch_dataset(df, missing)
+            else:
+                built = sketch_frame(df, missing)
+            for col, sketch in built.items():
+                self._cache_put(df, ("boceto", col), sketch)
+            sketches.update(built)
+        return sketches
+
+    def _cache_discard(self, df):
+        """Elimina de la caché todo lo calculado sobre esos datos."""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == id(df)]:
+                del self._cache[key]
+
+    def get_running_stats(self, df: pd.DataFrame) -> RunningStats:
+        """
+        Retorna los agregados acumulados de un DataFrame (ver RunningStats). La
+        primera vez se calculan sobre todas las filas, en paralelo por trozos.
+
+        Args:
+            df (pd.DataFrame): Los datos.
+
+        Returns:
+            RunningStats: Los agregados.
+        """
+        running = self._cache_get(df, "acumulados")
+        if running is None:
+            started = time.perf_counter()
+            running = RunningStats.from_frame(df)
+            print(f"DataAnalyzer: Agregados acumulados de {len(df.columns)} columnas calculados "
+                  f"en {time.perf_counter() - started:.2f} s.")
+            self._cache_put(df, "acumulados", running)
+        return running
+
+    def append_rows(self, df: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Añade filas al final de un DataFrame y actualiza sus estadísticas recorriendo
+        solo las filas nuevas: los agregados acumulados se actualizan con ellas y el
+        perfil y los bocetos del resultado se derivan de los agregados. En el perfil,
+        conteos, nulos, rango, media y desviación son exactos; distintos, cuartiles
+        y valores frecuentes salen de los bocetos, y los cuartiles llevan su cota de
+        error de rango ('quantile_rank_error'). Se guarda como perfil de los dos modos,
+        de modo que get_profile no vuelve a recorrer los datos combinados.
+
+        Args:
+            df (pd.DataFrame): Los datos actuales (dejan de estar en caché).
+            new_rows (pd.DataFrame): Las filas nuevas, con las mismas columnas.
+
+        Returns:
+            pd.DataFrame: Los datos con las filas añadidas. Sus `attrs` son los de df
+                          actualizados con los de new_rows.
+
+        Raises:
+            ValueError: Si las columnas de new_rows no son las de df.
+        """
+        if list(new_rows.columns) != list(df.columns):
+            raise ValueError("DataAnalyzer Error: Las filas nuevas no tienen las columnas de los datos.")
+        running = self.get_running_stats(df)
+        combined = _concat_rows(df, new_rows)
+        started = time.perf_counter()
+        running.update(new_rows)
+        dtypes = {col: str(dtype) for col, dtype in combined.dtypes.items()}
+        profile = running.to_profile(dtypes)
+        profile.seconds = time.perf_counter() - started
+        # Los tipos de DuckDB del perfil anterior siguen valiendo si el dtype no cambió
+        previous = self._cache_get(df, ("perfil", False)) or self._cache_get(df, ("perfil", True))
+        if previous is not None:
+            for col, stats in profile.columns.items():
+                if col in previous.columns and combined[col].dtype == df[col].dtype:
+                    stats["type"] = previous.columns[col]["type"]
+        print(f"DataAnalyzer: {len(new_rows):,} filas nuevas añadidas a las estadísticas "
+              f"en {profile.seconds:.2f} s ({running.num_rows:,} filas en total).")
+
+        # Los agregados pasan a ser los de los datos combinados
+        self._cache_discard(df)
+        self._cache_put(combined, "acumulados", running)
+        for approximate in (True, False):
+            self._cache_put(combined, ("perfil", approximate), profile)
+        for col in combined.columns:
+            self._cache_put(combined, ("boceto", col), running.sketch(col))
+        return combined
+
+    def get_correlation_matrix(self, df, method: str = 'pearson', columns: Optional[list] = None,
+                               max_rows: Optional[int] = None, seed: int = 0) -> pd.DataFrame:
+        """
+        Retorna la matriz de correlación de las columnas numéricas, calculada por
+        bloques (ver core.correlation) y guardada en caché mientras los datos sean
+        los mismos. Por encima de max_rows filas se usa una muestra aleatoria: el
+        error típico de cada coeficiente es del orden de 1 / sqrt(max_rows).
+
+        Args:
+            df (pd.DataFrame | LazyDataset): Los datos.
+            method (str): 'pearson' o 'spearman'.
+            columns (list, optional): Columnas a correlacionar (solo se usan las
+                   numéricas). Por defecto, todas las numéricas.
+            max_rows (int, optional): Filas de la muestra. Por defecto, CORRELATION_SAMPLE_ROWS.
+            seed (int): Semilla de la muestra.
+
+        Returns:
+            pd.DataFrame: Matriz columnas x columnas (vacía si hay menos de dos columnas
+                          numéricas). `attrs` tiene 'method', 'rows_used', 'total_rows',
+                          'sampled', 'seconds' y, si los datos son una muestra de vista
+                          previa, 'approximate'.
+
+        Raises:
+            ValueError: Si el método no es válido.
+        """
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"DataAnalyzer Error: Método de correlación no soportado: {method}")
+        if df is None:
+            return pd.DataFrame()
+        if isinstance(df, LazyDataset):
+            numeric = df.numeric_columns()
+        else:
+            numeric = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])
+                       and not pd.api.types.is_bool_dtype(df[col])]
+        if columns is not None:
+            numeric = [col for col in columns if col in numeric]
+        if len(numeric) < 2:
+            print("DataAnalyzer: Se necesitan al menos dos columnas numéricas para la correlación.")
+            return pd.DataFrame()
+        max_rows = max_rows or self.CORRELATION_SAMPLE_ROWS
+        kind = ("correlacion", method, tuple(numeric), max_rows, seed)
+        cached = self._cache_get(df, kind)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        values, total_rows = self._correlation_input(df, numeric, max_rows, seed)
+        matrix = pd.DataFrame(correlation_matrix(values, method), index=numeric, columns=numeric)
+        matrix.attrs.update(
+            method=method,
+            rows_used=len(values),
+            total_rows=total_rows,
+            sampled=len(values) < total_rows,
+            seconds=time.perf_counter() - started,
+        )
+        if self.get_sample_info(df) is not None:
+            matrix.attrs["approximate"] = True
+        print(f"DataAnalyzer: Matriz de correlación ({method}) de {len(numeric)} columnas sobre "
+              f"{len(values):,} de {total_rows:,} filas en {matrix.attrs['seconds']:.2f} s.")
+        self._cache_put(df, kind, matrix)
+        return matrix
+
+    def _correlation_input(self, df, columns: list, max_rows: int, seed: int):
+        """
+        Retorna (matriz float64 con NaN como nulo, filas totales) con las columnas
+        pedidas, sobre una muestra aleatoria de max_rows filas si hay más.
+        """
+        if isinstance(df, LazyDataset):
+            total_rows = df.num_rows
+            select_list = ", ".join(quote_identifier(col) for col in columns)
+            # El muestreo lo hace DuckDB: solo la muestra llega a Pandas
+            sample = (f" USING SAMPLE reservoir({int(max_rows)} ROWS) REPEATABLE ({int(seed)})"
+                      if total_rows > max_rows else "")
+            frame = df.query(f"SELECT {select_list} FROM {quote_identifier(df.table_name)}{sample}")
+        else:
+            total_rows = len(df)
+            frame = df[columns]
+            if total_rows > max_rows:
+                rows = np.sort(np.random.default_rng(seed).choice(total_rows, size=max_rows, replace=False))
+                frame = frame.iloc[rows]
+        return frame.to_numpy(dtype=np.float64, na_value=np.nan), total_rows
+
+    def get_strongest_correlations(self, df, method: str = 'pearson', top_n: int = 10, **options) -> pd.DataFrame:
+        """
+        Retorna los pares de columnas numéricas con mayor correlación en valor absoluto.
+
+        Args:
+            df (pd.DataFrame | LazyDataset): Los datos.
+            method (str): 'pearson' o 'spearman'.
+            top_n (int): Número de pares a retornar.
+            **options: Opciones de get_correlation_matrix (columns, max_rows, seed).
+
+        Returns:
+            pd.DataFrame: Columnas 'column_a', 'column_b' y 'correlation', ordenado de
+                          mayor a menor correlación absoluta (vacío si no hay pares).
+        """
+        matrix = self.get_correlation_matrix(df, method, **options)
+        if matrix.empty:
+            return pd.DataFrame(columns=["column_a", "column_b", "correlation"])
+        rows, cols = np.triu_indices(len(matrix), k=1)
+        values = matrix.to_numpy()[rows, cols]
+        valid = ~np.isnan(values)
+        order = np.argsort(-np.abs(values[valid]), kind="stable")[:top_n]
+        return pd.DataFrame({
+            "column_a": matrix.index[rows[valid][order]],
+            "column_b": matrix.columns[cols[valid][order]],
+            "correlation": values[valid][order],
+        })
+
+    def get_sample_info(self, df):
+        """
+        Retorna la información de muestreo de los datos, o None si no son una muestra.
+
+        Args:
+            df (pd.DataFrame): El DataFrame a revisar.
+
+        Returns:
+            dict: El contenido de `df.attrs['sample_info']` (filas de la muestra, filas
+                  recorridas, total estimado...), o None si los datos están completos.
+        """
+        if isinstance(df, LazyDataset) or df is None:
+            return None
+        return df.attrs.get("sample_info")
+
     def get_dataframe_info(self, df: pd.DataFrame):
         """
         Retorna información básica sobre el DataFrame.
@@ -14,24 +441,46 @@ class DataAnalyzer:
 
         Returns:
             dict: Un diccionario con información como número de filas, columnas,
-                  nombres de columnas y tipos de datos.
+                  nombres de columnas y tipos de datos. Si los datos son una muestra,
+                  'approximate' es True, 'num_rows' es el total estimado del archivo y
+                  'missing_values' se cuenta sobre la muestra.
         """
+        if isinstance(df, LazyDataset):
+            profile = self.get_profile(df)
+            return {
+                "num_rows": profile.num_rows if profile else df.num_rows,
+                "num_cols": len(df.columns),
+                "columns": list(df.columns),
+                "dtypes": df.dtypes,
+                "missing_values": profile.missing_values() if profile else df.missing_values(),
+                "approximate": False
+            }
+
         if df is None or df.empty:
             return {
                 "num_rows": 0,
                 "num_cols": 0,
                 "columns": [],
                 "dtypes": {},
-                "missing_values": {}
+                "missing_values": {},
+                "approximate": False
             }
 
+        sample_info = self.get_sample_info(df)
+        profile = self.get_profile(df)
         info = {
             "num_rows": len(df),
             "num_cols": len(df.columns),
             "columns": df.columns.tolist(),
             "dtypes": df.dtypes.apply(lambda x: str(x)).to_dict(), # Convertir dtypes a string
-            "missing_values": df.isnull().sum().to_dict() # Conteo de valores faltantes por columna
+            # Conteo de valores faltantes por columna (del perfil; sin él, recorriendo el DataFrame)
+            "missing_values": profile.missing_values() if profile else df.isnull().sum().to_dict(),
+            "approximate": sample_info is not None
         }
+        if sample_info is not None:
+            # Filas del archivo completo (estimadas si la muestra no lo recorrió entero)
+            info["num_rows"] = sample_info.get("estimated_total_rows") or sample_info["rows_scanned"]
+            info["sample_info"] = sample_info
         return info
 
     def get_descriptive_statistics(self, df: pd.DataFrame):
@@ -44,17 +493,38 @@ class DataAnalyzer:
         Returns:
             pd.DataFrame: Un DataFrame con estadísticas descriptivas (count, mean, std, min, max, etc.).
                           Retorna un DataFrame vacío si no hay columnas numéricas.
+                          Si los datos son una muestra, `attrs['approximate']` es True.
         """
+        if isinstance(df, LazyDataset):
+            profile = self.get_profile(df)
+            desc = profile.describe() if profile else df.describe()
+            if desc.empty:
+                print("DataAnalyzer: No hay columnas numéricas para estadísticas descriptivas.")
+            return desc
+
         if df is None or df.empty:
             return pd.DataFrame()
-        
+
+        profile = self.get_profile(df)
+        if profile is not None:
+            desc = profile.describe()
+            if desc.empty:
+                print("DataAnalyzer: No hay columnas numéricas para estadísticas descriptivas.")
+            elif profile.approximate:
+                print("DataAnalyzer: Estadísticas calculadas sobre una muestra (valores aproximados).")
+            return desc
+
         # Seleccionar solo columnas numéricas para las estadísticas descriptivas
         numeric_df = df.select_dtypes(include=['number'])
         if numeric_df.empty:
             print("DataAnalyzer: No hay columnas numéricas para estadísticas descriptivas.")
             return pd.DataFrame()
         
-        return numeric_df.describe()
+        desc = numeric_df.describe()
+        if self.get_sample_info(df) is not None:
+            print("DataAnalyzer: Estadísticas calculadas sobre una muestra (valores aproximados).")
+            desc.attrs["approximate"] = True
+        return desc
 
     def get_unique_values(self, df: pd.DataFrame, column_name: str, top_n: int = 10):
         """
@@ -68,14 +538,63 @@ class DataAnalyzer:
         Returns:
             pd.Series: Una Serie de Pandas con los valores únicos y sus conteos.
                        Retorna una Serie vacía si la columna no existe o el DataFrame está vacío.
+                       Si los datos son una muestra, los conteos son los de la muestra
+                       y `attrs['approximate']` es True.
+                       En modo aproximado, los conteos son estimaciones de un boceto:
+                       `attrs['lower']` y `attrs['upper']` acotan el conteo real de
+                       cada valor y `attrs['error_bounds']` tiene las cotas del boceto.
         """
+        if df is not None and column_name in df.columns and self.use_approximate(df):
+            sketch = self.get_sketches(df, [column_name])[column_name]
+            top = sketch.top_values(top_n)
+            value_counts = pd.Series(top["count"].to_numpy(), index=top["value"].to_numpy(), name='count')
+            value_counts.attrs.update(
+                approximate=True,
+                lower=top["lower"].tolist(),
+                upper=top["upper"].tolist(),
+                error_bounds=sketch.error_bounds(),
+            )
+            return value_counts
+
+        if isinstance(df, LazyDataset):
+            if column_name not in df.columns:
+                print(f"DataAnalyzer Error: Columna '{column_name}' no encontrada en el dataset.")
+                return pd.Series()
+            col = quote_identifier(column_name)
+            counts = df.query(
+                f"SELECT {col}, COUNT(*) AS count FROM {quote_identifier(df.table_name)} "
+                f"WHERE {col} IS NOT NULL GROUP BY {col} ORDER BY count DESC LIMIT {int(top_n)}"
+            )
+            return pd.Series(counts['count'].values, index=counts[column_name].values, name='count')
+
         if df is None or df.empty or column_name not in df.columns:
             print(f"DataAnalyzer Error: Columna '{column_name}' no encontrada o DataFrame vacío.")
             return pd.Series()
 
         # Contar la frecuencia de cada valor único
-        value_counts = df[column_name].value_counts()
-        return value_counts.head(top_n)
+        value_counts = df[column_name].value_counts().head(top_n)
+        if self.get_sample_info(df) is not None:
+            value_counts.attrs["approximate"] = True
+        return value_counts
+
+def _concat_rows(df: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Une las filas nuevas al final de los datos. Las columnas categóricas se
+    amplían con las categorías nuevas para que la unión no las convierta en object.
+    """
+    left, right = df, new_rows
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            new_values = pd.Index(new_rows[col].dropna().unique())
+            categories = dtype.categories.append(new_values.difference(dtype.categories))
+            if left is df:
+                # Copias superficiales: solo se reemplazan las columnas categóricas
+                left, right = df.copy(deep=False), new_rows.copy(deep=False)
+            left[col] = df[col].cat.set_categories(categories)
+            right[col] = new_rows[col].astype(pd.CategoricalDtype(categories, ordered=dtype.ordered))
+    combined = pd.concat([left, right], ignore_index=True)
+    combined.attrs = {**df.attrs, **new_rows.attrs}
+    return combined
 
 # Ejemplo de uso (solo para pruebas)
 if __name__ == "__main__":
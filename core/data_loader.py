@@ -1,24 +1,188 @@
 import pandas as pd
+import io
+import mmap
+import operator
 import os
+import glob
+import multiprocessing
+import time
+import threading
+import duckdb
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Optional
+from core.lazy_dataset import LazyDataset, quote_identifier, table_name_from_file
+from core.parquet_cache import ParquetCache
+from core.dtype_optimizer import DtypeOptimizer
+from core.load_job import LoadCancelledError, LoadJob
+from core.file_processor import FileProcessor
+from core.arrow_frames import arrow_to_pandas, fetch_frame, to_arrow_backed
+
+try:
+    import pyarrow.csv as pa_csv # Lector CSV multihilo (opcional)
+except ImportError:
+    pa_csv = None
+
+# Operadores admitidos en los filtros de filas (columna, operador, valor)
+FILTER_OPERATORS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': None,
+    'not in': None,
+}
+
+def _load_part(file_path: str, sheet_name: Optional[str] = None):
+    """
+    Carga una parte (un archivo o una hoja de un XLSX) dentro de un proceso del pool.
+    Está definida a nivel de módulo para que pueda enviarse a otros procesos.
+
+    Returns:
+        tuple: (DataFrame de la parte, segundos empleados).
+    """
+    start = time.perf_counter()
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension == '.csv':
+        df = pd.read_csv(file_path)
+    elif file_extension == '.parquet':
+        df = pd.read_parquet(file_path)
+    else:
+        chunks = list(FileProcessor().iter_xlsx_chunks(file_path, sheet_name=sheet_name))
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    return df, time.perf_counter() - start
 
 class DataLoader:
     """
     Clase encargada de cargar datos desde diferentes formatos de archivo
-    (CSV y XLSX) a un DataFrame de Pandas.
+    (CSV, XLSX y Parquet) a un DataFrame de Pandas o a un LazyDataset de DuckDB.
     """
 
-    def load_data_from_file(self, file_path: str):
+    # Número de filas por lote en el modo de carga por bloques
+    DEFAULT_CHUNKSIZE = 100_000
+
+    # Motores de parseo de CSV disponibles ('auto' elige según el tamaño del archivo)
+    CSV_ENGINES = ('auto', 'pandas', 'pyarrow', 'duckdb')
+
+    # Representación de las columnas cargadas: NumPy o Arrow (pd.ArrowDtype)
+    DTYPE_BACKENDS = ('numpy', 'pyarrow')
+
+    # Tamaño a partir del cual 'auto' usa un lector multihilo en lugar de Pandas
+    AUTO_ENGINE_THRESHOLD_BYTES = 64 * 1024 ** 2
+
+    # Número de cargas en segundo plano que pueden ejecutarse a la vez
+    MAX_BACKGROUND_LOADS = 2
+
+    # Extensiones admitidas al cargar varias partes (carpeta, patrón o lista)
+    MULTI_SOURCE_EXTENSIONS = ('.csv', '.xlsx', '.parquet')
+
+    # Columna añadida con el archivo (y hoja) de origen de cada fila
+    SOURCE_COLUMN = 'origen'
+
+    # Vista previa por muestreo: filas de cabecera, tamaño de la muestra y presupuestos
+    PREVIEW_HEAD_ROWS = 10
+    PREVIEW_SAMPLE_ROWS = 10_000
+    PREVIEW_CHUNKSIZE = 20_000
+    PREVIEW_TIME_BUDGET_SECONDS = 5.0
+    PREVIEW_MEMORY_BUDGET_BYTES = 64 * 1024 ** 2
+
+    # Filas leídas para inferir los tipos en el escaneo de esquema de CSV y XLSX
+    SCHEMA_SAMPLE_ROWS = 1000
+
+    # Bytes finales del CSV que se guardan para comprobar que solo ha crecido por el final
+    SOURCE_TAIL_BYTES = 64
+
+    # Tipos que DuckDB puede inferir en un CSV: sin fechas ni horas, que quedan como
+    # texto igual que con Pandas, para que el tipo no dependa del motor elegido
+    CSV_TYPE_CANDIDATES = ('BOOLEAN', 'BIGINT', 'DOUBLE', 'VARCHAR')
+
+    def __init__(self, cache: Optional[ParquetCache] = None,
+                 dtype_optimizer: Optional[DtypeOptimizer] = None,
+                 database: Optional[str] = None):
         """
-        Carga datos desde un archivo (CSV o XLSX) a un DataFrame de Pandas.
+        Args:
+            cache (ParquetCache, optional): Caché Parquet para acelerar las cargas
+                   repetidas de archivos CSV y XLSX. Sin caché, cada carga parsea el archivo.
+            dtype_optimizer (DtypeOptimizer, optional): Optimizador usado cuando se
+                   pide optimizar tipos. Por defecto, uno con la configuración estándar.
+            database (str, optional): Archivo de la base de datos persistente de DuckDB
+                   (el mismo que usa el QueryEngine) donde importar datasets.
+        """
+        self.cache = cache
+        self.database = database
+        self.dtype_optimizer = dtype_optimizer or DtypeOptimizer()
+        # Reporte de memoria de la última carga optimizada (bytes antes/después)
+        self.last_optimization_report = None
+        # Tiempos de parseo de CSV: motor -> lista de segundos de cada carga
+        self.engine_timings = {}
+        # Motor y segundos de la última carga de CSV, p. ej. ('pyarrow', 1.8)
+        self.last_engine_timing = None
+        # Pool de hilos para cargas en segundo plano (se crea en el primer uso)
+        self._executor = None
+        # Lector de XLSX en streaming (modo de solo lectura de openpyxl)
+        self.file_processor = FileProcessor()
+        # Reporte de la última carga de varias partes (tiempos y problemas de esquema)
+        self.last_sources_report = None
+        # Primeras filas del archivo de la última vista previa por muestreo
+        self.last_preview_head = None
+
+    def load_data_from_file(self, file_path: str, chunksize: Optional[int] = None,
+                            progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                            use_cache: bool = True, optimize_dtypes: bool = False,
+                            engine: str = 'auto', cancel_event: Optional[threading.Event] = None,
+                            columns: Optional[list] = None, filters: Optional[list] = None,
+                            dtype_backend: str = 'numpy'):
+        """
+        Carga datos desde un archivo (CSV, XLSX o Parquet) a un DataFrame de Pandas.
+
+        Con 'columns' y 'filters' solo se materializan las columnas y filas pedidas;
+        la selección se hace en el propio lector siempre que es posible (usecols de
+        Pandas, opciones de Arrow, consulta de DuckDB y poda de grupos de filas en
+        Parquet) y, si no, lote a lote, de modo que nunca se carga el archivo entero.
 
         Args:
             file_path (str): La ruta completa al archivo a cargar.
+            chunksize (int, optional): Si se indica, los archivos CSV se leen en lotes
+                                       de este número de filas en lugar de en una sola llamada.
+            progress_callback (callable, optional): Función que recibe
+                                       (bytes_leidos, bytes_totales, filas_leidas)
+                                       después de cada lote leído.
+            use_cache (bool): Si hay caché configurada, reutiliza la copia Parquet del
+                              archivo (o la crea tras parsearlo). Por defecto, True.
+            optimize_dtypes (bool): Si es True, ajusta los tipos de datos tras la carga
+                              para reducir memoria. El reporte queda en
+                              `last_optimization_report`. Por defecto, False.
+            engine (str): Motor de parseo de CSV: 'pandas', 'pyarrow' (multihilo),
+                              'duckdb' (multihilo) o 'auto' para elegirlo según el tamaño
+                              del archivo. Por defecto, 'auto'.
+            cancel_event (threading.Event, optional): Si se activa durante la carga,
+                              la lectura se detiene en el siguiente lote.
+            columns (list, optional): Columnas a cargar, en este orden. Por defecto, todas.
+            filters (list, optional): Filtros de filas como tuplas (columna, operador,
+                              valor), combinados con AND. Operadores: '==', '!=', '<',
+                              '<=', '>', '>=', 'in' y 'not in'. Los nulos no cumplen
+                              ningún filtro. Ejemplo: [('anio', '>=', 2023)].
+            dtype_backend (str): 'numpy' (por defecto) o 'pyarrow'. Con 'pyarrow' el
+                              DataFrame queda respaldado por Arrow (pd.ArrowDtype): los
+                              lectores de Arrow, DuckDB y Parquet entregan sus buffers sin
+                              convertirlos a NumPy, y QueryEngine los consulta sin copia.
 
         Returns:
             tuple: Una tupla que contiene el DataFrame de Pandas cargado
                    y el nombre original del archivo. Retorna (None, None)
-                   si ocurre un error o el archivo no es soportado.
+                   si ocurre un error o el archivo no es soportado. En la carga
+                   completa de un CSV, `df.attrs['source_file']` guarda hasta dónde
+                   se leyó el archivo (ver load_appended_rows).
+
+        Raises:
+            LoadCancelledError: Si la carga se canceló mediante cancel_event.
         """
+        self.last_optimization_report = None
+        self.last_engine_timing = None
         if not os.path.exists(file_path):
             print(f"Error DataLoader: Archivo no encontrado en {file_path}")
             return None, None
@@ -28,21 +192,84 @@ class DataLoader:
             # Obtener la extensión del archivo para determinar el formato
             file_extension = os.path.splitext(file_path)[1].lower()
             file_name = os.path.basename(file_path)
+            cacheable = use_cache and self.cache is not None and file_extension in ('.csv', '.xlsx')
+            self._validate_filters(filters)
+            if dtype_backend not in self.DTYPE_BACKENDS:
+                raise ValueError(f"dtype_backend no soportado: {dtype_backend}")
+            arrow = dtype_backend == 'pyarrow'
+            # La caché guarda el archivo completo: solo se escribe en cargas sin selección
+            partial = columns is not None or bool(filters)
+            if cancel_event is not None:
+                # Con cancelación, la lectura se hace siempre por lotes para poder detenerla
+                progress_callback = self._cancellable_progress(progress_callback, cancel_event)
+                chunksize = chunksize or self.DEFAULT_CHUNKSIZE
 
-            if file_extension == '.csv':
-                # Cargar archivo CSV
-                df = pd.read_csv(file_path)
-                print(f"DataLoader: Archivo CSV '{file_name}' cargado exitosamente.")
-                return df, file_name
+            # Posición del final del CSV antes de leerlo: la lectura se limita a ella, y
+            # lo que se añada durante la carga se lee después con load_appended_rows
+            source_position = self._source_position(file_path) if file_extension == '.csv' and not partial else None
+            df = self.cache.get(file_path, columns=columns, filters=self._filters_to_arrow(filters),
+                                dtype_backend=dtype_backend) if cacheable else None
+            if df is not None:
+                # Reutilizar la copia Parquet si el archivo no ha cambiado
+                if progress_callback:
+                    total_bytes = os.path.getsize(file_path)
+                    progress_callback(total_bytes, total_bytes, len(df))
+                print(f"DataLoader: Archivo '{file_name}' cargado desde la caché Parquet.")
+            elif file_extension == '.csv':
+                # Cargar archivo CSV con el motor elegido (por lotes si se pidió un tamaño de bloque)
+                end_offset = source_position["offset"] if source_position is not None else None
+                df = self._read_csv(file_path, engine, chunksize, progress_callback, cancel_event,
+                                    columns, filters, arrow=arrow, end_offset=end_offset)
+                print(f"DataLoader: Archivo CSV '{file_name}' cargado exitosamente "
+                      f"(motor {self.last_engine_timing[0]}, {self.last_engine_timing[1]:.2f} s).")
+                grew = end_offset is not None and os.path.getsize(file_path) != end_offset
+                if grew and self.last_engine_timing[0] == 'duckdb':
+                    # DuckDB lee el archivo entero: no se sabe hasta dónde llegó
+                    print(f"DataLoader: '{file_name}' creció durante la carga con DuckDB; para "
+                          f"leer las filas nuevas hay que volver a cargarlo.")
+                    source_position = None
+                # La copia Parquet solo es válida si el archivo no cambió mientras se leía
+                if cacheable and not partial and not grew:
+                    self.cache.put(file_path, df)
             elif file_extension == '.xlsx':
-                # Cargar archivo XLSX (pandas usa openpyxl como motor por defecto)
-                df = pd.read_excel(file_path)
+                # Cargar archivo XLSX: por lotes con openpyxl en solo lectura cuando se
+                # pide progreso, tamaño de bloque o una selección; si no, con pd.read_excel
+                if chunksize or progress_callback or partial:
+                    chunks = []
+                    for chunk in self.file_processor.iter_xlsx_chunks(file_path, chunksize,
+                                                                      progress_callback=progress_callback):
+                        self._append_chunk(chunks, self._select(chunk, columns, filters))
+                    df = self._concat_chunks(chunks)
+                else:
+                    df = pd.read_excel(file_path)
                 print(f"DataLoader: Archivo XLSX '{file_name}' cargado exitosamente.")
-                return df, file_name
+                if cacheable and not partial:
+                    self.cache.put(file_path, df)
+            elif file_extension == '.parquet':
+                # Cargar archivo Parquet (requiere pyarrow); los filtros descartan
+                # grupos de filas enteros según sus estadísticas mínimo/máximo. Se pasan
+                # como expresión de Arrow para tratar nulos y listas vacías como los CSV
+                df = pd.read_parquet(file_path, columns=columns, filters=self._filters_to_arrow(filters),
+                                     **({'dtype_backend': 'pyarrow'} if arrow else {}))
+                print(f"DataLoader: Archivo Parquet '{file_name}' cargado exitosamente.")
             else:
                 print(f"DataLoader Error: Formato de archivo no soportado: {file_extension}")
                 return None, None
 
+            if cancel_event is not None and cancel_event.is_set():
+                raise LoadCancelledError(f"Carga de '{file_name}' cancelada.")
+            if arrow:
+                # Los lectores de Pandas y openpyxl producen NumPy: se convierten una sola vez
+                df = to_arrow_backed(df)
+            if optimize_dtypes:
+                df, self.last_optimization_report = self.dtype_optimizer.optimize(df)
+            if source_position is not None:
+                df.attrs["source_file"] = source_position
+            return df, file_name
+
+        except LoadCancelledError:
+            print(f"DataLoader: Carga del archivo '{file_name}' cancelada por el usuario.")
+            raise
         except pd.errors.EmptyDataError:
             print(f"DataLoader Error: El archivo '{file_name}' está vacío.")
             return None, None
@@ -51,4 +278,1084 @@ class DataLoader:
             return None, None
         except Exception as e:
             print(f"DataLoader Error: Error inesperado al cargar el archivo '{file_name}': {e}")
-            return None, None
\ No newline at end of file
+            return None, None
+
+    def _source_position(self, file_path: str) -> dict:
+        """
+        Retorna la posición actual del final de un CSV: ruta, tamaño en bytes y los
+        últimos SOURCE_TAIL_BYTES bytes en hexadecimal (para detectar si se reescribió;
+        en texto para que los attrs sigan siendo serializables a JSON).
+        """
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(max(size - self.SOURCE_TAIL_BYTES, 0))
+            tail = f.read(size)
+        return {"path": os.path.abspath(file_path), "offset": size, "tail": tail.hex()}
+
+    def load_appended_rows(self, df: pd.DataFrame):
+        """
+        Lee solo las filas añadidas al final del CSV de origen desde que se cargó
+        (o desde la última llamada), sin volver a leer el resto del archivo. Se
+        leen únicamente líneas completas: una última línea a medio escribir queda
+        para la siguiente llamada. Las columnas se leen con los tipos de df siempre
+        que los valores nuevos quepan en ellos.
+
+        Args:
+            df (pd.DataFrame): Datos cargados por completo de un CSV con
+                   load_data_from_file (tienen `attrs['source_file']`).
+
+        Returns:
+            tuple: (filas nuevas, nombre del archivo). Las filas nuevas tienen las
+                   columnas de df (ninguna fila si el archivo no ha crecido) y en
+                   `attrs['source_file']` la nueva posición del final. Retorna
+                   (None, None) si los datos no vienen de un CSV, el archivo no se
+                   puede leer o su final ya no coincide con el leído (se truncó o se
+                   reescribió: hay que volver a cargarlo).
+        """
+        source = df.attrs.get("source_file") if df is not None else None
+        if source is None:
+            print("DataLoader Error: Los datos no provienen de la carga completa de un archivo CSV.")
+            return None, None
+        file_path, offset, tail = source["path"], source["offset"], bytes.fromhex(source["tail"])
+        file_name = os.path.basename(file_path)
+        try:
+            with open(file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                f.seek(offset - len(tail))
+                if size < offset or f.read(len(tail)) != tail:
+                    print(f"DataLoader Error: El archivo '{file_name}' cambió además de crecer; "
+                          f"hay que volver a cargarlo.")
+                    return None, None
+                data = f.read(size - offset)
+            # Solo líneas completas: la última puede estar a medio escribir
+            data = data[:data.rfind(b"\n") + 1]
+            if data.strip():
+                new_rows = self._read_appended_csv(data, df.dtypes)
+            else:
+                new_rows = df.iloc[:0].copy()
+        except (OSError, ValueError, pd.errors.ParserError) as e:
+            print(f"DataLoader Error: No se pudieron leer las filas nuevas de '{file_name}': {e}")
+            return None, None
+
+        new_rows.attrs = {"source_file": dict(source, offset=offset + len(data),
+                                              tail=(tail + data)[-self.SOURCE_TAIL_BYTES:].hex())}
+        print(f"DataLoader: {len(new_rows):,} filas nuevas leídas de '{file_name}' "
+              f"({len(data):,} bytes desde la posición {offset:,}).")
+        return new_rows, file_name
+
+    def _read_appended_csv(self, data: bytes, dtypes: pd.Series) -> pd.DataFrame:
+        """
+        Parsea líneas de un CSV sin cabecera con las columnas y, si es posible, los
+        tipos de los datos ya cargados.
+        """
+        read_dtypes, dates = {}, []
+        for col, dtype in dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                # Se leen como sus categorías; las nuevas se añaden al unir los datos
+                read_dtypes[col] = dtype.categories.dtype
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                dates.append(col)
+            else:
+                read_dtypes[col] = dtype
+        options = {"header": None, "names": list(dtypes.index), "parse_dates": dates or None}
+        try:
+            new_rows = pd.read_csv(io.BytesIO(data), dtype=read_dtypes, **options)
+        except (ValueError, TypeError, OverflowError):
+            # Valores que no caben en los tipos actuales (p. ej. nulos en una columna
+            # entera): se infieren los tipos y la unión con los datos los amplía
+            new_rows = pd.read_csv(io.BytesIO(data), **options)
+            if any(isinstance(dtype, pd.ArrowDtype) for dtype in dtypes):
+                new_rows = to_arrow_backed(new_rows)
+        return new_rows
+
+    def load_preview(self, file_path: str, sample_size: Optional[int] = None,
+                     time_budget_seconds: Optional[float] = None,
+                     memory_budget_bytes: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Carga una vista previa rápida de un archivo grande: las primeras filas y una
+        muestra aleatoria uniforme (muestreo por reservorio) de todo el archivo, sin
+        materializarlo, dentro de un presupuesto de tiempo y de memoria.
+
+        El archivo se recorre por lotes; si el tiempo se agota antes de llegar al
+        final, la muestra es uniforme sobre las filas recorridas hasta ese momento.
+        La muestra queda marcada en `df.attrs['sample_info']` (filas recorridas,
+        total estimado, si se recorrió completo...) para que el análisis y los
+        gráficos la identifiquen como aproximada. Las primeras filas quedan en
+        `last_preview_head`.
+
+        Args:
+            file_path (str): La ruta completa al archivo (CSV, XLSX o Parquet).
+            sample_size (int, optional): Filas de la muestra. Por defecto, PREVIEW_SAMPLE_ROWS.
+            time_budget_seconds (float, optional): Tiempo máximo de lectura.
+                         Por defecto, PREVIEW_TIME_BUDGET_SECONDS.
+            memory_budget_bytes (int, optional): Memoria máxima de la muestra; si las
+                         filas son anchas, se reduce el tamaño de la muestra.
+                         Por defecto, PREVIEW_MEMORY_BUDGET_BYTES.
+            seed (int, optional): Semilla del muestreo, para obtener muestras reproducibles.
+
+        Returns:
+            tuple: (DataFrame de la muestra, nombre del archivo). El índice de la muestra
+                   es el número de fila en el archivo. Retorna (None, None) si ocurre
+                   un error o el archivo no es soportado.
+        """
+        self.last_preview_head = None
+        if not os.path.exists(file_path):
+            print(f"Error DataLoader: Archivo no encontrado en {file_path}")
+            return None, None
+
+        file_name = os.path.basename(file_path)
+        file_extension = os.path.splitext(file_path)[1].lower()
+        if file_extension not in self.MULTI_SOURCE_EXTENSIONS:
+            print(f"DataLoader Error: Formato de archivo no soportado: {file_extension}")
+            return None, None
+
+        sample_size = sample_size or self.PREVIEW_SAMPLE_ROWS
+        time_budget_seconds = time_budget_seconds or self.PREVIEW_TIME_BUDGET_SECONDS
+        memory_budget_bytes = memory_budget_bytes or self.PREVIEW_MEMORY_BUDGET_BYTES
+        rng = np.random.default_rng(seed)
+        start = time.perf_counter()
+        # Último avance informado por el lector: (bytes_leidos, bytes_totales)
+        position = [0, 0]
+
+        def track_progress(bytes_read, total_bytes, rows_read):
+            position[0], position[1] = bytes_read, total_bytes
+
+        try:
+            reservoir = None
+            reservoir_rows = np.empty(0, dtype=np.int64) # Fila del archivo de cada hueco
+            rows_seen = 0
+            complete = True
+            for chunk in self._iter_file_chunks(file_path, self.PREVIEW_CHUNKSIZE, track_progress):
+                if chunk.empty:
+                    continue
+                chunk.index = pd.RangeIndex(rows_seen, rows_seen + len(chunk))
+                if reservoir is None:
+                    self.last_preview_head = chunk.iloc[:self.PREVIEW_HEAD_ROWS].copy()
+                    # Ajustar la muestra al presupuesto de memoria según el tamaño real de las filas
+                    bytes_per_row = chunk.memory_usage(deep=True).sum() / len(chunk)
+                    sample_size = max(min(sample_size, int(memory_budget_bytes // bytes_per_row)), 1)
+                reservoir, reservoir_rows = self._reservoir_update(
+                    reservoir, reservoir_rows, chunk, rows_seen, sample_size, rng
+                )
+                rows_seen += len(chunk)
+                if time.perf_counter() - start > time_budget_seconds:
+                    complete = False
+                    break
+
+            if reservoir is None:
+                raise pd.errors.EmptyDataError("No se leyeron filas del archivo.")
+
+            bytes_read, total_bytes = position
+            if complete:
+                estimated_rows = rows_seen
+            else:
+                estimated_rows = int(rows_seen * total_bytes / bytes_read) if bytes_read else None
+            sample = reservoir.sort_index()
+            sample.attrs["sample_info"] = {
+                "sample_rows": len(sample),
+                "rows_scanned": rows_seen,
+                "estimated_total_rows": estimated_rows,
+                "complete": complete,
+                "seconds": time.perf_counter() - start,
+            }
+            print(f"DataLoader: Vista previa de '{file_name}': muestra de {len(sample):,} filas "
+                  f"sobre {rows_seen:,} recorridas ({'archivo completo' if complete else 'tiempo agotado'}).")
+            return sample, file_name
+
+        except pd.errors.EmptyDataError:
+            print(f"DataLoader Error: El archivo '{file_name}' está vacío.")
+            return None, None
+        except pd.errors.ParserError as e:
+            print(f"DataLoader Error: Error de parseo en el archivo '{file_name}': {e}")
+            return None, None
+        except Exception as e:
+            print(f"DataLoader Error: Error inesperado en la vista previa de '{file_name}': {e}")
+            return None, None
+
+    def _reservoir_update(self, reservoir, reservoir_rows, chunk, rows_seen, sample_size, rng):
+        """
+        Añade un lote al reservorio (algoritmo R, vectorizado por lote): la fila i
+        del archivo ocupa un hueco al azar entre 0 e i, y entra en la muestra si ese
+        hueco es menor que sample_size. Retorna (reservorio, fila de cada hueco).
+        """
+        # Llenar los huecos libres con las primeras filas
+        fill = min(max(sample_size - len(reservoir_rows), 0), len(chunk))
+        if fill:
+            head = chunk.iloc[:fill]
+            reservoir = head if reservoir is None else pd.concat([reservoir, head])
+            reservoir_rows = np.concatenate([reservoir_rows, head.index.to_numpy()])
+
+        rest = chunk.iloc[fill:]
+        if rest.empty:
+            return reservoir, reservoir_rows
+
+        row_numbers = rows_seen + fill + np.arange(len(rest))
+        slots = rng.integers(0, row_numbers + 1)
+        candidates = np.flatnonzero(slots < sample_size)
+        if not len(candidates):
+            return reservoir, reservoir_rows
+
+        # Si varias filas caen en el mismo hueco, se queda la última, como en el algoritmo secuencial
+        reversed_slots = slots[candidates][::-1]
+        unique_slots, first_in_reversed = np.unique(reversed_slots, return_index=True)
+        winners = rest.iloc[candidates[len(candidates) - 1 - first_in_reversed]]
+        reservoir = pd.concat([reservoir.drop(index=reservoir_rows[unique_slots]), winners])
+        reservoir_rows[unique_slots] = winners.index.to_numpy()
+        return reservoir, reservoir_rows
+
+    def _iter_file_chunks(self, file_path: str, chunksize: int,
+                          progress_callback: Optional[Callable[[int, int, int], None]] = None):
+        """
+        Recorre un archivo CSV, XLSX o Parquet por lotes de DataFrame, informando
+        del avance antes de entregar cada lote.
+        """
+        file_extension = os.path.splitext(file_path)[1].lower()
+        total_bytes = os.path.getsize(file_path)
+        rows_read = 0
+        if file_extension == '.csv':
+            with open(file_path, 'rb') as file_handle:
+                with pd.read_csv(file_handle, chunksize=chunksize) as reader:
+                    for chunk in reader:
+                        rows_read += len(chunk)
+                        if progress_callback:
+                            progress_callback(file_handle.tell(), total_bytes, rows_read)
+                        yield chunk
+        elif file_extension == '.xlsx':
+            yield from self.file_processor.iter_xlsx_chunks(file_path, chunksize, progress_callback=progress_callback)
+        elif file_extension == '.parquet':
+            import pyarrow.parquet as pq
+            parquet_file = pq.ParquetFile(file_path)
+            total_rows = parquet_file.metadata.num_rows
+            for batch in parquet_file.iter_batches(batch_size=chunksize):
+                rows_read += batch.num_rows
+                if progress_callback:
+                    progress_callback(int(total_bytes * rows_read / total_rows), total_bytes, rows_read)
+                yield batch.to_pandas()
+        else:
+            raise ValueError(f"Formato de archivo no soportado: {file_extension}")
+
+    def submit_load(self, file_path, progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                    done_callback: Optional[Callable[[LoadJob], None]] = None,
+                    job: Optional[LoadJob] = None, **load_kwargs):
+        """
+        Inicia la carga de un archivo en un hilo de fondo y retorna de inmediato.
+
+        Args:
+            file_path (str | list): La ruta completa al archivo a cargar. Si es una
+                         carpeta, un patrón glob o una lista de rutas, se usa
+                         load_data_from_sources.
+            progress_callback (callable, optional): Función de progreso, llamada
+                         desde el hilo de la carga.
+            done_callback (callable, optional): Función que recibe el LoadJob cuando
+                         la carga termina (con éxito, con error o cancelada). Si la
+                         carga termina antes de retornar, se llama desde este hilo.
+            job (LoadJob, optional): Manejador creado por quien llama. Permite guardarlo
+                         antes de iniciar la carga, para reconocerlo en done_callback
+                         aunque la carga termine antes de que submit_load retorne.
+            **load_kwargs: Argumentos adicionales para load_data_from_file
+                         (chunksize, engine, optimize_dtypes, columns, filters...) o para
+                         load_data_from_sources (max_workers, allow_schema_mismatch...).
+
+        Returns:
+            LoadJob: Manejador para consultar el avance, cancelar u obtener el resultado.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.MAX_BACKGROUND_LOADS,
+                                                thread_name_prefix="data-loader")
+        job = job or LoadJob(file_path)
+
+        def report_progress(bytes_read, total_bytes, rows_read):
+            job.progress = (bytes_read, total_bytes, rows_read)
+            if progress_callback:
+                progress_callback(bytes_read, total_bytes, rows_read)
+
+        multi_source = self.is_multi_source(file_path)
+
+        def run():
+            if multi_source:
+                result = self.load_data_from_sources(file_path, progress_callback=report_progress,
+                                                     cancel_event=job.cancel_event, **load_kwargs)
+                job.sources_report = self.last_sources_report
+            else:
+                result = self.load_data_from_file(file_path, progress_callback=report_progress,
+                                                  cancel_event=job.cancel_event, **load_kwargs)
+                job.engine_timing = self.last_engine_timing
+            job.optimization_report = self.last_optimization_report
+            return result
+
+        job.future = self._executor.submit(run)
+        if done_callback:
+            job.future.add_done_callback(lambda _: done_callback(job))
+        print(f"DataLoader: Carga en segundo plano iniciada para '{self._sources_label(file_path)}'.")
+        return job
+
+    def is_multi_source(self, sources) -> bool:
+        """
+        Indica si 'sources' es una carpeta, un patrón glob o una lista de rutas. Un
+        archivo que existe es siempre un archivo, aunque su nombre tenga * ? o [.
+        """
+        if not isinstance(sources, str):
+            return True
+        if os.path.isfile(sources):
+            return False
+        return os.path.isdir(sources) or any(char in sources for char in '*?[')
+
+    def load_data_from_sources(self, sources, max_workers: Optional[int] = None,
+                               allow_schema_mismatch: bool = False, optimize_dtypes: bool = False,
+                               progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                               cancel_event: Optional[threading.Event] = None):
+        """
+        Carga varias partes en paralelo (en un pool de procesos) y las une en un
+        único DataFrame con la columna SOURCE_COLUMN indicando el origen de cada fila.
+        Si alguna parte ya tiene una columna con ese nombre, se usa el primero libre
+        de SOURCE_COLUMN_1, SOURCE_COLUMN_2... (queda en el reporte, 'source_column').
+
+        Las partes pueden venir de una carpeta, un patrón glob ('datos/*.csv'), una
+        lista de rutas o un XLSX, en cuyo caso se carga cada una de sus hojas.
+        El detalle (tiempo y filas por parte, problemas de esquema) queda en
+        `last_sources_report`.
+
+        Args:
+            sources (str | list): Carpeta, patrón glob, ruta de un archivo o lista de rutas.
+            max_workers (int, optional): Procesos a usar. Por defecto, uno por núcleo.
+            allow_schema_mismatch (bool): Si es False (por defecto), la carga falla si
+                     las partes no tienen las mismas columnas; si es True, se unen
+                     rellenando con nulos.
+            optimize_dtypes (bool): Si es True, optimiza los tipos del resultado.
+            progress_callback (callable, optional): Función que recibe
+                     (bytes_de_partes_terminadas, bytes_totales, filas_leidas).
+            cancel_event (threading.Event, optional): Si se activa, se descartan las
+                     partes pendientes y no se espera a las que están en curso.
+
+        Returns:
+            tuple: (DataFrame unido, nombre descriptivo). Retorna (None, None) si no
+                   hay partes válidas, falla alguna parte o los esquemas no coinciden.
+
+        Raises:
+            LoadCancelledError: Si la carga se canceló mediante cancel_event.
+        """
+        self.last_sources_report = None
+        self.last_optimization_report = None
+        label = self._sources_label(sources)
+        start = time.perf_counter()
+        try:
+            parts = self._expand_sources(sources)
+            if not parts:
+                print(f"DataLoader Error: No se encontraron archivos soportados en '{label}'.")
+                return None, None
+
+            # Peso de cada parte para el progreso: el tamaño del archivo repartido entre sus hojas
+            parts_per_file = {}
+            for path, _ in parts:
+                parts_per_file[path] = parts_per_file.get(path, 0) + 1
+            weights = [os.path.getsize(path) / parts_per_file[path] for path, _ in parts]
+            total_bytes = int(sum(weights))
+
+            results = [None] * len(parts)
+            done_bytes = 0
+            rows_read = 0
+            workers = max_workers or min(len(parts), os.cpu_count() or 1)
+            # Procesos con 'spawn': crear procesos con fork desde una aplicación con
+            # hilos (la interfaz, los hilos de carga) puede dejarlos bloqueados
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            finished = False
+            try:
+                futures = {executor.submit(_load_part, path, sheet): i for i, (path, sheet) in enumerate(parts)}
+                pending = set(futures)
+                while pending:
+                    # Se espera en intervalos cortos para atender la cancelación sin que termine otra parte
+                    done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise LoadCancelledError(f"Carga de '{label}' cancelada.")
+                    for future in done:
+                        i = futures[future]
+                        results[i] = future.result()
+                        done_bytes += weights[i]
+                        rows_read += len(results[i][0])
+                        if progress_callback:
+                            progress_callback(int(done_bytes), total_bytes, rows_read)
+                finished = True
+            finally:
+                # Si se cancela o falla una parte, se descartan las pendientes y no se
+                # espera a las que están en curso (sus procesos terminan por su cuenta)
+                executor.shutdown(wait=finished, cancel_futures=True)
+
+            source_column = self._source_column_name(part_df for part_df, _ in results)
+            if source_column != self.SOURCE_COLUMN:
+                print(f"DataLoader: Los datos ya tienen una columna '{self.SOURCE_COLUMN}'; "
+                      f"el origen de cada fila va en '{source_column}'.")
+            report = {"parts": [], "schema_issues": [], "total_seconds": 0.0, "source_column": source_column}
+            frames = []
+            reference_label, reference_dtypes = None, None
+            for (path, sheet), (part_df, seconds) in zip(parts, results):
+                part_label = os.path.basename(path) + (f":{sheet}" if sheet else "")
+                report["parts"].append({"source": part_label, "rows": len(part_df), "seconds": seconds})
+                if reference_dtypes is None:
+                    reference_label, reference_dtypes = part_label, part_df.dtypes
+                else:
+                    report["schema_issues"].extend(
+                        self._compare_schemas(reference_label, reference_dtypes, part_label, part_df.dtypes)
+                    )
+                part_df.insert(0, source_column, part_label)
+                frames.append(part_df)
+
+            if not allow_schema_mismatch and any(issue["kind"] == "columns" for issue in report["schema_issues"]):
+                self.last_sources_report = report
+                for issue in report["schema_issues"]:
+                    print(f"DataLoader Error: {issue['message']}")
+                return None, None
+
+            df = pd.concat(frames, ignore_index=True, copy=False)
+            frames.clear()
+            df[source_column] = df[source_column].astype('category')
+            if optimize_dtypes:
+                df, self.last_optimization_report = self.dtype_optimizer.optimize(df)
+
+            report["total_seconds"] = time.perf_counter() - start
+            self.last_sources_report = report
+            print(f"DataLoader: {len(parts)} partes de '{label}' cargadas en paralelo "
+                  f"({len(df)} filas, {report['total_seconds']:.2f} s).")
+            return df, f"{label} ({len(parts)} partes)"
+
+        except LoadCancelledError:
+            print(f"DataLoader: Carga de '{label}' cancelada por el usuario.")
+            raise
+        except Exception as e:
+            print(f"DataLoader Error: Error inesperado al cargar las partes de '{label}': {e}")
+            return None, None
+
+    def _source_column_name(self, frames) -> str:
+        """Nombre de la columna de origen que no usa ninguna parte: SOURCE_COLUMN o SOURCE_COLUMN_n."""
+        taken = {str(col) for frame in frames for col in frame.columns}
+        name, suffix = self.SOURCE_COLUMN, 0
+        while name in taken:
+            suffix += 1
+            name = f"{self.SOURCE_COLUMN}_{suffix}"
+        return name
+
+    def _expand_sources(self, sources):
+        """
+        Convierte una carpeta, patrón, archivo o lista en una lista de partes
+        (ruta, hoja). Los XLSX aportan una parte por hoja; el resto, una por archivo.
+        """
+        if not isinstance(sources, str):
+            paths = list(sources)
+        elif os.path.isdir(sources):
+            paths = sorted(os.path.join(sources, name) for name in os.listdir(sources))
+        elif not os.path.exists(sources) and any(char in sources for char in '*?['):
+            paths = sorted(glob.glob(sources))
+        else:
+            paths = [sources]
+
+        parts = []
+        for path in paths:
+            file_extension = os.path.splitext(path)[1].lower()
+            if not os.path.isfile(path) or file_extension not in self.MULTI_SOURCE_EXTENSIONS:
+                continue
+            if file_extension == '.xlsx':
+                from openpyxl import load_workbook
+                workbook = load_workbook(path, read_only=True)
+                parts.extend((path, sheet) for sheet in workbook.sheetnames)
+                workbook.close()
+            else:
+                parts.append((path, None))
+        return parts
+
+    def _compare_schemas(self, reference_label, reference_dtypes, part_label, part_dtypes):
+        """
+        Retorna los problemas de esquema de una parte frente a la de referencia.
+        Recibe los tipos de cada parte (df.dtypes): columnas distintas y tipos distintos.
+        """
+        issues = []
+        missing = [col for col in reference_dtypes.index if col not in part_dtypes.index]
+        extra = [col for col in part_dtypes.index if col not in reference_dtypes.index]
+        if missing or extra:
+            issues.append({
+                "kind": "columns",
+                "source": part_label,
+                "message": f"'{part_label}' no coincide con '{reference_label}': "
+                           f"faltan {missing}, sobran {extra}",
+            })
+        for col in reference_dtypes.index.intersection(part_dtypes.index):
+            if reference_dtypes[col] != part_dtypes[col]:
+                issues.append({
+                    "kind": "dtype",
+                    "source": part_label,
+                    "message": f"Columna '{col}': {reference_dtypes[col]} en '{reference_label}' "
+                               f"y {part_dtypes[col]} en '{part_label}'",
+                })
+        return issues
+
+    def _sources_label(self, sources) -> str:
+        """Nombre legible de una fuente (archivo, carpeta, patrón o lista)."""
+        if not isinstance(sources, str):
+            return f"{len(sources)} archivos"
+        return os.path.basename(os.path.normpath(sources)) or sources
+
+    def _cancellable_progress(self, progress_callback, cancel_event: threading.Event):
+        """
+        Envuelve la función de progreso para que lance LoadCancelledError en cuanto
+        se active cancel_event; así la lectura se corta al terminar el lote actual.
+        """
+        def callback(bytes_read, total_bytes, rows_read):
+            if cancel_event.is_set():
+                raise LoadCancelledError("Carga cancelada por el usuario.")
+            if progress_callback:
+                progress_callback(bytes_read, total_bytes, rows_read)
+        return callback
+
+    def import_to_database(self, file_path: str, table_name: Optional[str] = None):
+        """
+        Importa un archivo (CSV, XLSX o Parquet) como tabla de la base de datos
+        persistente. DuckDB la guarda en formato columnar y comprimido, de modo que
+        en las siguientes sesiones se abre con open_stored_dataset() sin volver a
+        parsear el archivo. Si la tabla ya existe, se reemplaza.
+
+        Args:
+            file_path (str): La ruta completa al archivo a importar.
+            table_name (str, optional): Nombre de la tabla. Por defecto, el del archivo.
+
+        Returns:
+            tuple: Una tupla con el LazyDataset sobre la tabla importada y su nombre.
+                   Retorna (None, None) si ocurre un error o no hay base de datos persistente.
+        """
+        if self.database is None:
+            print("DataLoader Error: No hay una base de datos persistente configurada.")
+            return None, None
+        if not os.path.exists(file_path):
+            print(f"Error DataLoader: Archivo no encontrado en {file_path}")
+            return None, None
+
+        file_name = os.path.basename(file_path)
+        table_name = table_name or table_name_from_file(file_name)
+        try:
+            start_time = time.perf_counter()
+            connection = duckdb.connect(self.database)
+            # La vista temporal sobre el archivo se copia a una tabla y se descarta
+            source = LazyDataset(file_path, connection=connection, table_name=f"__importar_{table_name}")
+            connection.execute(f"CREATE OR REPLACE TABLE {quote_identifier(table_name)} AS "
+                               f"SELECT * FROM {quote_identifier(source.table_name)}")
+            source.close()
+            connection.execute("CHECKPOINT")
+            print(f"DataLoader: Archivo '{file_name}' importado como tabla '{table_name}' "
+                  f"en {time.perf_counter() - start_time:.2f} s.")
+            return self.open_stored_dataset(table_name, connection=connection)
+        except duckdb.Error as e:
+            print(f"DataLoader Error: DuckDB no pudo importar el archivo '{file_name}': {e}")
+            return None, None
+        except Exception as e:
+            print(f"DataLoader Error: Error inesperado al importar el archivo '{file_name}': {e}")
+            return None, None
+
+    def open_stored_dataset(self, table_name: str, connection: Optional[duckdb.DuckDBPyConnection] = None):
+        """
+        Abre una tabla de la base de datos persistente como LazyDataset, sin leer
+        ningún archivo de origen.
+
+        Args:
+            table_name (str): Nombre de la tabla guardada.
+            connection (duckdb.DuckDBPyConnection, optional): Conexión a la base de datos.
+                         Por defecto, se abre una nueva.
+
+        Returns:
+            tuple: Una tupla con el LazyDataset y el nombre de la tabla.
+                   Retorna (None, None) si ocurre un error o la tabla no existe.
+        """
+        if self.database is None:
+            print("DataLoader Error: No hay una base de datos persistente configurada.")
+            return None, None
+        try:
+            dataset = LazyDataset(self.database, connection=connection or duckdb.connect(self.database),
+                                  source_table=table_name)
+            print(f"DataLoader: Tabla '{table_name}' abierta desde la base de datos "
+                  f"({len(dataset.columns)} columnas).")
+            return dataset, table_name
+        except duckdb.Error as e:
+            print(f"DataLoader Error: No se pudo abrir la tabla '{table_name}': {e}")
+            return None, None
+
+    def list_stored_datasets(self):
+        """
+        Retorna los nombres de las tablas guardadas en la base de datos persistente
+        (lista vacía si no hay base de datos o no se puede leer).
+        """
+        if self.database is None:
+            return []
+        try:
+            with duckdb.connect(self.database) as connection:
+                return [row[0] for row in connection.execute(
+                    "SELECT table_name FROM duckdb_tables() "
+                    "WHERE database_name = current_database() AND schema_name = 'main' AND NOT temporary "
+                    "ORDER BY table_name"
+                ).fetchall()]
+        except duckdb.Error as e:
+            print(f"DataLoader Error: No se pudo leer la base de datos '{self.database}': {e}")
+            return []
+
+    def open_lazy_dataset(self, file_path: str, connection: Optional[duckdb.DuckDBPyConnection] = None):
+        """
+        Abre un archivo (CSV, XLSX o Parquet) como un LazyDataset de DuckDB sin
+        cargarlo en memoria. Solo se lee el esquema; los datos se recorren cuando
+        se consultan.
+
+        Args:
+            file_path (str): La ruta completa al archivo a abrir.
+            connection (duckdb.DuckDBPyConnection, optional): Conexión de DuckDB
+                         donde registrar el dataset.
+
+        Returns:
+            tuple: Una tupla con el LazyDataset y el nombre original del archivo.
+                   Retorna (None, None) si ocurre un error o el archivo no es soportado.
+        """
+        if not os.path.exists(file_path):
+            print(f"Error DataLoader: Archivo no encontrado en {file_path}")
+            return None, None
+
+        file_name = os.path.basename(file_path)
+        file_extension = os.path.splitext(file_path)[1].lower()
+        if file_extension not in LazyDataset.SUPPORTED_EXTENSIONS:
+            print(f"DataLoader Error: Formato de archivo no soportado: {file_extension}")
+            return None, None
+
+        try:
+            dataset = LazyDataset(file_path, connection=connection)
+            print(f"DataLoader: Archivo '{file_name}' abierto en modo diferido con DuckDB "
+                  f"({len(dataset.columns)} columnas).")
+            return dataset, file_name
+        except duckdb.Error as e:
+            print(f"DataLoader Error: DuckDB no pudo abrir el archivo '{file_name}': {e}")
+            return None, None
+        except Exception as e:
+            print(f"DataLoader Error: Error inesperado al abrir el archivo '{file_name}': {e}")
+            return None, None
+
+    def choose_csv_engine(self, file_path: str) -> str:
+        """
+        Elige el motor de parseo para un CSV según su tamaño: Pandas para archivos
+        pequeños (menor costo de arranque) y un lector multihilo para los grandes.
+
+        Args:
+            file_path (str): La ruta al archivo CSV.
+
+        Returns:
+            str: 'pandas', 'pyarrow' o 'duckdb'.
+        """
+        if os.path.getsize(file_path) < self.AUTO_ENGINE_THRESHOLD_BYTES:
+            return 'pandas'
+        return 'pyarrow' if pa_csv is not None else 'duckdb'
+
+    def benchmark_csv_engines(self, file_path: str, engines: Optional[list] = None):
+        """
+        Carga el mismo CSV con cada motor y mide cuánto tarda, para comparar cuál
+        es más rápido con un tipo de archivo concreto. No usa la caché.
+
+        Args:
+            file_path (str): La ruta al archivo CSV.
+            engines (list, optional): Motores a medir. Por defecto, todos los disponibles.
+
+        Returns:
+            dict: Motor -> segundos de carga (None si el motor falló o no está disponible).
+        """
+        engines = engines or [engine for engine in self.CSV_ENGINES if engine != 'auto']
+        results = {}
+        for engine in engines:
+            try:
+                self._read_csv(file_path, engine)
+                results[engine] = self.last_engine_timing[1]
+            except Exception as e:
+                print(f"DataLoader Error: El motor '{engine}' falló en la comparación: {e}")
+                results[engine] = None
+        print(f"DataLoader: Comparación de motores para '{os.path.basename(file_path)}': {results}")
+        return results
+
+    def _read_csv(self, file_path: str, engine: str = 'auto', chunksize: Optional[int] = None,
+                  progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                  cancel_event: Optional[threading.Event] = None,
+                  columns: Optional[list] = None, filters: Optional[list] = None,
+                  arrow: bool = False, end_offset: Optional[int] = None):
+        """
+        Lee un CSV con el motor indicado y registra el tiempo empleado.
+
+        Args:
+            file_path (str): La ruta al archivo CSV.
+            engine (str): 'auto', 'pandas', 'pyarrow' o 'duckdb'.
+            chunksize (int, optional): Tamaño de lote para leer con progreso.
+            progress_callback (callable, optional): Función de progreso.
+            cancel_event (threading.Event, optional): Evento de cancelación, usado
+                         por el motor 'duckdb' para interrumpir la consulta.
+            columns (list, optional): Columnas a leer (las demás no se parsean).
+            filters (list, optional): Filtros de filas (columna, operador, valor).
+            arrow (bool): Si es True, los motores 'pyarrow' y 'duckdb' entregan un
+                         DataFrame respaldado por Arrow, sin convertir a NumPy.
+            end_offset (int, optional): Bytes del archivo a leer, aunque siga creciendo
+                         (los motores 'pandas' y 'pyarrow'; 'duckdb' lee el archivo entero).
+
+        Returns:
+            pd.DataFrame: El DataFrame leído.
+
+        Raises:
+            ValueError: Si el motor no existe o no está instalado.
+        """
+        if engine not in self.CSV_ENGINES:
+            raise ValueError(f"Motor de CSV no soportado: {engine}")
+        if engine == 'auto':
+            engine = self.choose_csv_engine(file_path)
+        if engine == 'pyarrow' and pa_csv is None:
+            raise ValueError("El motor 'pyarrow' requiere instalar pyarrow.")
+
+        start = time.perf_counter()
+        if engine == 'pyarrow':
+            df = self._read_csv_pyarrow(file_path, chunksize, progress_callback, columns, filters, arrow,
+                                        end_offset)
+        elif engine == 'duckdb':
+            df = self._read_csv_duckdb(file_path, progress_callback, cancel_event, columns, filters, arrow)
+        elif chunksize:
+            df = self._read_csv_in_chunks(file_path, chunksize, progress_callback, columns, filters,
+                                          end_offset)
+        else:
+            with self._open_csv(file_path, end_offset) as source:
+                df = self._select(pd.read_csv(source, usecols=self._read_columns(columns, filters)),
+                                  columns, filters)
+        elapsed = time.perf_counter() - start
+
+        self.last_engine_timing = (engine, elapsed)
+        self.engine_timings.setdefault(engine, []).append(elapsed)
+        return df
+
+    def _read_csv_pyarrow(self, file_path: str, chunksize: Optional[int] = None,
+                          progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                          columns: Optional[list] = None, filters: Optional[list] = None,
+                          arrow: bool = False, end_offset: Optional[int] = None):
+        """
+        Lee un CSV con el lector de Arrow, que parsea en varios hilos.
+
+        Sin progreso se usa la lectura completa (más paralela); con progreso se
+        recorre el archivo por bloques. Solo se convierten las columnas pedidas y los
+        filtros se aplican en Arrow (bloque a bloque en el modo por bloques). Con
+        arrow=True el DataFrame usa directamente los buffers de la tabla; si no, la
+        tabla se libera mientras se convierte a NumPy para no duplicar la memoria.
+        Las fechas y horas se leen como texto y los campos vacíos como nulos, igual
+        que con Pandas. Con end_offset solo se leen esos primeros bytes (mapeados en
+        memoria, sin copiarlos).
+        """
+        import pyarrow as pa
+        total_bytes = os.path.getsize(file_path) if end_offset is None else end_offset
+        mapped = None
+        if end_offset is not None:
+            # El buffer mantiene la región mapeada; el descriptor del archivo se cierra ya
+            with pa.memory_map(file_path) as mapped_file:
+                mapped = mapped_file.read_buffer(end_offset)
+
+        def source():
+            return file_path if mapped is None else pa.BufferReader(mapped)
+
+        read_columns = self._read_columns(columns, filters)
+        # Bloques de tamaño proporcional al lote pedido (unos 64 bytes por fila) en el modo por bloques
+        block_size = max((chunksize or self.DEFAULT_CHUNKSIZE) * 64, 1024 ** 2)
+        read_options = pa_csv.ReadOptions(block_size=block_size) if progress_callback else pa_csv.ReadOptions()
+        # Campos vacíos de texto como nulos, igual que en Pandas y DuckDB
+        convert_options = pa_csv.ConvertOptions(include_columns=read_columns or [], strings_can_be_null=True)
+        convert_options.column_types = self._arrow_text_columns(source(), read_options, convert_options)
+        expression = self._filters_to_arrow(filters)
+        if not progress_callback:
+            table = pa_csv.read_csv(source(), read_options=read_options, convert_options=convert_options)
+            if expression is not None:
+                table = table.filter(expression)
+        else:
+            batches = []
+            rows_read = 0
+            blocks_read = 0
+            reader = pa_csv.open_csv(source(), read_options=read_options, convert_options=convert_options)
+            # Arrow lee el archivo por adelantado, así que el avance se calcula por
+            # bloques parseados (cada lote corresponde a un bloque de block_size bytes)
+            for batch in reader:
+                blocks_read += 1
+                rows_read += batch.num_rows
+                if expression is not None:
+                    batch = pa.Table.from_batches([batch]).filter(expression)
+                    batches.extend(batch.to_batches())
+                else:
+                    batches.append(batch)
+                progress_callback(min(blocks_read * block_size, total_bytes), total_bytes, rows_read)
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+            batches.clear()
+            progress_callback(total_bytes, total_bytes, rows_read)
+        # La tabla no usa el buffer mapeado: se libera la región antes de convertirla
+        mapped = None
+
+        if columns is not None:
+            table = table.select(columns)
+        if arrow:
+            return arrow_to_pandas(table)
+        return table.to_pandas(self_destruct=True, split_blocks=True)
+
+    def _arrow_text_columns(self, source, read_options, convert_options) -> dict:
+        """
+        Tipos forzados para el lector de Arrow: texto en las columnas que inferiría
+        como fecha u hora. Arrow infiere los tipos con el primer bloque del archivo,
+        así que basta con abrirlo y leer el esquema, sin leer el resto.
+        """
+        import pyarrow as pa
+        reader = pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options)
+        try:
+            return {field.name: pa.string() for field in reader.schema if pa.types.is_temporal(field.type)}
+        finally:
+            reader.close()
+
+    def _read_csv_duckdb(self, file_path: str,
+                         progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                         cancel_event: Optional[threading.Event] = None,
+                         columns: Optional[list] = None, filters: Optional[list] = None,
+                         arrow: bool = False):
+        """
+        Lee un CSV con el lector multihilo de DuckDB (read_csv_auto), sin inferir
+        fechas ni horas (CSV_TYPE_CANDIDATES). Las columnas y filtros se traducen a
+        la consulta, así que DuckDB solo materializa lo pedido;
+        con arrow=True el resultado se trae como Arrow, sin pasar por fetchdf().
+        Si se indica cancel_event, un hilo vigilante interrumpe la consulta al activarse.
+        """
+        con = duckdb.connect(database=':memory:', read_only=False)
+        finished = threading.Event()
+
+        def watch_cancellation():
+            while not finished.is_set():
+                if cancel_event.wait(0.1):
+                    con.interrupt()
+                    return
+
+        if cancel_event is not None:
+            threading.Thread(target=watch_cancellation, daemon=True).start()
+        try:
+            select_list = ", ".join(quote_identifier(col) for col in columns) if columns is not None else "*"
+            where_clause, params = self._filters_to_sql(filters)
+            result = con.execute(f"SELECT {select_list} FROM read_csv_auto(?, auto_type_candidates = ?)"
+                                 f"{where_clause}", [file_path, list(self.CSV_TYPE_CANDIDATES)] + params)
+            df = fetch_frame(result) if arrow else result.fetchdf()
+        except duckdb.InterruptException:
+            raise LoadCancelledError("Carga cancelada por el usuario.")
+        finally:
+            finished.set()
+            con.close()
+        if progress_callback:
+            total_bytes = os.path.getsize(file_path)
+            progress_callback(total_bytes, total_bytes, len(df))
+        return df
+
+    def _read_csv_in_chunks(self, file_path: str, chunksize: int,
+                            progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                            columns: Optional[list] = None, filters: Optional[list] = None,
+                            end_offset: Optional[int] = None):
+        """
+        Lee un archivo CSV por lotes e informa del avance después de cada uno.
+
+        Los bytes leídos se obtienen de la posición del manejador de archivo,
+        que Pandas consume de forma secuencial, por lo que el porcentaje es real
+        y no una estimación por filas. Los filtros se aplican a cada lote, de modo
+        que solo se conservan en memoria las filas que los cumplen.
+
+        Args:
+            file_path (str): La ruta al archivo CSV.
+            chunksize (int): Número de filas por lote.
+            progress_callback (callable, optional): Función que recibe
+                                       (bytes_leidos, bytes_totales, filas_leidas).
+            columns (list, optional): Columnas a leer (usecols).
+            filters (list, optional): Filtros de filas (columna, operador, valor).
+            end_offset (int, optional): Bytes del archivo a leer. Por defecto, todos.
+
+        Returns:
+            pd.DataFrame: El DataFrame resultante de unir todos los lotes.
+        """
+        total_bytes = os.path.getsize(file_path) if end_offset is None else end_offset
+        chunks = []
+        rows_read = 0
+
+        with self._open_csv(file_path, end_offset) as file_handle:
+            with pd.read_csv(file_handle, chunksize=chunksize,
+                             usecols=self._read_columns(columns, filters)) as reader:
+                for chunk in reader:
+                    rows_read += len(chunk)
+                    self._append_chunk(chunks, self._select(chunk, columns, filters))
+                    if progress_callback:
+                        progress_callback(file_handle.tell(), total_bytes, rows_read)
+
+        if progress_callback:
+            progress_callback(total_bytes, total_bytes, rows_read)
+
+        return self._concat_chunks(chunks)
+
+    @contextmanager
+    def _open_csv(self, file_path: str, end_offset: Optional[int] = None):
+        """
+        Abre un CSV en binario para leerlo con Pandas. Con end_offset solo se ven
+        esos primeros bytes (mapeados en memoria, sin copiarlos), aunque el archivo
+        siga creciendo mientras se lee.
+        """
+        with open(file_path, 'rb') as file_handle:
+            if end_offset is None:
+                yield file_handle
+            elif not end_offset:
+                yield io.BytesIO()
+            else:
+                with mmap.mmap(file_handle.fileno(), end_offset, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped
+
+    def scan_schema(self, file_path: str):
+        """
+        Lee solo el esquema de un archivo (nombres y tipos de columna), sin cargar
+        sus datos: en Parquet se usan los metadatos y en CSV/XLSX las primeras
+        SCHEMA_SAMPLE_ROWS filas. Sirve para elegir columnas antes de la carga.
+
+        Args:
+            file_path (str): La ruta al archivo (CSV, XLSX o Parquet).
+
+        Returns:
+            dict: Columna -> tipo de datos (texto), en el orden del archivo.
+                  Retorna None si ocurre un error o el archivo no es soportado.
+        """
+        file_name = os.path.basename(file_path)
+        file_extension = os.path.splitext(file_path)[1].lower()
+        try:
+            if file_extension == '.csv':
+                sample = pd.read_csv(file_path, nrows=self.SCHEMA_SAMPLE_ROWS)
+            elif file_extension == '.xlsx':
+                chunks = self.file_processor.iter_xlsx_chunks(file_path, self.SCHEMA_SAMPLE_ROWS)
+                sample = next(chunks, pd.DataFrame())
+                chunks.close()
+            elif file_extension == '.parquet':
+                import pyarrow.parquet as pq
+                sample = pq.read_schema(file_path).empty_table().to_pandas()
+            else:
+                print(f"DataLoader Error: Formato de archivo no soportado: {file_extension}")
+                return None
+            return {col: str(dtype) for col, dtype in sample.dtypes.items()}
+        except Exception as e:
+            print(f"DataLoader Error: No se pudo leer el esquema de '{file_name}': {e}")
+            return None
+
+    def _validate_filters(self, filters: Optional[list]):
+        """
+        Comprueba que los filtros sean tuplas (columna, operador, valor) válidas.
+
+        Raises:
+            ValueError: Si un filtro no tiene el formato esperado o el operador no existe.
+        """
+        for condition in filters or []:
+            if len(condition) != 3 or condition[1] not in FILTER_OPERATORS:
+                raise ValueError(f"Filtro no válido: {condition!r}. Use (columna, operador, valor) "
+                                 f"con un operador de {list(FILTER_OPERATORS)}.")
+
+    def _read_columns(self, columns: Optional[list], filters: Optional[list]):
+        """Columnas que hay que leer: las pedidas más las usadas en los filtros (None = todas)."""
+        if columns is None:
+            return None
+        extra = [col for col, _, _ in filters or [] if col not in columns]
+        return list(columns) + list(dict.fromkeys(extra))
+
+    def _select(self, df: pd.DataFrame, columns: Optional[list], filters: Optional[list]):
+        """Aplica los filtros de filas y la selección de columnas a un DataFrame (o lote)."""
+        if filters:
+            mask = pd.Series(True, index=df.index)
+            for col, op, value in filters:
+                series = df[col]
+                if op == 'in':
+                    condition = series.isin(value)
+                elif op == 'not in':
+                    condition = ~series.isin(value)
+                else:
+                    condition = FILTER_OPERATORS[op](series, value)
+                # Los nulos no cumplen ningún filtro, igual que en DuckDB y Arrow
+                mask &= condition & series.notna()
+            df = df[mask]
+        if columns is not None:
+            df = df[list(columns)]
+        return df
+
+    def _filters_to_arrow(self, filters: Optional[list]):
+        """Convierte los filtros en una expresión de pyarrow.compute (None si no hay filtros)."""
+        if not filters:
+            return None
+        import pyarrow.compute as pc
+        expression = None
+        for col, op, value in filters:
+            field = pc.field(col)
+            if op in ('in', 'not in') and not list(value):
+                # Lista vacía: 'in' no lo cumple ninguna fila y 'not in' todas las que
+                # tienen valor (como en Pandas; isin de Arrow no admite listas vacías)
+                condition = pc.scalar(False) if op == 'in' else field.is_valid()
+            elif op == 'in':
+                condition = field.isin(value)
+            elif op == 'not in':
+                # isin de Arrow da False (no nulo) en los nulos: se excluyen aparte
+                condition = ~field.isin(value) & field.is_valid()
+            else:
+                condition = FILTER_OPERATORS[op](field, value)
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def _filters_to_sql(self, filters: Optional[list]):
+        """Convierte los filtros en una cláusula WHERE con parámetros: (texto, valores)."""
+        if not filters:
+            return "", []
+        conditions = []
+        params = []
+        for col, op, value in filters:
+            if op in ('in', 'not in'):
+                values = list(value)
+                if not values:
+                    # Lista vacía: 'in' no lo cumple ninguna fila y 'not in' todas las que tienen valor
+                    conditions.append("FALSE" if op == 'in' else f"{quote_identifier(col)} IS NOT NULL")
+                    continue
+                placeholders = ", ".join("?" for _ in values)
+                conditions.append(f"{quote_identifier(col)} {op.upper()} ({placeholders})")
+                params.extend(values)
+            else:
+                conditions.append(f"{quote_identifier(col)} {'=' if op == '==' else op} ?")
+                params.append(value)
+        return " WHERE " + " AND ".join(conditions), params
+
+    def _append_chunk(self, chunks: list, chunk: pd.DataFrame):
+        """
+        Añade un lote ya filtrado a la lista. Los lotes vacíos solo se guardan si no
+        hay otro, para conservar las columnas cuando ninguna fila cumple los filtros.
+
+        Cada columna del lote se guarda en su propio bloque (Pandas agrupa las columnas
+        del mismo tipo en una sola matriz), para que _concat_chunks pueda liberar los
+        lotes columna a columna. La copia cuesta la memoria de un lote, no del total.
+        """
+        if chunk.empty:
+            if not chunks:
+                chunks.append(chunk)
+            return
+        if chunks and chunks[0].empty:
+            chunks.clear()
+        if chunk.columns.is_unique:
+            chunk = pd.DataFrame({col: chunk[col].copy() for col in chunk.columns}, copy=False)
+        chunks.append(chunk)
+
+    def _concat_chunks(self, chunks: list):
+        """
+        Une los lotes leídos en un único DataFrame.
+
+        La unión se hace columna a columna y cada columna se quita de los lotes en
+        cuanto se ha unido, de modo que el pico de memoria es el DataFrame final más
+        una columna de los lotes, y no los lotes completos más el resultado. El
+        DataFrame se construye sin consolidar las columnas (sin otra copia).
+
+        Raises:
+            pd.errors.EmptyDataError: Si no se leyó ningún lote.
+        """
+        if not chunks:
+            raise pd.errors.EmptyDataError("No se leyeron filas del archivo.")
+        if len(chunks) == 1:
+            return chunks[0]
+
+        columns = chunks[0].columns
+        if not columns.is_unique or any(not chunk.columns.equals(columns) for chunk in chunks):
+            # Columnas repetidas o distintas entre lotes: unión de Pandas (conviven lotes y resultado)
+            df = pd.concat(chunks, ignore_index=True, copy=False)
+            chunks.clear()
+            return df
+        data = {col: pd.concat([chunk.pop(col) for chunk in chunks], ignore_index=True, copy=False)
+                for col in columns}
+        chunks.clear()
+        return pd.DataFrame(data, copy=False)
@@ -0,0 +1,122 @@
+import re
+import numpy as np
+import pandas as pd
+
+class DtypeOptimizer:
+    """
+    Clase encargada de reducir la memoria de un DataFrame ajustando los tipos
+    de datos de sus columnas: reduce enteros y flotantes al tipo más pequeño sin
+    pérdida, convierte texto de baja cardinalidad en 'category' (y el resto en
+    cadenas de Arrow si pyarrow está disponible) y parsea columnas con fechas
+    ISO 8601.
+    """
+
+    # Patrón que debe cumplir un texto para intentar interpretarlo como fecha: solo
+    # ISO 8601 (año-mes-día). Formatos como 03/04/2024 son ambiguos (día o mes
+    # primero) y se dejan como texto en lugar de adivinar el orden.
+    DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+
+    def __init__(self, category_threshold: float = 0.5, date_sample_size: int = 1000):
+        """
+        Args:
+            category_threshold (float): Proporción máxima de valores únicos sobre
+                       valores no nulos para convertir una columna de texto en 'category'.
+            date_sample_size (int): Número de valores revisados para decidir si una
+                       columna de texto contiene fechas.
+        """
+        self.category_threshold = category_threshold
+        self.date_sample_size = date_sample_size
+
+    def optimize(self, df: pd.DataFrame):
+        """
+        Ajusta los tipos de datos del DataFrame para reducir su memoria.
+
+        Args:
+            df (pd.DataFrame): El DataFrame a optimizar. No se modifica.
+
+        Returns:
+            tuple: (DataFrame optimizado, reporte). El reporte es un diccionario con
+                   'bytes_before', 'bytes_after' y 'columns' (columna -> (tipo anterior,
+                   tipo nuevo)) solo para las columnas que cambiaron.
+        """
+        bytes_before = int(df.memory_usage(deep=True).sum())
+        optimized = {}
+        changes = {}
+
+        for col in df.columns:
+            series = df[col]
+            new_series = self._optimize_series(series)
+            optimized[col] = new_series
+            if new_series.dtype != series.dtype:
+                changes[col] = (str(series.dtype), str(new_series.dtype))
+
+        result = pd.DataFrame(optimized, index=df.index)
+        result.attrs = dict(df.attrs)
+        bytes_after = int(result.memory_usage(deep=True).sum())
+
+        print(f"DtypeOptimizer: Memoria reducida de {bytes_before:,} a {bytes_after:,} bytes "
+              f"({len(changes)} columnas ajustadas).")
+        return result, {
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "columns": changes,
+        }
+
+    def _optimize_series(self, series: pd.Series) -> pd.Series:
+        """Retorna la columna con el tipo más compacto que conserve sus valores."""
+        if pd.api.types.is_bool_dtype(series):
+            return series
+        if pd.api.types.is_integer_dtype(series):
+            return self._downcast_integer(series)
+        if pd.api.types.is_float_dtype(series):
+            return self._downcast_float(series)
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            return self._optimize_text(series)
+        return series
+
+    def _downcast_integer(self, series: pd.Series) -> pd.Series:
+        """
+        Reduce enteros al tipo con signo más pequeño. No se usan tipos sin signo
+        para evitar desbordamientos al restar en operaciones posteriores.
+        """
+        if series.empty:
+            return series
+        return pd.to_numeric(series, downcast='integer')
+
+    def _downcast_float(self, series: pd.Series) -> pd.Series:
+        """Reduce flotantes a float32 solo si la conversión no pierde precisión."""
+        # Los tipos con nulos de Pandas (Float64) no se tocan
+        if not isinstance(series.dtype, np.dtype) or series.dtype == np.float32:
+            return series
+        values = series.to_numpy()
+        as_float32 = values.astype(np.float32)
+        if np.array_equal(as_float32.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(as_float32, index=series.index, name=series.name)
+        return series
+
+    def _optimize_text(self, series: pd.Series) -> pd.Series:
+        """Convierte texto en fechas, 'category' o cadenas de Arrow según su contenido."""
+        non_null = series.dropna()
+        if non_null.empty:
+            return series
+        # Solo se optimizan columnas con texto puro; los tipos mezclados se dejan igual
+        sample = non_null.iloc[:self.date_sample_size]
+        if not all(isinstance(value, str) for value in sample):
+            return series
+
+        if all(self.DATE_PATTERN.match(value.strip()) for value in sample):
+            parsed = pd.to_datetime(series, format='ISO8601', errors='coerce')
+            if parsed.notna().sum() == len(non_null):
+                return parsed
+
+        if non_null.nunique() / len(non_null) <= self.category_threshold:
+            return series.astype('category')
+
+        if isinstance(series.dtype, pd.ArrowDtype):
+            # Ya son cadenas de Arrow: convertirlas solo haría una copia
+            return series
+
+        try:
+            return series.astype('string[pyarrow]')
+        except ImportError:
+            return series
@@ -1,18 +1,28 @@
 import pandas as pd
 import os
+from typing import Callable, Optional
 
 class FileProcessor:
     """
     Clase encargada de procesar archivos, incluyendo la conversión de formatos.
     """
 
-    def convert_xlsx_to_csv(self, input_xlsx_path: str, output_csv_path: str):
+    # Número de filas por lote en la lectura en streaming de XLSX
+    DEFAULT_CHUNKSIZE = 50_000
+
+    def convert_xlsx_to_csv(self, input_xlsx_path: str, output_csv_path: str, streaming: bool = True,
+                            progress_callback: Optional[Callable[[int, int, int], None]] = None):
         """
         Convierte un archivo XLSX a CSV.
 
         Args:
             input_xlsx_path (str): La ruta completa al archivo XLSX de entrada.
             output_csv_path (str): La ruta completa donde se guardará el archivo CSV de salida.
+            streaming (bool): Si es True (por defecto), las filas se leen con el iterador
+                              de solo lectura de openpyxl y se escriben una a una, con
+                              memoria constante. Si es False, se usa pd.read_excel.
+            progress_callback (callable, optional): Función que recibe
+                              (bytes_estimados, bytes_totales, filas_escritas) en modo streaming.
 
         Returns:
             bool: True si la conversión fue exitosa, False en caso contrario.
@@ -22,19 +32,183 @@ class FileProcessor:
             return False
 
         try:
+            # Asegurarse de que el directorio de salida existe
+            self._ensure_output_dir(output_csv_path)
+
+            if streaming:
+                rows_written = self._stream_xlsx_to_csv(input_xlsx_path, output_csv_path, progress_callback)
+                print(f"FileProcessor: Archivo XLSX '{os.path.basename(input_xlsx_path)}' convertido a CSV "
+                      f"en streaming ({rows_written} filas) en '{output_csv_path}'.")
+                return True
+
             # Leer el archivo XLSX en un DataFrame
             df = pd.read_excel(input_xlsx_path)
 
-            # Asegurarse de que el directorio de salida existe
-            output_dir = os.path.dirname(output_csv_path)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-                print(f"FileProcessor: Directorio de salida creado: {output_dir}")
-
             # Guardar el DataFrame como CSV
             df.to_csv(output_csv_path, index=False) # index=False para no escribir el índice de Pandas
             print(f"FileProcessor: Archivo XLSX '{os.path.basename(input_xlsx_path)}' convertido a CSV exitosamente en '{output_csv_path}'.")
             return True
         except Exception as e:
             print(f"FileProcessor Error: Error al convertir XLSX a CSV: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def convert_xlsx_to_parquet(self, input_xlsx_path: str, output_parquet_path: str,
+                                chunksize: Optional[int] = None,
+                                progress_callback: Optional[Callable[[int, int, int], None]] = None):
+        """
+        Convierte un archivo XLSX a Parquet por lotes, con memoria acotada al tamaño
+        de un lote. Requiere pyarrow.
+
+        Args:
+            input_xlsx_path (str): La ruta completa al archivo XLSX de entrada.
+            output_parquet_path (str): La ruta donde se guardará el archivo Parquet.
+            chunksize (int, optional): Filas por lote (y por grupo de filas del Parquet).
+            progress_callback (callable, optional): Función que recibe
+                              (bytes_estimados, bytes_totales, filas_escritas).
+
+        Returns:
+            bool: True si la conversión fue exitosa, False en caso contrario.
+        """
+        if not os.path.exists(input_xlsx_path):
+            print(f"FileProcessor Error: Archivo XLSX de entrada no encontrado en {input_xlsx_path}")
+            return False
+
+        writer = None
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            self._ensure_output_dir(output_parquet_path)
+            rows_written = 0
+            for chunk in self.iter_xlsx_chunks(input_xlsx_path, chunksize, progress_callback=progress_callback):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    # Las columnas vacías en el primer lote se guardan como texto
+                    schema = pa.schema([
+                        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                        for field in table.schema
+                    ]).remove_metadata()
+                    writer = pq.ParquetWriter(output_parquet_path, schema)
+                writer.write_table(table.cast(writer.schema))
+                rows_written += len(chunk)
+
+            if writer is None:
+                print(f"FileProcessor Error: El archivo XLSX '{os.path.basename(input_xlsx_path)}' está vacío.")
+                return False
+            print(f"FileProcessor: Archivo XLSX '{os.path.basename(input_xlsx_path)}' convertido a Parquet "
+                  f"({rows_written} filas) en '{output_parquet_path}'.")
+            return True
+        except Exception as e:
+            print(f"FileProcessor Error: Error al convertir XLSX a Parquet: {e}")
+            return False
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def iter_xlsx_chunks(self, input_xlsx_path: str, chunksize: Optional[int] = None,
+                         sheet_name: Optional[str] = None,
+                         progress_callback: Optional[Callable[[int, int, int], None]] = None):
+        """
+        Lee una hoja de un XLSX por lotes usando el modo de solo lectura de openpyxl,
+        que no construye el modelo completo del libro en memoria.
+
+        Args:
+            input_xlsx_path (str): La ruta al archivo XLSX.
+            chunksize (int, optional): Filas por lote. Por defecto, DEFAULT_CHUNKSIZE.
+            sheet_name (str, optional): Hoja a leer. Por defecto, la primera.
+            progress_callback (callable, optional): Función que recibe
+                              (bytes_estimados, bytes_totales, filas_leidas) tras cada lote.
+                              Los bytes se estiman a partir de las filas leídas sobre el
+                              total declarado por la hoja (0 si la hoja no lo declara).
+
+        Yields:
+            pd.DataFrame: Un DataFrame por lote, con la primera fila como encabezado
+                          (uno vacío con esas columnas si la hoja no tiene datos).
+        """
+        from openpyxl import load_workbook
+
+        chunksize = chunksize or self.DEFAULT_CHUNKSIZE
+        workbook = load_workbook(input_xlsx_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            total_bytes = os.path.getsize(input_xlsx_path)
+            total_rows = sheet.max_row - 1 if sheet.max_row else None
+
+            rows_iter = sheet.iter_rows(values_only=True)
+            header_row = next(rows_iter, None)
+            if header_row is None:
+                return
+            header = self._build_header(header_row)
+
+            rows = []
+            rows_read = 0
+            for row in rows_iter:
+                if all(value is None for value in row):
+                    continue # Filas vacías (frecuentes al final de la hoja)
+                rows.append(row[:len(header)])
+                if len(rows) >= chunksize:
+                    rows_read += len(rows)
+                    yield self._rows_to_frame(rows, header)
+                    rows = []
+                    self._report_xlsx_progress(progress_callback, rows_read, total_rows, total_bytes)
+
+            if rows or not rows_read:
+                # Una hoja con encabezado y sin datos da un lote vacío con sus columnas
+                rows_read += len(rows)
+                yield self._rows_to_frame(rows, header)
+            if progress_callback:
+                progress_callback(total_bytes, total_bytes, rows_read)
+        finally:
+            workbook.close()
+
+    def _stream_xlsx_to_csv(self, input_xlsx_path: str, output_csv_path: str,
+                            progress_callback: Optional[Callable[[int, int, int], None]] = None):
+        """Escribe el CSV lote a lote a partir de iter_xlsx_chunks. Retorna las filas escritas."""
+        rows_written = 0
+        with open(output_csv_path, 'w', newline='', encoding='utf-8') as output_file:
+            for chunk in self.iter_xlsx_chunks(input_xlsx_path, progress_callback=progress_callback):
+                chunk.to_csv(output_file, index=False, header=rows_written == 0)
+                rows_written += len(chunk)
+        return rows_written
+
+    def _build_header(self, header_row):
+        """Construye nombres de columna como lo haría Pandas (sin nombre o duplicados)."""
+        # Quitar celdas vacías al final del encabezado
+        header_values = list(header_row)
+        while header_values and header_values[-1] is None:
+            header_values.pop()
+
+        header = []
+        seen = {}
+        for i, value in enumerate(header_values):
+            name = f"Unnamed: {i}" if value is None else str(value)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            header.append(name)
+        return header
+
+    def _rows_to_frame(self, rows, header):
+        """Convierte una lista de tuplas en DataFrame rellenando filas cortas con None."""
+        width = len(header)
+        padded = [row + (None,) * (width - len(row)) if len(row) < width else row for row in rows]
+        return pd.DataFrame.from_records(padded, columns=header).infer_objects()
+
+    def _report_xlsx_progress(self, progress_callback, rows_read, total_rows, total_bytes):
+        """Informa del avance estimando los bytes por la proporción de filas leídas."""
+        if not progress_callback:
+            return
+        if total_rows:
+            estimated_bytes = min(int(total_bytes * rows_read / total_rows), total_bytes)
+            progress_callback(estimated_bytes, total_bytes, rows_read)
+        else:
+            progress_callback(0, 0, rows_read)
+
+    def _ensure_output_dir(self, output_path: str):
+        """Crea el directorio de salida si no existe."""
+        output_dir = os.path.dirname(output_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+            print(f"FileProcessor: Directorio de salida creado: {output_dir}")
@@ -0,0 +1,269 @@
+import os
+import re
+import unicodedata
+import duckdb
+import pandas as pd
+from typing import Optional
+from core.arrow_frames import fetch_frame
+
+# Tipos numéricos de DuckDB (DECIMAL lleva precisión y escala: DECIMAL(18,3))
+NUMERIC_TYPE_PREFIXES = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT',
+                         'USMALLINT', 'UINTEGER', 'UBIGINT', 'FLOAT', 'DOUBLE', 'DECIMAL')
+
+def quote_identifier(name: str) -> str:
+    """Escapa un nombre de tabla o columna para usarlo dentro de SQL de DuckDB."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+def quote_literal(value: str) -> str:
+    """Escapa una cadena para usarla como literal dentro de SQL de DuckDB."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+def table_name_from_file(file_name: str) -> str:
+    """
+    Propone un nombre de tabla SQL válido para un archivo: el nombre sin extensión,
+    sin acentos y con '_' en lugar de espacios y otros símbolos.
+    """
+    stem = os.path.splitext(os.path.basename(str(file_name)))[0]
+    ascii_stem = unicodedata.normalize("NFKD", stem).encode("ascii", "ignore").decode()
+    name = re.sub(r"[^0-9a-z_]+", "_", ascii_stem.lower()).strip("_") or "tabla"
+    return f"t_{name}" if name[0].isdigit() else name
+
+class LazyDataset:
+    """
+    Conjunto de datos respaldado por una vista de DuckDB sobre el archivo original
+    (CSV, XLSX o Parquet) o sobre una tabla guardada en una base de datos de DuckDB.
+    Los datos no se materializan en Pandas: solo se traen a memoria las vistas
+    previas, los resultados de consultas y las columnas que necesitan los gráficos.
+
+    La vista es temporal (propia de la conexión): no se guarda en una base de datos
+    persistente ni choca con las de otras sesiones. Para usarla desde otro cursor
+    hay que prepararlo con prepare_cursor().
+    """
+
+    # Extensiones que DuckDB puede leer directamente desde disco
+    SUPPORTED_EXTENSIONS = ('.csv', '.parquet', '.xlsx')
+
+    def __init__(self, file_path: str, connection: Optional[duckdb.DuckDBPyConnection] = None,
+                 table_name: str = 'my_table', source_table: Optional[str] = None):
+        """
+        Abre el archivo como una vista de DuckDB.
+
+        Args:
+            file_path (str): La ruta completa al archivo (o a la base de datos de
+                         DuckDB, si se indica source_table).
+            connection (duckdb.DuckDBPyConnection, optional): Conexión en la que se
+                         registra la vista. Si no se indica, se crea una en memoria.
+            table_name (str): Nombre con el que la vista queda disponible para SQL.
+            source_table (str, optional): Tabla guardada en la base de datos de la
+                         conexión sobre la que se crea la vista, en lugar de un archivo.
+
+        Raises:
+            ValueError: Si la extensión del archivo no está soportada.
+            duckdb.Error: Si DuckDB no puede leer el archivo.
+        """
+        self.file_path = file_path
+        self.source_table = source_table
+        self.file_name = source_table or os.path.basename(file_path)
+        self.table_name = table_name
+        self.connection = connection or duckdb.connect(database=':memory:', read_only=False)
+        self._num_rows = None
+        # DataFrame del XLSX cuando no está disponible la extensión 'excel' de DuckDB
+        self._xlsx_frame = None
+        self._source_sql = None
+        self._create_view()
+
+    def _create_view(self):
+        """Crea (o reemplaza) la vista que apunta al archivo."""
+        file_extension = os.path.splitext(self.file_path)[1].lower()
+        path_literal = quote_literal(self.file_path)
+
+        if self.source_table is not None:
+            source = quote_identifier(self.source_table)
+        elif file_extension == '.csv':
+            source = f"read_csv_auto({path_literal})"
+        elif file_extension == '.parquet':
+            source = f"read_parquet({path_literal})"
+        elif file_extension == '.xlsx':
+            source = self._xlsx_source(path_literal)
+        else:
+            raise ValueError(f"Formato de archivo no soportado para carga diferida: {file_extension}")
+
+        self._source_sql = source
+        self._create_view_on(self.connection)
+
+    def _create_view_on(self, connection: duckdb.DuckDBPyConnection):
+        """Crea la vista temporal en la conexión indicada."""
+        connection.execute(
+            f"CREATE OR REPLACE TEMP VIEW {quote_identifier(self.table_name)} AS SELECT * FROM {self._source_sql}"
+        )
+
+    def _xlsx_source(self, path_literal: str) -> str:
+        """
+        Retorna la expresión SQL para leer un XLSX.
+
+        Usa la extensión 'excel' de DuckDB si está disponible; si no se puede cargar
+        (por ejemplo, sin acceso a internet para instalarla), el libro se lee con
+        Pandas una única vez y se registra en la conexión.
+        """
+        try:
+            self.connection.execute("LOAD excel")
+            return f"read_xlsx({path_literal})"
+        except duckdb.Error:
+            print("LazyDataset: Extensión 'excel' de DuckDB no disponible, se usa Pandas para el XLSX.")
+            registered_name = f"{self.table_name}__xlsx"
+            self._xlsx_frame = pd.read_excel(self.file_path)
+            self.connection.register(registered_name, self._xlsx_frame)
+            return quote_identifier(registered_name)
+
+    @property
+    def relation(self):
+        """Retorna la relación de DuckDB asociada a la vista."""
+        return self.connection.table(self.table_name)
+
+    @property
+    def columns(self):
+        """Lista de nombres de columnas, obtenida solo del esquema."""
+        return self.relation.columns
+
+    @property
+    def dtypes(self):
+        """Diccionario columna -> tipo de DuckDB (como cadena)."""
+        relation = self.relation
+        return {col: str(col_type) for col, col_type in zip(relation.columns, relation.types)}
+
+    @property
+    def num_rows(self):
+        """Número de filas; se calcula con COUNT(*) la primera vez y se guarda."""
+        if self._num_rows is None:
+            self._num_rows = self.connection.execute(
+                f"SELECT COUNT(*) FROM {quote_identifier(self.table_name)}"
+            ).fetchall()[0][0]
+        return self._num_rows
+
+    @property
+    def shape(self):
+        """Tupla (filas, columnas), análoga a DataFrame.shape."""
+        return self.num_rows, len(self.columns)
+
+    def numeric_columns(self):
+        """Retorna los nombres de las columnas numéricas según el tipo de DuckDB."""
+        return [col for col, dtype in self.dtypes.items() if dtype.startswith(NUMERIC_TYPE_PREFIXES)]
+
+    def text_columns(self):
+        """Retorna los nombres de las columnas de texto."""
+        return [col for col, dtype in self.dtypes.items() if dtype == 'VARCHAR']
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        Retorna un cursor nuevo sobre la base de datos del dataset, con la vista
+        disponible, para ejecutar consultas sin bloquear la conexión principal.
+        """
+        cursor = self.connection.cursor()
+        self.prepare_cursor(cursor)
+        return cursor
+
+    def prepare_cursor(self, cursor: duckdb.DuckDBPyConnection):
+        """
+        Deja la vista utilizable en un cursor de la misma base de datos: las vistas
+        temporales y los DataFrames registrados (el XLSX leído con Pandas) solo son
+        visibles en la conexión donde se crean.
+        """
+        if self._xlsx_frame is not None:
+            cursor.register(f"{self.table_name}__xlsx", self._xlsx_frame)
+        self._create_view_on(cursor)
+
+    def query(self, query_string: str) -> pd.DataFrame:
+        """Ejecuta SQL en la conexión del dataset y trae el resultado a Pandas (respaldado por Arrow)."""
+        return fetch_frame(self.connection.execute(query_string))
+
+    def head(self, n: int = 10) -> pd.DataFrame:
+        """Retorna las primeras n filas como DataFrame de Pandas."""
+        return self.to_pandas(limit=n)
+
+    def to_pandas(self, columns: Optional[list] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Materializa en Pandas solo las columnas y filas pedidas.
+
+        Args:
+            columns (list, optional): Columnas a traer. Por defecto, todas.
+            limit (int, optional): Número máximo de filas a traer.
+
+        Returns:
+            pd.DataFrame: Los datos pedidos.
+        """
+        select_list = ", ".join(quote_identifier(col) for col in columns) if columns else "*"
+        sql = f"SELECT {select_list} FROM {quote_identifier(self.table_name)}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.query(sql)
+
+    def missing_values(self):
+        """Retorna un diccionario columna -> número de valores nulos, en un solo recorrido."""
+        columns = self.columns
+        if not columns:
+            return {}
+        aggregates = ", ".join(
+            f"COUNT(*) - COUNT({quote_identifier(col)})" for col in columns
+        )
+        counts = self.connection.execute(
+            f"SELECT {aggregates} FROM {quote_identifier(self.table_name)}"
+        ).fetchall()[0]
+        return dict(zip(columns, counts))
+
+    def describe(self) -> pd.DataFrame:
+        """
+        Calcula estadísticas descriptivas de las columnas numéricas en DuckDB,
+        con el mismo formato que DataFrame.describe() (estadísticas como índice).
+        """
+        numeric_columns = self.numeric_columns()
+        if not numeric_columns:
+            return pd.DataFrame()
+
+        stats = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        aggregates = []
+        for col in numeric_columns:
+            q = quote_identifier(col)
+            aggregates.extend([
+                f"COUNT({q})", f"AVG({q})", f"STDDEV_SAMP({q})", f"MIN({q})",
+                f"QUANTILE_CONT({q}, 0.25)", f"QUANTILE_CONT({q}, 0.5)",
+                f"QUANTILE_CONT({q}, 0.75)", f"MAX({q})",
+            ])
+        values = self.connection.execute(
+            f"SELECT {', '.join(aggregates)} FROM {quote_identifier(self.table_name)}"
+        ).fetchall()[0]
+
+        result = {}
+        for i, col in enumerate(numeric_columns):
+            result[col] = [float(v) if v is not None else float('nan')
+                           for v in values[i * len(stats):(i + 1) * len(stats)]]
+        return pd.DataFrame(result, index=stats)
+
+    def search(self, text: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Busca un texto (sin distinguir mayúsculas) en las columnas de texto.
+
+        Args:
+            text (str): El texto a buscar.
+            limit (int, optional): Número máximo de filas a devolver.
+
+        Returns:
+            pd.DataFrame: Las filas coincidentes. Vacío si no hay columnas de texto.
+        """
+        text_columns = self.text_columns()
+        if not text_columns:
+            return pd.DataFrame()
+        pattern = quote_literal(f"%{text}%")
+        conditions = " OR ".join(f"{quote_identifier(col)} ILIKE {pattern}" for col in text_columns)
+        sql = f"SELECT * FROM {quote_identifier(self.table_name)} WHERE {conditions}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.query(sql)
+
+    def close(self):
+        """Elimina la vista (y el XLSX registrado, si lo hay) de la conexión."""
+        try:
+            self.connection.execute(f"DROP VIEW IF EXISTS {quote_identifier(self.table_name)}")
+            self.connection.unregister(f"{self.table_name}__xlsx")
+            self._xlsx_frame = None
+        except duckdb.Error as e:
+            print(f"LazyDataset Error: No se pudo eliminar la vista '{self.table_name}': {e}")
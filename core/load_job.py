@@ -0,0 +1,59 @@
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Optional
+
+class LoadCancelledError(Exception):
+    """Se lanza cuando una carga de archivo se cancela antes de terminar."""
+
+class LoadJob:
+    """
+    Manejador de una carga de archivo que se ejecuta en segundo plano.
+    Permite consultar el avance, cancelar la carga y obtener el resultado.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+        # Último avance informado: (bytes_leidos, bytes_totales, filas_leidas)
+        self.progress = (0, 0, 0)
+        # Copia de los reportes del DataLoader al terminar esta carga
+        self.engine_timing = None
+        self.optimization_report = None
+        self.sources_report = None
+
+    def cancel(self):
+        """
+        Pide la cancelación de la carga. Si aún no empezó, no llega a ejecutarse;
+        si está en curso, se detiene en el siguiente lote leído.
+        """
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica si se pidió cancelar la carga."""
+        return self.cancel_event.is_set()
+
+    def done(self) -> bool:
+        """Indica si la carga terminó (con éxito, con error o cancelada)."""
+        return self.future is not None and self.future.done()
+
+    def result(self, timeout: Optional[float] = None):
+        """
+        Espera a que termine la carga y retorna su resultado.
+
+        Args:
+            timeout (float, optional): Segundos máximos de espera.
+
+        Returns:
+            tuple: (DataFrame, nombre del archivo), igual que DataLoader.load_data_from_file.
+
+        Raises:
+            LoadCancelledError: Si la carga fue cancelada.
+        """
+        try:
+            return self.future.result(timeout=timeout)
+        except CancelledError:
+            raise LoadCancelledError(f"Carga de '{self.file_path}' cancelada.")
@@ -0,0 +1,300 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+import duckdb
+import numpy as np
+import pandas as pd
+from core.arrow_frames import scan_source
+from core.column_profile import ColumnProfile
+from core.lazy_dataset import NUMERIC_TYPE_PREFIXES
+
+try:
+    import pyarrow as pa # Formato de los datos en memoria compartida (opcional)
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Se conecta a un bloque de memoria compartida creado por el proceso principal,
+    que es quien lo libera. Desde Python 3.13 la conexión no se registra en el
+    resource_tracker; antes, los procesos del pool comparten el del proceso
+    principal y el registro repetido no tiene efecto.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def _column_stats(column, name: str, column_type: str, numeric: bool, top_k: int, quantiles: tuple) -> dict:
+    """
+    Estadísticas de una columna de Arrow, con el formato de ColumnProfile. El nombre,
+    el tipo de DuckDB y si es numérica vienen del proceso principal (DESCRIBE).
+    """
+    if pa.types.is_dictionary(column.type):
+        # Categóricas de Pandas: se decodifican para calcular rango y frecuencias
+        column = column.cast(column.type.value_type)
+    count = len(column) - column.null_count
+    min_max = pc.min_max(column).as_py() if count else {"min": None, "max": None}
+    stats = {
+        "name": name,
+        "type": column_type,
+        "numeric": numeric,
+        "count": count,
+        "nulls": column.null_count,
+        "distinct": pc.count_distinct(column, mode="only_valid").as_py(),
+        "min": min_max["min"],
+        "max": min_max["max"],
+        "mean": None,
+        "std": None,
+        "quantiles": None,
+        "quantile_rank_error": None,
+        "top_values": [],
+    }
+    if numeric and count:
+        stats["mean"] = pc.mean(column).as_py()
+        stats["std"] = pc.stddev(column, ddof=1).as_py() if count > 1 else None
+        # Interpolación lineal, como DataFrame.describe()
+        stats["quantiles"] = [float(q) for q in pc.quantile(column, q=list(quantiles),
+                                                             interpolation="linear").to_pylist()]
+    elif count:
+        counts = pc.value_counts(column)
+        order = np.argsort(-counts.field("counts").to_numpy(), kind="stable")[:top_k + 1]
+        values = counts.field("values").take(pa.array(order)).to_pylist()
+        stats["top_values"] = [value for value in values if value is not None][:top_k]
+    return stats
+
+def _profile_columns(shm_name: str, columns: list, top_k: int, quantiles: tuple) -> list:
+    """
+    Perfila un grupo de columnas, guardado como tabla de Arrow en memoria compartida.
+    Se ejecuta en un proceso del pool: la tabla se lee sin copia.
+
+    Args:
+        shm_name (str): Bloque de memoria compartida con la tabla del grupo.
+        columns (list): Tuplas (posición en el DataFrame, nombre, tipo de DuckDB, numérica),
+                 en el orden de las columnas de la tabla.
+
+    Returns:
+        list: Tuplas (posición, estadísticas) de cada columna.
+    """
+    shm = _attach_shared_memory(shm_name)
+    try:
+        buffer = pa.py_buffer(shm.buf)
+        table = pa.ipc.open_stream(buffer).read_all()
+        results = [(i, _column_stats(table.column(j), name, column_type, numeric, top_k, quantiles))
+                   for j, (i, name, column_type, numeric) in enumerate(columns)]
+        # Los buffers de Arrow apuntan al bloque: deben soltarse antes de cerrarlo
+        del table, buffer
+        return results
+    finally:
+        shm.close()
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Crea un pool de procesos. Se arrancan con "spawn", como el pool de DataLoader:
+    un fork copiaría los hilos de DuckDB y de la interfaz en un estado inconsistente.
+    El resource_tracker se arranca antes para que los procesos del pool compartan
+    el del proceso principal: si cada uno arrancara el suyo, al terminar borraría
+    los bloques de memoria compartida que abrió.
+    """
+    resource_tracker.ensure_running()
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+def _warm_up(_):
+    """Tarea vacía para arrancar los procesos del pool antes de medir."""
+    return os.getpid()
+
+class ParallelProfiler:
+    """
+    Calcula el perfil de columnas de un DataFrame (ver ColumnProfile) repartiendo
+    las columnas entre los procesos de un pool, para tablas anchas en máquinas con
+    varios núcleos.
+
+    Las columnas se reparten en grupos de tamaño parecido en bytes, y cada grupo
+    se escribe una sola vez como tabla de Arrow (formato IPC) en su propio bloque
+    de memoria compartida, sin convertir antes el DataFrame entero; cada proceso
+    abre el bloque de su grupo sin copiarlo ni recibirlo serializado y calcula
+    conteos, valores distintos, rango, media, desviación, cuartiles y valores más
+    frecuentes, todos exactos. Los tipos y qué columnas son numéricas se toman de
+    DuckDB, como en ColumnProfile.
+    """
+
+    # Grupos de columnas por proceso: más grupos reparten mejor columnas de tamaños distintos
+    TASKS_PER_WORKER = 4
+
+    def __init__(self, max_workers: Optional[int] = None, top_k: int = 5):
+        """
+        Args:
+            max_workers (int, optional): Procesos del pool. Por defecto, uno por núcleo.
+            top_k (int): Valores más frecuentes a guardar por columna no numérica.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.top_k = top_k
+        # Pool de procesos (se crea en el primer uso y se reutiliza)
+        self._executor = None
+
+    @staticmethod
+    def is_available() -> bool:
+        """Indica si el perfil en paralelo se puede usar (requiere pyarrow)."""
+        return pa is not None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Retorna el pool de procesos, creándolo si hace falta."""
+        if self._executor is None:
+            self._executor = _new_pool(self.max_workers)
+        return self._executor
+
+    def close(self):
+        """Detiene los procesos del pool."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def profile(self, df: pd.DataFrame) -> ColumnProfile:
+        """
+        Perfila el DataFrame en el pool de procesos.
+
+        Args:
+            df (pd.DataFrame): Los datos.
+
+        Returns:
+            ColumnProfile: El perfil (con cuartiles exactos, como describe()).
+
+        Raises:
+            RuntimeError: Si pyarrow no está instalado.
+        """
+        if not self.is_available():
+            raise RuntimeError("ParallelProfiler Error: El perfil en paralelo requiere pyarrow.")
+        return self._profile(df, self._get_executor(), self.max_workers)
+
+    def _profile(self, df: pd.DataFrame, executor: ProcessPoolExecutor, workers: int) -> ColumnProfile:
+        """Escribe los grupos de columnas en memoria compartida y los reparte entre los procesos."""
+        started = time.perf_counter()
+        types = self._duckdb_types(df)
+        blocks = []
+        try:
+            futures = []
+            for positions in self._column_groups(df, workers):
+                shm = self._write_shared_table(df, positions)
+                blocks.append(shm)
+                columns = [(i, types[i][0], types[i][1], types[i][1].startswith(NUMERIC_TYPE_PREFIXES))
+                           for i in positions]
+                futures.append(executor.submit(_profile_columns, shm.name, columns, self.top_k,
+                                               ColumnProfile.QUANTILES))
+            profiled = {}
+            for future in as_completed(futures):
+                profiled.update(future.result())
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+        # Las columnas se asocian por posición (DuckDB y Arrow convierten los nombres a texto)
+        columns = {column: profiled[i] for i, column in enumerate(df.columns)}
+        dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        return ColumnProfile(len(df), columns, dtypes, time.perf_counter() - started,
+                             approximate="sample_info" in df.attrs)
+
+    @staticmethod
+    def _duckdb_types(df: pd.DataFrame) -> list:
+        """Nombre y tipo de DuckDB de cada columna, en orden (DESCRIBE no recorre los datos)."""
+        connection = duckdb.connect()
+        try:
+            connection.register("perfil", scan_source(df))
+            return [(name, column_type) for name, column_type, *_ in connection.execute("DESCRIBE perfil").fetchall()]
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _write_shared_table(df: pd.DataFrame, positions: list) -> shared_memory.SharedMemory:
+        """
+        Escribe las columnas indicadas como tabla de Arrow (formato IPC) en un bloque
+        nuevo de memoria compartida. Las columnas numéricas pasan a Arrow sin copia,
+        así que la única copia es la del bloque.
+        """
+        table = pa.Table.from_arrays([pa.array(df.iloc[:, i]) for i in positions],
+                                     names=[str(i) for i in positions])
+        sink = pa.MockOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        shm = shared_memory.SharedMemory(create=True, size=max(sink.size(), 1))
+        try:
+            buffer = pa.py_buffer(shm.buf)
+            with pa.ipc.new_stream(pa.FixedSizeBufferWriter(buffer), table.schema) as writer:
+                writer.write_table(table)
+            del buffer
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        return shm
+
+    def _column_groups(self, df: pd.DataFrame, workers: int) -> list:
+        """
+        Reparte las posiciones de las columnas en grupos de tamaño parecido en bytes
+        (la columna más grande va al grupo menos cargado).
+        """
+        num_columns = df.shape[1]
+        num_groups = max(1, min(num_columns, workers * self.TASKS_PER_WORKER))
+        groups = [[] for _ in range(num_groups)]
+        loads = [0] * num_groups
+        sizes = df.memory_usage(index=False, deep=False).to_numpy()
+        for i in sorted(range(num_columns), key=lambda i: sizes[i], reverse=True):
+            target = loads.index(min(loads))
+            groups[target].append(i)
+            loads[target] += sizes[i]
+        # Cada grupo en el orden de las columnas
+        return [sorted(group) for group in groups if group]
+
+    def scaling_report(self, df: pd.DataFrame, worker_counts: Optional[list] = None,
+                       repeats: int = 1) -> list:
+        """
+        Mide el tiempo del perfil en paralelo con distintos números de procesos.
+
+        Args:
+            df (pd.DataFrame): Los datos.
+            worker_counts (list, optional): Procesos a probar. Por defecto, 1, 2, 4...
+                   hasta el número de núcleos.
+            repeats (int): Mediciones por número de procesos (se toma la mejor).
+
+        Returns:
+            list: Un diccionario por medición con 'workers', 'seconds', 'speedup'
+                  (respecto a 1 proceso) y 'efficiency' (speedup / procesos).
+
+        Raises:
+            RuntimeError: Si pyarrow no está instalado.
+        """
+        if not self.is_available():
+            raise RuntimeError("ParallelProfiler Error: El perfil en paralelo requiere pyarrow.")
+        cores = os.cpu_count() or 1
+        if worker_counts is None:
+            worker_counts = [1]
+            while worker_counts[-1] * 2 <= cores:
+                worker_counts.append(worker_counts[-1] * 2)
+            if worker_counts[-1] != cores:
+                worker_counts.append(cores)
+        worker_counts = sorted(set(worker_counts) | {1})
+
+        report = []
+        for workers in worker_counts:
+            with _new_pool(workers) as executor:
+                # El arranque de los procesos no cuenta en la medición
+                list(executor.map(_warm_up, range(workers)))
+                seconds = min(self._timed_profile(df, executor, workers) for _ in range(max(repeats, 1)))
+            report.append({"workers": workers, "seconds": seconds})
+        baseline = report[0]["seconds"]
+        for entry in report:
+            entry["speedup"] = baseline / entry["seconds"] if entry["seconds"] else 0.0
+            entry["efficiency"] = entry["speedup"] / entry["workers"]
+            print(f"ParallelProfiler: {entry['workers']} procesos: {entry['seconds']:.2f} s "
+                  f"(x{entry['speedup']:.2f}, eficiencia {entry['efficiency']:.0%}).")
+        return report
+
+    def _timed_profile(self, df: pd.DataFrame, executor: ProcessPoolExecutor, workers: int) -> float:
+        """Segundos que tarda un perfil completo con ese pool."""
+        started = time.perf_counter()
+        self._profile(df, executor, workers)
+        return time.perf_counter() - started
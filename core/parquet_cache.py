@@ -0,0 +1,184 @@
+import hashlib
+import os
+import time
+import pandas as pd
+from typing import Optional
+
+class ParquetCache:
+    """
+    Caché en disco de archivos ya cargados, guardados en formato Parquet.
+
+    Cada entrada se identifica por la ruta del archivo original, su tamaño, su
+    fecha de modificación y un hash de su contenido, de forma que cualquier cambio
+    en el archivo invalida automáticamente la copia. Las entradas se eliminan por
+    antigüedad y, si se supera el tamaño total permitido, por menor uso reciente.
+    """
+
+    # Bytes leídos de cada región (inicio, medio y final) para el hash de contenido
+    HASH_SAMPLE_BYTES = 1024 * 1024
+
+    def __init__(self, cache_dir: Optional[str] = None, max_total_bytes: int = 5 * 1024 ** 3,
+                 max_age_seconds: int = 7 * 24 * 3600):
+        """
+        Args:
+            cache_dir (str, optional): Directorio de la caché. Por defecto,
+                       '~/.analizador_datos/cache'.
+            max_total_bytes (int): Tamaño total máximo de la caché en bytes.
+            max_age_seconds (int): Antigüedad máxima de una entrada sin usarse, en segundos.
+        """
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".analizador_datos", "cache")
+        self.max_total_bytes = max_total_bytes
+        self.max_age_seconds = max_age_seconds
+
+    def _path_key(self, file_path: str) -> str:
+        """Hash de la ruta absoluta; agrupa todas las versiones de un mismo archivo."""
+        return hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+
+    def _content_key(self, file_path: str) -> str:
+        """
+        Hash de tamaño, fecha de modificación y contenido del archivo.
+
+        Para que calcularlo no cueste tanto como parsear el archivo, el contenido
+        se muestrea en tres regiones (inicio, medio y final) en lugar de leerse entero.
+        """
+        stat = os.stat(file_path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        with open(file_path, "rb") as file_handle:
+            for offset in (0, stat.st_size // 2, max(stat.st_size - self.HASH_SAMPLE_BYTES, 0)):
+                file_handle.seek(offset)
+                digest.update(file_handle.read(self.HASH_SAMPLE_BYTES))
+        return digest.hexdigest()
+
+    def _entry_path(self, file_path: str) -> str:
+        """Ruta del archivo Parquet de la caché para la versión actual del archivo."""
+        return os.path.join(self.cache_dir, f"{self._path_key(file_path)}-{self._content_key(file_path)}.parquet")
+
+    def _entries(self):
+        """Lista de (ruta, tamaño, última modificación) de las entradas de la caché."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".parquet"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, file_path: str, columns: Optional[list] = None, filters=None,
+            dtype_backend: str = 'numpy'):
+        """
+        Retorna el DataFrame guardado para el archivo, o None si no hay una copia válida.
+
+        Args:
+            file_path (str): La ruta al archivo original (CSV o XLSX).
+            columns (list, optional): Columnas a leer de la copia. Por defecto, todas.
+            filters (list | pc.Expression, optional): Filtros de filas (tuplas columna,
+                       operador, valor, o expresión de pyarrow.compute) que Parquet
+                       aplica al leer, descartando grupos de filas enteros.
+            dtype_backend (str): 'numpy' o 'pyarrow' (DataFrame respaldado por Arrow,
+                       sin convertir las columnas leídas).
+
+        Returns:
+            pd.DataFrame: El DataFrame en caché, o None.
+        """
+        try:
+            entry_path = self._entry_path(file_path)
+            if not os.path.exists(entry_path):
+                return None
+            backend = {'dtype_backend': 'pyarrow'} if dtype_backend == 'pyarrow' else {}
+            if isinstance(filters, list) and not filters:
+                filters = None # Una lista vacía no filtra (pyarrow la rechaza)
+            df = pd.read_parquet(entry_path, columns=columns, filters=filters, **backend)
+            os.utime(entry_path, None) # Marca la entrada como usada recientemente
+            print(f"ParquetCache: Copia en caché encontrada para '{os.path.basename(file_path)}'.")
+            return df
+        except Exception as e:
+            print(f"ParquetCache Error: No se pudo leer la caché de '{os.path.basename(file_path)}': {e}")
+            return None
+
+    def put(self, file_path: str, df: pd.DataFrame):
+        """
+        Guarda el DataFrame como copia Parquet del archivo y aplica la política de desalojo.
+        Las versiones anteriores del mismo archivo se eliminan.
+
+        Args:
+            file_path (str): La ruta al archivo original.
+            df (pd.DataFrame): El DataFrame cargado desde ese archivo.
+
+        Returns:
+            bool: True si la copia se guardó, False en caso contrario.
+        """
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry_path = self._entry_path(file_path)
+            self.invalidate(file_path)
+
+            # Escribir en un archivo temporal y renombrar, para no dejar entradas a medias
+            tmp_path = entry_path + ".tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, entry_path)
+            print(f"ParquetCache: Copia Parquet guardada para '{os.path.basename(file_path)}'.")
+            self.evict()
+            return True
+        except Exception as e:
+            print(f"ParquetCache Error: No se pudo guardar la caché de '{os.path.basename(file_path)}': {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def invalidate(self, file_path: Optional[str] = None):
+        """
+        Elimina entradas de la caché.
+
+        Args:
+            file_path (str, optional): Si se indica, elimina todas las versiones de ese
+                       archivo; si no, vacía la caché por completo.
+
+        Returns:
+            int: Número de entradas eliminadas.
+        """
+        prefix = f"{self._path_key(file_path)}-" if file_path else ""
+        removed = 0
+        for path, _, _ in self._entries():
+            if os.path.basename(path).startswith(prefix):
+                os.remove(path)
+                removed += 1
+        if removed:
+            print(f"ParquetCache: {removed} entrada(s) eliminada(s).")
+        return removed
+
+    def evict(self):
+        """
+        Elimina las entradas más antiguas que max_age_seconds y, si la caché sigue
+        superando max_total_bytes, las menos usadas recientemente.
+
+        Returns:
+            int: Número de entradas eliminadas.
+        """
+        now = time.time()
+        removed = 0
+        entries = []
+        for path, size, mtime in self._entries():
+            if now - mtime > self.max_age_seconds:
+                os.remove(path)
+                removed += 1
+            else:
+                entries.append((path, size, mtime))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total_bytes <= self.max_total_bytes:
+                break
+            os.remove(path)
+            total_bytes -= size
+            removed += 1
+
+        if removed:
+            print(f"ParquetCache: {removed} entrada(s) desalojada(s) de la caché.")
+        return removed
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -8,7 +9,12 @@ from typing import Optional
 class PlotGenerator:
     """
     Clase encargada de generar diferentes tipos de gráficos
-    a partir de un DataFrame de Pandas.
+    a partir de un DataFrame de Pandas. Si el DataFrame es una muestra
+    (vista previa por muestreo), el título del gráfico lo indica.
+
+    Las columnas respaldadas por Arrow (pd.ArrowDtype) se leen directamente: las
+    numéricas se pasan a Matplotlib como arrays de NumPy sobre el mismo buffer
+    cuando no tienen nulos, y los conteos se calculan en Arrow.
     """
 
     def __init__(self):
@@ -40,6 +46,26 @@ class PlotGenerator:
         img_base64 = base64.b64encode(buf.read()).decode('utf-8')
         plt.close(fig) # Cierra la figura para liberar memoria
         return img_base64
+
+    def _label_title(self, df: pd.DataFrame, title: str) -> str:
+        """Añade al título la marca de aproximado si el DataFrame es una muestra."""
+        sample_info = df.attrs.get("sample_info")
+        if not sample_info:
+            return title
+        return f"{title} (aprox., muestra de {sample_info['sample_rows']:,} filas)"
+
+    def _plot_values(self, df: pd.DataFrame, column: str) -> pd.Series:
+        """
+        Retorna la columna lista para graficar. Una columna numérica de Arrow se
+        convierte en float64 de NumPy (sin copia si no tiene nulos ni varios bloques);
+        el resto se retorna tal cual.
+        """
+        series = df[column]
+        if isinstance(series.dtype, pd.ArrowDtype) and pd.api.types.is_numeric_dtype(series):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            return pd.Series(values, index=series.index, name=column, copy=False)
+        return series
+
     def generate_histogram(self, df: pd.DataFrame, column: str, title: Optional[str] = None):
         """
         Genera un histograma para una columna numérica.
@@ -60,8 +86,8 @@ class PlotGenerator:
             return None
 
         fig, ax = plt.subplots()
-        sns.histplot(data=df, x=column, kde=True, ax=ax) # Seaborn recomienda usar 'data' y 'x'
-        ax.set_title(title or f'Histograma de {column}')
+        sns.histplot(x=self._plot_values(df, column), kde=True, ax=ax)
+        ax.set_title(self._label_title(df, title or f'Histograma de {column}'))
         ax.set_xlabel(column)
         ax.set_ylabel('Frecuencia')
         return self._plot_to_base64(fig)
@@ -87,8 +113,8 @@ class PlotGenerator:
             return None
 
         fig, ax = plt.subplots()
-        sns.scatterplot(x=df[x_column], y=df[y_column], ax=ax)
-        ax.set_title(title or f'Dispersión de {x_column} vs {y_column}')
+        sns.scatterplot(x=self._plot_values(df, x_column), y=self._plot_values(df, y_column), ax=ax)
+        ax.set_title(self._label_title(df, title or f'Dispersión de {x_column} vs {y_column}'))
         ax.set_xlabel(x_column)
         ax.set_ylabel(y_column)
         return self._plot_to_base64(fig)
@@ -119,12 +145,12 @@ class PlotGenerator:
 
         fig, ax = plt.subplots()
         if by_column:
-            sns.boxplot(x=df[by_column], y=df[column], ax=ax)
-            ax.set_title(title or f'Diagrama de Caja de {column} por {by_column}')
+            sns.boxplot(x=df[by_column], y=self._plot_values(df, column), ax=ax)
+            ax.set_title(self._label_title(df, title or f'Diagrama de Caja de {column} por {by_column}'))
             ax.set_xlabel(by_column)
         else:
-            sns.boxplot(y=df[column], ax=ax)
-            ax.set_title(title or f'Diagrama de Caja de {column}')
+            sns.boxplot(y=self._plot_values(df, column), ax=ax)
+            ax.set_title(self._label_title(df, title or f'Diagrama de Caja de {column}'))
         ax.set_ylabel(column)
         return self._plot_to_base64(fig)
 
@@ -145,8 +171,45 @@ class PlotGenerator:
             return None
 
         fig, ax = plt.subplots()
-        sns.countplot(y=df[column], order=df[column].value_counts().index, ax=ax)
-        ax.set_title(title or f'Conteo de {column}')
+        # Los conteos se calculan una vez (en Arrow si la columna lo es) y se dibujan como barras
+        counts = df[column].value_counts()
+        sns.barplot(x=counts.to_numpy(), y=counts.index.astype(str), orient='h', ax=ax)
+        ax.set_title(self._label_title(df, title or f'Conteo de {column}'))
         ax.set_xlabel('Conteo')
         ax.set_ylabel(column)
-        return self._plot_to_base64(fig)
\ No newline at end of file
+        return self._plot_to_base64(fig)
+    def generate_correlation_heatmap(self, corr: pd.DataFrame, title: Optional[str] = None,
+                                     annotate: Optional[bool] = None):
+        """
+        Genera un mapa de calor de una matriz de correlación (ver
+        DataAnalyzer.get_correlation_matrix).
+
+        Args:
+            corr (pd.DataFrame): Matriz de correlación cuadrada, con valores entre -1 y 1.
+            title (str, optional): Título del gráfico. Por defecto, "Correlación ([método])".
+            annotate (bool, optional): Si se escribe el coeficiente en cada celda. Por
+                   defecto, solo con 15 columnas o menos.
+
+        Returns:
+            str: Cadena base64 de la imagen del mapa de calor, o None si hay un error.
+        """
+        if corr is None or corr.empty or corr.shape[0] != corr.shape[1]:
+            print("PlotGenerator Error: Matriz de correlación vacía o no cuadrada para el mapa de calor.")
+            return None
+
+        num_columns = len(corr)
+        annotate = num_columns <= 15 if annotate is None else annotate
+        # La figura crece con el número de columnas, hasta un máximo legible
+        side = min(max(6.0, 0.45 * num_columns), 24.0)
+        fig, ax = plt.subplots(figsize=(side + 2, side))
+        sns.heatmap(corr, vmin=-1, vmax=1, center=0, cmap='coolwarm', square=True,
+                    annot=annotate, fmt='.2f', annot_kws={'size': 9},
+                    xticklabels='auto', yticklabels='auto', cbar_kws={'shrink': 0.8}, ax=ax)
+        if title is None:
+            title = f"Correlación ({corr.attrs.get('method', 'pearson')})"
+            if corr.attrs.get("sampled"):
+                title += f" (aprox., muestra de {corr.attrs['rows_used']:,} filas)"
+            elif corr.attrs.get("approximate"):
+                title += " (aprox., vista previa)"
+        ax.set_title(title)
+        return self._plot_to_base64(fig)
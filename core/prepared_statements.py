@@ -0,0 +1,176 @@
+import datetime
+import json
+import math
+import numbers
+import re
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Optional
+import duckdb
+from core.lazy_dataset import quote_literal
+
+# Parámetro con nombre en una consulta: $nombre
+PARAMETER_PATTERN = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)")
+
+# Cadenas, identificadores entre comillas y comentarios, donde '$' no marca un parámetro
+_NON_CODE_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+def query_parameters(query_string: str) -> list:
+    """
+    Retorna los nombres de los parámetros ($nombre) de una consulta, en el orden
+    en que aparecen y sin repetir. Se ignoran los que están dentro de cadenas,
+    identificadores entre comillas o comentarios.
+    """
+    code = _NON_CODE_PATTERN.sub(" ", query_string or "")
+    return list(dict.fromkeys(PARAMETER_PATTERN.findall(code)))
+
+def parameters_key(params: Optional[dict]) -> str:
+    """
+    Texto que identifica los valores de los parámetros, para añadirlo a la consulta
+    en las claves de la caché de resultados ("" si la consulta no tiene parámetros).
+    """
+    if not params:
+        return ""
+    return "\n-- parámetros " + json.dumps(params, sort_keys=True, default=str)
+
+def sql_literal(value) -> str:
+    """
+    Escribe un valor de Python como literal de DuckDB para los argumentos de
+    EXECUTE, que no admite parámetros enlazados. Solo se aceptan tipos simples;
+    el texto se escapa con quote_literal, así que no puede alterar la consulta.
+
+    Raises:
+        ValueError: Si el tipo del valor no está soportado o no es un número finito.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, numbers.Real):
+        if not math.isfinite(value):
+            raise ValueError(f"Valor numérico no válido para un parámetro: {value!r}")
+        return repr(float(value))
+    if isinstance(value, datetime.datetime):
+        return f"TIMESTAMP {quote_literal(value.isoformat(sep=' '))}"
+    if isinstance(value, datetime.date):
+        return f"DATE {quote_literal(value.isoformat())}"
+    if isinstance(value, str):
+        return quote_literal(value)
+    raise ValueError(f"Tipo de parámetro no soportado: {type(value).__name__}")
+
+class PreparedStatements:
+    """
+    Caché de sentencias preparadas de DuckDB, separada por conexión.
+
+    La primera ejecución de una consulta con parámetros la prepara con PREPARE
+    (DuckDB la analiza y planifica una vez); las siguientes, con otros valores,
+    solo ejecutan EXECUTE sobre la sentencia ya preparada. Las sentencias
+    preparadas pertenecen a la conexión (o cursor) donde se crean, por eso la
+    caché se guarda por conexión. Se conservan como máximo max_statements por
+    conexión; al superarlo se libera la usada hace más tiempo (DEALLOCATE).
+    """
+
+    def __init__(self, max_statements: int = 64):
+        """
+        Args:
+            max_statements (int): Sentencias preparadas que se conservan por conexión.
+        """
+        self.max_statements = max_statements
+        # id(conexión) -> OrderedDict(consulta normalizada -> nombre de la sentencia)
+        self._statements = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(query_string: str) -> str:
+        """Quita el ';' final y los espacios de los extremos."""
+        return query_string.strip().rstrip(";").strip()
+
+    def is_prepared(self, connection: duckdb.DuckDBPyConnection, query_string: str) -> bool:
+        """Indica si la consulta ya está preparada en la conexión."""
+        with self._lock:
+            return self._normalize(query_string) in self._statements.get(id(connection), {})
+
+    def execute(self, connection: duckdb.DuckDBPyConnection, query_string: str, params: Optional[dict] = None):
+        """
+        Ejecuta la consulta con los valores de sus parámetros, preparándola en la
+        conexión si todavía no lo está.
+
+        Args:
+            connection (duckdb.DuckDBPyConnection): Conexión o cursor donde ejecutar.
+            query_string (str): Consulta con parámetros $nombre.
+            params (dict, optional): Valor de cada parámetro.
+
+        Returns:
+            duckdb.DuckDBPyConnection: La conexión con el resultado pendiente de leer.
+
+        Raises:
+            ValueError: Si falta algún parámetro, sobra alguno o un valor no es válido.
+            duckdb.Error: Si la consulta no se puede preparar o ejecutar.
+        """
+        params = params or {}
+        query = self._normalize(query_string)
+        names = query_parameters(query)
+        missing = [name for name in names if name not in params]
+        if missing:
+            raise ValueError(f"Faltan valores para los parámetros: {', '.join(missing)}")
+        unknown = [name for name in params if name not in names]
+        if unknown:
+            raise ValueError(f"Parámetros que no aparecen en la consulta: {', '.join(unknown)}")
+        arguments = ", ".join(f"{name} := {sql_literal(params[name])}" for name in names)
+
+        name = self._prepare(connection, query)
+        return connection.execute(f"EXECUTE {name}({arguments})" if arguments else f"EXECUTE {name}")
+
+    def _prepare(self, connection: duckdb.DuckDBPyConnection, query: str) -> str:
+        """Retorna el nombre de la sentencia preparada, preparándola si hace falta."""
+        with self._lock:
+            statements = self._statements.setdefault(id(connection), OrderedDict())
+            name = statements.get(query)
+            if name is not None:
+                statements.move_to_end(query)
+                self.hits += 1
+                return name
+            self._counter += 1
+            name = f"consulta_preparada_{self._counter}"
+        connection.execute(f"PREPARE {name} AS {query}")
+        evicted = None
+        with self._lock:
+            self.misses += 1
+            statements[query] = name
+            if len(statements) > self.max_statements:
+                _, evicted = statements.popitem(last=False)
+        if evicted is not None:
+            connection.execute(f"DEALLOCATE {evicted}")
+        return name
+
+    def clear(self, connection: duckdb.DuckDBPyConnection):
+        """Libera las sentencias preparadas de la conexión (p. ej. si cambian sus tablas)."""
+        with self._lock:
+            statements = self._statements.pop(id(connection), {})
+        for name in statements.values():
+            try:
+                connection.execute(f"DEALLOCATE {name}")
+            except duckdb.Error:
+                pass
+
+    def forget(self, connection: duckdb.DuckDBPyConnection):
+        """Olvida las sentencias de una conexión que se va a cerrar (se liberan con ella)."""
+        with self._lock:
+            self._statements.pop(id(connection), None)
+
+    def stats(self):
+        """Retorna un diccionario con 'hits', 'misses' y 'statements' (total preparadas)."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "statements": sum(len(statements) for statements in self._statements.values()),
+            }
@@ -0,0 +1,235 @@
+import duckdb
+import pandas as pd
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Optional
+from core.result_cache import QueryResultCache
+from core.query_guard import QueryGuard
+from core.arrow_frames import arrow_to_pandas
+from core.prepared_statements import PreparedStatements, parameters_key
+
+class QueryCursor:
+    """
+    Resultado paginado de una consulta SQL de DuckDB.
+
+    En lugar de traer todo el resultado con fetchdf(), las filas se leen como
+    lotes de Arrow del tamaño de una página, solo cuando se piden. Recorrer las
+    páginas en orden reutiliza el mismo flujo; solo se conservan los lotes de las
+    últimas WINDOW_PAGES páginas leídas, y saltar a otra página vuelve a abrir el
+    flujo desde esa posición (OFFSET). Así la memoria depende del tamaño de
+    página y no del tamaño del resultado. Las páginas son DataFrames respaldados
+    por los lotes de Arrow (pd.ArrowDtype), sin copiar ni convertir los datos.
+
+    El total de filas se cuenta al abrir el cursor con COUNT(*) sobre la consulta,
+    que DuckDB resuelve sin materializar filas (y sin ordenar).
+
+    Con parámetros ($nombre), el conteo y cada lectura se ejecutan como sentencias
+    preparadas de PreparedStatements en el cursor: si el cursor se reutiliza para
+    la misma consulta con otros valores, DuckDB no vuelve a analizarla ni planificarla.
+    """
+
+    # Páginas leídas cuyos lotes se conservan para volver a ellas sin releer el flujo
+    WINDOW_PAGES = 2
+
+    # Parámetro interno con el desplazamiento de las páginas en las consultas con parámetros
+    OFFSET_PARAMETER = '__desplazamiento'
+
+    def __init__(self, cursor: duckdb.DuckDBPyConnection, query_string: str, page_size: int,
+                 count_rows: bool = True, result_cache: Optional[QueryResultCache] = None,
+                 version=None, guard: Optional[QueryGuard] = None, params: Optional[dict] = None,
+                 statements: Optional[PreparedStatements] = None, owns_cursor: bool = True):
+        """
+        Args:
+            cursor (duckdb.DuckDBPyConnection): Cursor de DuckDB dedicado a esta consulta,
+                       con las tablas que usa ya registradas. Se cierra con close().
+            query_string (str): La consulta SQL.
+            page_size (int): Filas por página.
+            count_rows (bool): Si es True, cuenta el total de filas del resultado
+                       (COUNT(*) sobre la consulta, sin materializarla).
+            result_cache (QueryResultCache, optional): Caché donde guardar el total y
+                       la primera página, para repetir la consulta sin recalcularla
+                       (las demás páginas no se guardan: su memoria crecería con el
+                       recorrido del resultado).
+            version: Versión de los datos consultados, usada en las claves de la caché.
+            guard (QueryGuard, optional): Vigilancia de tiempo máximo y cancelación que
+                       se aplica al conteo y a cada lectura de página.
+            params (dict, optional): Valores de los parámetros $nombre de la consulta.
+            statements (PreparedStatements, optional): Caché de sentencias preparadas
+                       para las consultas con parámetros. Sin ella, los valores se
+                       enlazan en cada ejecución sin preparar la consulta.
+            owns_cursor (bool): Si es False, close() no cierra el cursor de DuckDB
+                       (compartido entre consultas para conservar sus sentencias preparadas).
+
+        Raises:
+            duckdb.Error: Si la consulta no es válida.
+            ValueError: Si faltan valores de parámetros o alguno no es válido.
+            QueryLimitError: Si el conteo supera el tiempo o la memoria permitidos.
+        """
+        self._cursor = cursor
+        self.query_string = query_string.strip().rstrip(";")
+        self.page_size = page_size
+        self.result_cache = result_cache if result_cache is not None and \
+            result_cache.is_cacheable(self.query_string) else None
+        self.version = version
+        self.guard = guard
+        self.params = params
+        self.statements = statements
+        self._owns_cursor = owns_cursor
+        # Indica si la consulta ya estaba preparada en el cursor (plan reutilizado)
+        self.plan_reused = params is not None and statements is not None and \
+            statements.is_prepared(cursor, self.query_string)
+        self.columns = None
+        # Indica si la última página entregada salió de la caché de resultados
+        self.last_page_cached = False
+        # Indica si el total de filas salió de la caché de resultados
+        self.total_cached = False
+        # Lotes de Arrow de las últimas páginas leídas (índice -> lote), como mucho WINDOW_PAGES
+        self._batches = OrderedDict()
+        self._reader = None
+        self._schema = None
+        # Índice de la página que entregará el flujo abierto en la siguiente lectura
+        self._stream_page = None
+        # Filas anteriores a la siguiente lectura del flujo (None si se abrió con OFFSET)
+        self._stream_rows = None
+        self.total_rows = self._count_rows() if count_rows else None
+        if self.total_rows is None:
+            # Sin total, se abre ya el flujo para que los errores de la consulta aparezcan aquí
+            self._open_stream(0)
+
+    @property
+    def num_pages(self):
+        """Número de páginas del resultado (None si no se conoce el total)."""
+        if self.total_rows is None:
+            return None
+        return max((self.total_rows + self.page_size - 1) // self.page_size, 1)
+
+    def _count_rows(self):
+        """Cuenta las filas del resultado; DuckDB descarta el ORDER BY y no materializa filas."""
+        cached = self._cache_get("-- total")
+        self.total_cached = cached is not None
+        if cached is not None:
+            return int(cached["total"].iloc[0])
+        try:
+            with self._guarded():
+                total = self._execute(f"SELECT COUNT(*) FROM ({self.query_string}) AS q").fetchall()[0][0]
+        except duckdb.ParserException:
+            # Sentencias que no pueden ir en una subconsulta (p. ej. SHOW o PRAGMA)
+            return None
+        self._cache_put("-- total", pd.DataFrame({"total": [total]}))
+        return total
+
+    def page(self, index: int) -> pd.DataFrame:
+        """
+        Retorna una página del resultado. La siguiente a la última leída sale del
+        flujo abierto; las de la ventana de páginas recientes, sin releerlas; las
+        demás, de un flujo nuevo abierto desde su posición.
+
+        Args:
+            index (int): Índice de la página, empezando en 0.
+
+        Returns:
+            pd.DataFrame: Las filas de la página (vacío si está fuera del resultado).
+        """
+        if index < 0:
+            raise ValueError("El índice de página no puede ser negativo.")
+        cache_suffix = f"-- página {index} de {self.page_size} filas"
+        cached = self._cache_get(cache_suffix) if index == 0 else None
+        self.last_page_cached = cached is not None
+        if cached is not None:
+            self.columns = list(cached.columns)
+            return cached
+
+        batch = self._batches.get(index)
+        if batch is None:
+            batch = self._read_page(index)
+        page_df = arrow_to_pandas(batch if batch is not None else self._schema.empty_table())
+        if index == 0:
+            self._cache_put(cache_suffix, page_df)
+        return page_df
+
+    def _read_page(self, index: int):
+        """
+        Lee del flujo el lote de una página y lo guarda en la ventana, descartando el
+        más antiguo. Al llegar al final, fija el total de filas si no se conocía.
+
+        Returns:
+            pa.RecordBatch: El lote, o None si la página está fuera del resultado.
+        """
+        if self._reader is None or self._stream_page != index:
+            self._open_stream(index)
+        try:
+            with self._guarded():
+                batch = self._reader.read_next_batch()
+        except StopIteration:
+            batch = None
+        if batch is None or not batch.num_rows:
+            if self.total_rows is None and self._stream_rows is not None:
+                self.total_rows = self._stream_rows
+                self._cache_put("-- total", pd.DataFrame({"total": [self.total_rows]}))
+            return None
+        self._stream_page = index + 1
+        if self._stream_rows is not None:
+            self._stream_rows += batch.num_rows
+        self._batches[index] = batch
+        while len(self._batches) > self.WINDOW_PAGES:
+            self._batches.popitem(last=False)
+        return batch
+
+    def _open_stream(self, index: int):
+        """Abre el flujo de lotes de Arrow a partir de la página indicada."""
+        if self._reader is not None:
+            self._reader.close()
+        offset = None
+        if index and self.params is not None:
+            # El desplazamiento va como parámetro para reutilizar la misma sentencia en todas las páginas
+            sql = f"SELECT * FROM ({self.query_string}) AS q OFFSET ${self.OFFSET_PARAMETER}"
+            offset = {self.OFFSET_PARAMETER: index * self.page_size}
+        elif index:
+            sql = f"SELECT * FROM ({self.query_string}) AS q OFFSET {index * self.page_size}"
+        else:
+            sql = self.query_string
+        with self._guarded():
+            result = self._execute(sql, offset)
+            # to_arrow_reader reemplaza a fetch_record_batch en versiones recientes de DuckDB
+            open_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+            self._reader = open_reader(self.page_size)
+        self._schema = self._reader.schema
+        self.columns = self._schema.names
+        self._stream_page = index
+        self._stream_rows = 0 if index == 0 else None
+
+    def _execute(self, sql: str, extra_params: Optional[dict] = None):
+        """Ejecuta una sentencia en el cursor con los parámetros de la consulta, si los tiene."""
+        if self.params is None:
+            return self._cursor.execute(sql)
+        params = dict(self.params, **(extra_params or {}))
+        if self.statements is not None:
+            return self.statements.execute(self._cursor, sql, params)
+        return self._cursor.execute(sql, params)
+
+    def _guarded(self):
+        """Contexto del guard para las ejecuciones en el cursor (sin guard, no hace nada)."""
+        return self.guard.run(self._cursor) if self.guard is not None else nullcontext()
+
+    def _cache_key(self, suffix: str) -> str:
+        """Clave de una parte del resultado: la consulta, sus parámetros y la parte."""
+        return f"{self.query_string}{parameters_key(self.params)}\n{suffix}"
+
+    def _cache_get(self, suffix: str):
+        """Busca en la caché de resultados una parte (total o primera página) de esta consulta."""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.get(self.version, self._cache_key(suffix))
+
+    def _cache_put(self, suffix: str, df: pd.DataFrame):
+        """Guarda en la caché de resultados una parte (total o primera página) de esta consulta."""
+        if self.result_cache is not None:
+            self.result_cache.put(self.version, self._cache_key(suffix), df)
+
+    def close(self):
+        """Cierra el flujo y el cursor de DuckDB de la consulta (si el cursor es suyo)."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._owns_cursor:
+            self._cursor.close()
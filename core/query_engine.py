@@ -1,52 +1,1077 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
 import pandas as pd
 import duckdb # Necesitas instalar duckdb: pip install duckdb
+from typing import Optional
+from core.result_cache import QueryResultCache
+from core.query_cursor import QueryCursor
+from core.query_guard import QueryGuard, QueryCancelledError, QueryLimitError
+from core.query_profile import QueryProfile
+from core.query_history import QueryHistory
+from core.prepared_statements import PARAMETER_PATTERN, PreparedStatements, parameters_key
+from core.lazy_dataset import LazyDataset, quote_identifier, quote_literal, table_name_from_file
+from core.arrow_frames import arrow_to_pandas, fetch_arrow_table, fetch_frame, scan_source
 
 class QueryEngine:
     """
     Clase encargada de ejecutar consultas SQL sobre un DataFrame de Pandas
     utilizando DuckDB.
+
+    Además de 'my_table' (los datos activos), el motor mantiene un catálogo de
+    tablas con nombre propio en la misma conexión: DataFrames registrados sin
+    copia y archivos abiertos como vistas de DuckDB. Así se pueden cruzar varios
+    archivos con JOIN dentro de DuckDB, sin pasar los datos por Pandas.
+
+    Si `database` es un archivo, la base de datos es persistente: los datasets
+    importados y los resultados guardados con save_result_as_table() quedan en
+    ella como tablas de DuckDB (columnares y comprimidas) para las siguientes
+    sesiones. Las vistas y DataFrames de la sesión siguen siendo temporales.
+
+    El motor mantiene una conexión de DuckDB abierta durante toda la sesión y el
+    DataFrame cargado queda registrado como 'my_table' una sola vez (al cargarse
+    en AppState); solo se vuelve a registrar si cambia. Así cada consulta evita
+    abrir una conexión y registrar la tabla, y DuckDB conserva sus cachés entre
+    consultas. En modo web cada sesión crea su propio QueryEngine.
+
+    Con una QueryResultCache, los resultados de consultas repetidas se reutilizan
+    mientras no cambien los datos; cada cambio de datos incrementa `data_version`
+    y vacía la caché.
+
+    Para que una consulta costosa no acapare el servidor, el motor admite límites
+    de hilos y memoria (con un directorio temporal donde DuckDB vuelca a disco lo
+    que no cabe) y un tiempo máximo por consulta; cancel() detiene las consultas
+    en curso desde otro hilo.
+
+    Con un QueryHistory, cada ejecución queda registrada con su duración; los
+    métodos profile_query_* ejecutan la consulta con el profiling de DuckDB y
+    retornan además el árbol de operadores con sus tiempos.
+
+    Arrow es el formato de intercambio con DuckDB: los DataFrames respaldados por
+    Arrow (pd.ArrowDtype) se registran como tablas de Arrow, que DuckDB lee sin
+    copia, y los resultados se traen como Arrow y se entregan como DataFrames
+    pd.ArrowDtype sobre los mismos buffers, sin la conversión de fetchdf().
+
+    Las consultas admiten parámetros con nombre ($nombre) cuyos valores se pasan
+    aparte (params), nunca pegados al texto SQL. Con parámetros, la consulta se
+    prepara una vez por conexión (PreparedStatements) y las ejecuciones con otros
+    valores reutilizan el plan. Los resultados paginados con parámetros usan un
+    cursor compartido que conserva sus sentencias preparadas mientras no cambien
+    los datos; solo puede haber uno abierto a la vez.
+
+    create_derived_table() guarda el resultado de una consulta como tabla derivada
+    del catálogo (materializada como tabla de Arrow) para consultarla después sin
+    recalcularla. El motor anota de qué tablas depende: si cambian, la tabla
+    queda desactualizada y, si se creó con auto_refresh, se recalcula antes de
+    la siguiente consulta.
     """
 
-    def execute_query_on_dataframe(self, df: pd.DataFrame, query_string: str):
+    # Nombre con el que se registra el DataFrame cargado
+    TABLE_NAME = 'my_table'
+
+    # Filas por página de los resultados paginados (open_cursor_*)
+    DEFAULT_PAGE_SIZE = 500
+
+    # Nombre con el que se registra el resultado de una consulta perfilada para paginarlo
+    PROFILED_RESULT_NAME = '__resultado_perfilado'
+
+    def __init__(self, database: str = ':memory:', result_cache: Optional[QueryResultCache] = None,
+                 threads: Optional[int] = None, memory_limit: Optional[str] = None,
+                 temp_directory: Optional[str] = None, query_timeout_seconds: Optional[float] = None,
+                 history: Optional[QueryHistory] = None):
+        """
+        Args:
+            database (str): Base de datos de DuckDB de la conexión. Por defecto, en memoria;
+                       con la ruta de un archivo, las tablas guardadas persisten entre sesiones.
+            result_cache (QueryResultCache, optional): Caché de resultados de consultas.
+                       Sin caché, cada consulta se ejecuta en DuckDB.
+            threads (int, optional): Hilos que puede usar DuckDB. Por defecto, todos los núcleos.
+            memory_limit (str, optional): Memoria máxima de DuckDB (p. ej. '2GB').
+            temp_directory (str, optional): Directorio donde DuckDB vuelca a disco los
+                       datos intermedios que no caben en memory_limit. Si el motor lo
+                       crea, lo borra con close().
+            query_timeout_seconds (float, optional): Tiempo máximo de cada consulta.
+                       Sin valor, las consultas no tienen límite de tiempo.
+            history (QueryHistory, optional): Historial donde registrar cada consulta
+                       con su duración.
+
+        Raises:
+            ValueError: Si algún ajuste del motor no es válido.
+        """
+        self.database = database
+        self.connection = duckdb.connect(database=database, read_only=False)
+        # La conexión no admite consultas simultáneas desde varios hilos
+        self._lock = threading.Lock()
+        # DataFrame registrado actualmente como TABLE_NAME (None si no hay ninguno)
+        self._registered_df = None
+        # Dataset diferido activo y la vista TABLE_NAME que le corresponde en esta conexión
+        self._active_dataset = None
+        self._active_view = None
+        # Archivo del que vienen los datos activos (solo informativo)
+        self._active_source = None
+        # Catálogo: nombre de tabla -> {'name', 'source', 'data'} (DataFrame o LazyDataset propio)
+        self.catalog = {}
+        self.result_cache = result_cache
+        # Versión de los datos consultables; cambia con cada DataFrame o dataset cargado
+        self.data_version = 0
+        # Indica si el resultado de la última consulta salió de la caché
+        self.last_query_cached = False
+        # Tiempo máximo y cancelación de las consultas en curso
+        self.guard = QueryGuard(timeout_seconds=query_timeout_seconds)
+        # Ajustes de recursos aplicados a DuckDB (threads, memory_limit, temp_directory)
+        self.settings = {}
+        self.history = history
+        # Sentencias preparadas de las consultas con parámetros, por conexión
+        self.statements = PreparedStatements()
+        # Cursor compartido de los resultados paginados con parámetros, la versión de
+        # los datos para la que se creó y el QueryCursor abierto sobre él
+        self._parameter_cursor = None
+        self._parameter_cursor_version = None
+        self._parameter_query_cursor = None
+        # Nombre de tabla -> versión de sus datos (para saber si una tabla derivada está al día)
+        self._table_versions = {}
+        # Directorios temporales creados por el motor (se borran al cerrarlo)
+        self._created_temp_directories = []
+        self.configure(threads=threads, memory_limit=memory_limit, temp_directory=temp_directory)
+
+    def register_dataframe(self, df: pd.DataFrame, source: Optional[str] = None):
+        """
+        Registra el DataFrame como TABLE_NAME en la conexión persistente. Si ya es
+        el DataFrame registrado, no hace nada.
+
+        Args:
+            df (pd.DataFrame): El DataFrame a consultar.
+            source (str, optional): Archivo de origen, para mostrarlo en el catálogo.
+
+        Returns:
+            bool: True si se registró, False si ya estaba registrado.
+        """
+        with self._lock:
+            if df is self._registered_df:
+                return False
+            self._release_active_view()
+            # register reemplaza la vista anterior; el DataFrame no se copia
+            self.connection.register(self.TABLE_NAME, scan_source(df))
+            self._registered_df = df
+            self._active_source = source
+        self._data_changed(self.TABLE_NAME)
+        print(f"QueryEngine: DataFrame registrado como '{self.TABLE_NAME}' ({len(df)} filas).")
+        return True
+
+    def register_dataset(self, dataset: LazyDataset):
+        """
+        Hace que TABLE_NAME apunte al archivo de un LazyDataset, con una vista en la
+        conexión del motor (el archivo no se lee hasta que se consulta). Si ya es el
+        dataset activo, no hace nada.
+
+        Args:
+            dataset (LazyDataset): El dataset diferido a consultar.
+
+        Returns:
+            bool: True si se registró, False si ya estaba registrado.
+        """
+        with self._lock:
+            if dataset is self._active_dataset:
+                return False
+            if self._registered_df is not None:
+                self.connection.unregister(self.TABLE_NAME)
+                self._registered_df = None
+            self._release_active_view()
+            self._active_view = LazyDataset(dataset.file_path, connection=self.connection,
+                                            table_name=self.TABLE_NAME, source_table=dataset.source_table)
+            self._active_dataset = dataset
+            self._active_source = dataset.file_name
+        self._data_changed(self.TABLE_NAME)
+        print(f"QueryEngine: Archivo '{dataset.file_name}' disponible como '{self.TABLE_NAME}'.")
+        return True
+
+    def unregister_dataframe(self):
+        """
+        Elimina el registro de los datos activos (DataFrame o dataset), si los hay,
+        y libera su referencia. También invalida los resultados en caché.
+        """
+        self._data_changed(self.TABLE_NAME)
+        with self._lock:
+            if self._registered_df is None and self._active_view is None:
+                return
+            if self._registered_df is not None:
+                self.connection.unregister(self.TABLE_NAME)
+                self._registered_df = None
+            self._release_active_view()
+            self._active_source = None
+        print(f"QueryEngine: Tabla '{self.TABLE_NAME}' liberada.")
+
+    def _release_active_view(self):
+        """Elimina la vista del dataset activo (llamar con el bloqueo tomado)."""
+        if self._active_view is not None:
+            self._active_view.close()
+            self._active_view = None
+        self._active_dataset = None
+
+    def table_name_for(self, source: str) -> str:
+        """
+        Propone un nombre de tabla SQL válido para un archivo (ver table_name_from_file).
+        Si ya hay en el catálogo una tabla con ese nombre de otro archivo, o una
+        tabla guardada con ese nombre, se añade un sufijo.
+        """
+        base = table_name_from_file(source)
+        stored = {table["name"] for table in self.stored_tables()}
+        name, suffix = base, 2
+        while name in (self.TABLE_NAME, self.PROFILED_RESULT_NAME) or name in stored or \
+                (name in self.catalog and self.catalog[name]["source"] != source):
+            name, suffix = f"{base}_{suffix}", suffix + 1
+        return name
+
+    def add_table(self, data, source: Optional[str] = None, name: Optional[str] = None) -> str:
+        """
+        Añade datos al catálogo con su propio nombre de tabla. Un DataFrame o una
+        tabla de Arrow se registran sin copiarlos; un LazyDataset se añade como
+        vista sobre su archivo.
+        Si el nombre ya existe, la tabla se reemplaza.
+
+        Args:
+            data (pd.DataFrame | pa.Table | LazyDataset): Los datos a añadir.
+            source (str, optional): Archivo de origen (se usa para proponer el nombre).
+            name (str, optional): Nombre de la tabla. Por defecto, table_name_for(source).
+
+        Returns:
+            str: El nombre de la tabla en el catálogo.
+        Raises:
+            ValueError: Si el nombre está reservado o los datos no son válidos.
+            duckdb.Error: Si DuckDB no puede abrir el archivo del dataset.
+        """
+        if isinstance(data, LazyDataset):
+            if data.source_table is not None:
+                # Tabla guardada en la base de datos: ya se puede consultar por su nombre
+                return data.source_table
+            source = source or data.file_name
+        elif hasattr(data, "to_pandas") and hasattr(data, "schema"):
+            # Tabla de Arrow: se guarda como DataFrame pd.ArrowDtype sobre los mismos buffers
+            data = arrow_to_pandas(data)
+        elif not isinstance(data, pd.DataFrame):
+            raise ValueError("QueryEngine Error: Solo se pueden añadir DataFrames, tablas de Arrow "
+                             "o LazyDatasets al catálogo.")
+        name = name or self.table_name_for(source or "tabla")
+        if name in (self.TABLE_NAME, self.PROFILED_RESULT_NAME):
+            raise ValueError(f"QueryEngine Error: El nombre de tabla '{name}' está reservado.")
+
+        with self._lock:
+            self._release_table(name)
+            if isinstance(data, LazyDataset):
+                # Vista propia en la conexión del motor: el dataset original puede cerrarse
+                data = LazyDataset(data.file_path, connection=self.connection, table_name=name)
+            else:
+                self.connection.register(name, scan_source(data))
+            self.catalog[name] = {"name": name, "source": source, "data": data}
+        self._data_changed(name)
+        print(f"QueryEngine: '{source}' añadido al catálogo como tabla '{name}'.")
+        return name
+
+    def remove_table(self, name: str) -> bool:
+        """
+        Quita una tabla del catálogo y libera su referencia.
+
+        Returns:
+            bool: True si la tabla existía.
+        """
+        with self._lock:
+            removed = self._release_table(name)
+        if removed:
+            self._data_changed(name)
+            print(f"QueryEngine: Tabla '{name}' eliminada del catálogo.")
+        return removed
+
+    def _release_table(self, name: str) -> bool:
+        """Elimina una tabla del catálogo y de la conexión (llamar con el bloqueo tomado)."""
+        entry = self.catalog.pop(name, None)
+        if entry is None:
+            return False
+        if isinstance(entry["data"], LazyDataset):
+            entry["data"].close()
+        else:
+            self.connection.unregister(name)
+        return True
+
+    def list_tables(self):
+        """
+        Retorna las tablas consultables: primero TABLE_NAME (si hay datos activos)
+        y después las del catálogo.
+
+        Returns:
+            list: Diccionarios con 'name', 'source', 'kind' ('DataFrame', 'archivo',
+                  'derivada' o 'almacenada'), 'rows' (None en los archivos, para no
+                  recorrerlos) y 'columns'. Las derivadas incluyen además 'query',
+                  'auto_refresh', 'stale' (desactualizada) y 'error' (último fallo al recalcularla).
+        """
+        with self._lock:
+            entries = []
+            if self._registered_df is not None:
+                entries.append({"name": self.TABLE_NAME, "source": self._active_source,
+                                "data": self._registered_df})
+            elif self._active_view is not None:
+                entries.append({"name": self.TABLE_NAME, "source": self._active_source,
+                                "data": self._active_view})
+            entries.extend(self.catalog.values())
+            tables = []
+            stored = self._stored_tables()
+            for entry in entries:
+                data = entry["data"]
+                is_frame = isinstance(data, pd.DataFrame)
+                table = {
+                    "name": entry["name"],
+                    "source": entry["source"],
+                    "kind": "DataFrame" if is_frame else "archivo",
+                    "rows": len(data) if is_frame else None,
+                    "columns": [str(col) for col in data.columns],
+                }
+                derived = entry.get("derived")
+                if derived is not None:
+                    table.update(kind="derivada", query=derived["query"], auto_refresh=derived["auto_refresh"],
+                                 stale=self._is_stale(derived), error=derived["error"])
+                tables.append(table)
+        for table in stored:
+            tables.append(dict(table, source=self.database, kind="almacenada"))
+        return tables
+
+    @property
+    def is_persistent(self) -> bool:
+        """Indica si la base de datos del motor es un archivo (persistente)."""
+        return self.database not in (None, ':memory:', '')
+
+    def stored_tables(self):
+        """
+        Retorna las tablas guardadas en la base de datos del motor (no las vistas
+        ni los DataFrames de la sesión).
+
+        Returns:
+            list: Diccionarios con 'name', 'rows' (estimadas por DuckDB) y 'columns'.
+        """
+        with self._lock:
+            return self._stored_tables()
+
+    def _stored_tables(self):
+        """Consulta las tablas guardadas (llamar con el bloqueo tomado)."""
+        tables = self.connection.execute(
+            "SELECT table_name, estimated_size FROM duckdb_tables() "
+            "WHERE database_name = current_database() AND schema_name = 'main' AND NOT temporary "
+            "ORDER BY table_name"
+        ).fetchall()
+        columns = {}
+        for table_name, column_name in self.connection.execute(
+            "SELECT table_name, column_name FROM duckdb_columns() "
+            "WHERE database_name = current_database() AND schema_name = 'main' "
+            "ORDER BY table_name, column_index"
+        ).fetchall():
+            columns.setdefault(table_name, []).append(column_name)
+        return [{"name": name, "rows": rows, "columns": columns.get(name, [])} for name, rows in tables]
+
+    def save_result_as_table(self, query_string: str, table_name: str, params: Optional[dict] = None) -> int:
+        """
+        Guarda el resultado de una consulta como tabla de la base de datos del motor
+        (la reemplaza si ya existe). La consulta puede usar 'my_table' y las tablas
+        del catálogo; el resultado no pasa por Pandas.
+
+        Args:
+            query_string (str): La consulta cuyo resultado se guarda.
+            table_name (str): Nombre de la tabla (letras, números y '_').
+            params (dict, optional): Valores de los parámetros $nombre de la consulta.
+
+        Returns:
+            int: Número de filas guardadas.
+        Raises:
+            ValueError: Si el nombre no es válido o está en uso en el catálogo.
+            duckdb.Error: Si hay un error en la ejecución de la consulta SQL.
+            QueryCancelledError: Si la consulta se cancela con cancel().
+            QueryLimitError: Si la consulta supera el tiempo o la memoria permitidos.
+        """
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table_name or ""):
+            raise ValueError("QueryEngine Error: El nombre de la tabla solo puede tener letras, "
+                             "números y '_', y no puede empezar por un número.")
+        if table_name in (self.TABLE_NAME, self.PROFILED_RESULT_NAME) or table_name in self.catalog:
+            raise ValueError(f"QueryEngine Error: El nombre de tabla '{table_name}' ya está en uso en la sesión.")
+
+        self.refresh_stale_tables()
+        cursor = self._new_cursor()
+        try:
+            with self.guard.run(cursor):
+                create_sql = (f"CREATE OR REPLACE TABLE {quote_identifier(table_name)} AS "
+                              f"{query_string.strip().rstrip(';')}")
+                if params is not None:
+                    cursor.execute(create_sql, params)
+                else:
+                    cursor.execute(create_sql)
+                rows = cursor.execute(f"SELECT COUNT(*) FROM {quote_identifier(table_name)}").fetchall()[0][0]
+        except (duckdb.Error, QueryCancelledError, QueryLimitError) as e:
+            print(f"QueryEngine Error: No se pudo guardar el resultado como '{table_name}': {e}")
+            raise
+        finally:
+            cursor.close()
+        self._data_changed(table_name)
+        print(f"QueryEngine: Resultado guardado como tabla '{table_name}' ({rows} filas).")
+        return rows
+
+    def drop_stored_table(self, table_name: str) -> bool:
+        """
+        Elimina una tabla guardada de la base de datos del motor.
+
+        Returns:
+            bool: True si la tabla existía.
+        """
+        if table_name not in {table["name"] for table in self.stored_tables()}:
+            return False
+        with self._lock:
+            self.connection.execute(f"DROP TABLE {quote_identifier(table_name)}")
+        self._data_changed(table_name)
+        print(f"QueryEngine: Tabla guardada '{table_name}' eliminada.")
+        return True
+
+    def create_derived_table(self, query_string: str, name: str, params: Optional[dict] = None,
+                             auto_refresh: bool = False) -> int:
+        """
+        Materializa el resultado de una consulta como tabla derivada del catálogo:
+        una tabla de Arrow en memoria que las siguientes consultas leen sin volver
+        a calcular la consulta original (p. ej. un GROUP BY sobre todo el archivo).
+        Se anotan las tablas de las que depende y su versión; si alguna cambia, la
+        tabla derivada queda desactualizada. Con auto_refresh se recalcula sola
+        antes de la siguiente consulta (ver refresh_stale_tables).
+        Si ya existe una tabla derivada con ese nombre, se reemplaza.
+
+        Args:
+            query_string (str): La consulta cuyo resultado se materializa.
+            name (str): Nombre de la tabla (letras, números y '_').
+            params (dict, optional): Valores de los parámetros $nombre de la consulta.
+            auto_refresh (bool): Si es True, se recalcula cuando cambian sus tablas de origen.
+
+        Returns:
+            int: Número de filas de la tabla derivada.
+        Raises:
+            ValueError: Si el nombre no es válido, está en uso o la consulta se usa a sí misma.
+            duckdb.Error: Si hay un error en la ejecución de la consulta SQL.
+            QueryCancelledError: Si la consulta se cancela con cancel().
+            QueryLimitError: Si la consulta supera el tiempo o la memoria permitidos.
+        """
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name or ""):
+            raise ValueError("QueryEngine Error: El nombre de la tabla solo puede tener letras, "
+                             "números y '_', y no puede empezar por un número.")
+        if name in (self.TABLE_NAME, self.PROFILED_RESULT_NAME) or \
+                (name in self.catalog and "derived" not in self.catalog[name]) or \
+                name in {table["name"] for table in self.stored_tables()}:
+            raise ValueError(f"QueryEngine Error: El nombre de tabla '{name}' ya está en uso en la sesión.")
+        query_string = query_string.strip().rstrip(";")
+        dependencies = self._query_tables(query_string)
+        if name in dependencies:
+            raise ValueError(f"QueryEngine Error: La tabla derivada '{name}' no puede consultarse a sí misma.")
+
+        derived = {
+            "query": query_string,
+            "params": dict(params) if params is not None else None,
+            "auto_refresh": auto_refresh,
+            "dependencies": {},
+            "rows": None,
+            "seconds": None,
+            "refreshed_at": None,
+            "error": None,
+            "failed_versions": None,
+        }
+        rows = self._materialize(name, derived)
+        print(f"QueryEngine: Tabla derivada '{name}' creada ({rows} filas, depende de "
+              f"{', '.join(sorted(derived['dependencies'])) or 'ninguna tabla'}).")
+        return rows
+
+    def refresh_derived_table(self, name: str) -> int:
+        """
+        Vuelve a calcular una tabla derivada con su consulta y los datos actuales.
+
+        Returns:
+            int: Número de filas de la tabla derivada.
+        Raises:
+            ValueError: Si no existe una tabla derivada con ese nombre.
+            duckdb.Error: Si la consulta falla (p. ej. si se quitó una de sus tablas).
+            QueryCancelledError: Si la consulta se cancela con cancel().
+            QueryLimitError: Si la consulta supera el tiempo o la memoria permitidos.
+        """
+        entry = self.catalog.get(name)
+        if entry is None or "derived" not in entry:
+            raise ValueError(f"QueryEngine Error: No existe la tabla derivada '{name}'.")
+        derived = entry["derived"]
+        try:
+            rows = self._materialize(name, derived)
+        except (duckdb.Error, QueryCancelledError, QueryLimitError) as e:
+            # No se reintenta automáticamente hasta que vuelvan a cambiar sus tablas
+            derived["error"] = str(e)
+            derived["failed_versions"] = self._dependency_versions(derived["dependencies"])
+            print(f"QueryEngine Error: No se pudo actualizar la tabla derivada '{name}': {e}")
+            raise
+        print(f"QueryEngine: Tabla derivada '{name}' actualizada ({rows} filas, "
+              f"{derived['seconds'] * 1000:,.1f} ms).")
+        return rows
+
+    def refresh_stale_tables(self):
+        """
+        Recalcula las tablas derivadas con auto_refresh que están desactualizadas.
+        Se hacen varias pasadas para que una tabla derivada de otra derivada se
+        actualice después de ella. Las que fallan se dejan con su error y no se
+        reintentan hasta que cambien de nuevo sus tablas.
+
+        Returns:
+            list: Nombres de las tablas actualizadas.
+        """
+        refreshed = []
+        for _ in range(len(self.catalog)):
+            stale = [name for name, entry in list(self.catalog.items())
+                     if "derived" in entry and entry["derived"]["auto_refresh"]
+                     and self._is_stale(entry["derived"])
+                     and entry["derived"]["failed_versions"] != self._dependency_versions(entry["derived"]["dependencies"])]
+            if not stale:
+                break
+            for name in stale:
+                try:
+                    self.refresh_derived_table(name)
+                    refreshed.append(name)
+                except (duckdb.Error, QueryCancelledError, QueryLimitError):
+                    continue
+        return refreshed
+
+    def _materialize(self, name: str, derived: dict) -> int:
+        """
+        Ejecuta la consulta de una tabla derivada en un cursor propio, guarda el
+        resultado en el catálogo como tabla de Arrow y anota la versión de sus tablas.
+        """
+        # La versión se toma antes de consultar: un cambio durante la consulta la deja desactualizada
+        versions = self._dependency_versions(self._query_tables(derived["query"]) - {name})
+        started = time.perf_counter()
+        cursor = self._new_cursor()
+        try:
+            with self.guard.run(cursor):
+                if derived["params"] is not None:
+                    result = cursor.execute(derived["query"], derived["params"])
+                else:
+                    result = cursor.execute(derived["query"])
+                result_table = fetch_arrow_table(result)
+        finally:
+            cursor.close()
+        derived.update(dependencies=versions, rows=result_table.num_rows,
+                       seconds=time.perf_counter() - started,
+                       refreshed_at=time.strftime("%Y-%m-%d %H:%M:%S"), error=None, failed_versions=None)
+        self.add_table(result_table, source="consulta derivada", name=name)
+        self.catalog[name]["derived"] = derived
+        return result_table.num_rows
+
+    def _query_tables(self, query_string: str) -> set:
+        """
+        Retorna los nombres de las tablas que usa la consulta. Si DuckDB no puede
+        analizarla, se suponen todas las tablas consultables.
+        """
+        # get_table_names no admite parámetros: se sustituyen por NULL solo para analizarla
+        query = PARAMETER_PATTERN.sub("NULL", query_string)
+        try:
+            # En una conexión vacía: en la del motor, las tablas registradas no se listan
+            with duckdb.connect() as parser:
+                return set(parser.get_table_names(query))
+        except duckdb.Error:
+            return {self.TABLE_NAME, *self.catalog, *(table["name"] for table in self.stored_tables())}
+
+    def _dependency_versions(self, names) -> dict:
+        """Retorna la versión actual de cada tabla (0 si nunca ha cambiado)."""
+        return {dependency: self._table_versions.get(dependency, 0) for dependency in names}
+
+    def _is_stale(self, derived: dict) -> bool:
+        """Indica si alguna tabla de la que depende la tabla derivada cambió desde que se calculó."""
+        return derived["dependencies"] != self._dependency_versions(derived["dependencies"])
+
+    def vacuum(self):
+        """
+        Recalcula las estadísticas de las tablas y fuerza un checkpoint, para que el
+        espacio de las tablas eliminadas pueda reutilizarse en el archivo.
+
+        Returns:
+            tuple: (bytes del archivo antes, bytes después), o (None, None) en memoria.
+        """
+        size_before = os.path.getsize(self.database) if self.is_persistent else None
+        with self._lock:
+            self.connection.execute("VACUUM ANALYZE")
+            if self.is_persistent:
+                try:
+                    self.connection.execute("CHECKPOINT")
+                except duckdb.TransactionException as e:
+                    # Otra sesión tiene una consulta abierta; DuckDB hará el checkpoint más tarde
+                    print(f"QueryEngine: Checkpoint pospuesto: {e}")
+        size_after = os.path.getsize(self.database) if self.is_persistent else None
+        print(f"QueryEngine: Base de datos compactada ({size_before} -> {size_after} bytes).")
+        return size_before, size_after
+
+    def _new_cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        Retorna un cursor de la conexión con todas las tablas consultables: las vistas
+        se comparten, pero los DataFrames hay que registrarlos en cada cursor.
+        """
+        with self._lock:
+            cursor = self.connection.cursor()
+            if self._registered_df is not None:
+                cursor.register(self.TABLE_NAME, scan_source(self._registered_df))
+            if self._active_view is not None:
+                self._active_view.prepare_cursor(cursor)
+            for name, entry in self.catalog.items():
+                if isinstance(entry["data"], LazyDataset):
+                    entry["data"].prepare_cursor(cursor)
+                else:
+                    cursor.register(name, scan_source(entry["data"]))
+        return cursor
+
+    def configure(self, threads: Optional[int] = None, memory_limit: Optional[str] = None,
+                  temp_directory: Optional[str] = None):
+        """
+        Aplica ajustes de recursos a la base de datos de DuckDB. Afectan a la conexión
+        y a todos sus cursores; los parámetros None se dejan como estén.
+
+        Args:
+            threads (int, optional): Hilos que puede usar DuckDB.
+            memory_limit (str, optional): Memoria máxima de DuckDB (p. ej. '2GB').
+            temp_directory (str, optional): Directorio para volcar datos a disco. Si no
+                   existe, se crea y se borra al cerrar el motor.
+
+        Raises:
+            ValueError: Si DuckDB rechaza alguno de los valores.
+        """
+        if temp_directory is not None and not os.path.isdir(temp_directory):
+            os.makedirs(temp_directory)
+            self._created_temp_directories.append(temp_directory)
+        settings = {"threads": threads, "memory_limit": memory_limit, "temp_directory": temp_directory}
+        for name, value in settings.items():
+            if value is None:
+                continue
+            literal = str(int(value)) if name == "threads" else quote_literal(value)
+            try:
+                with self._lock:
+                    self.connection.execute(f"SET {name} = {literal}")
+            except duckdb.Error as e:
+                raise ValueError(f"QueryEngine Error: Valor no válido para '{name}' ({value}): {e}") from e
+            self.settings[name] = value
+        if memory_limit is not None:
+            self.guard.memory_limit = memory_limit
+        if any(value is not None for value in settings.values()):
+            print(f"QueryEngine: Ajustes del motor aplicados: {self.settings}")
+
+    @property
+    def query_timeout_seconds(self):
+        """Tiempo máximo de cada consulta, en segundos (None si no hay límite)."""
+        return self.guard.timeout_seconds
+
+    @query_timeout_seconds.setter
+    def query_timeout_seconds(self, seconds: Optional[float]):
+        self.guard.timeout_seconds = seconds
+
+    def cancel(self):
+        """
+        Cancela las consultas en ejecución del motor (pueden estar en otro hilo).
+        La consulta interrumpida falla con QueryCancelledError.
+
+        Returns:
+            int: Número de consultas interrumpidas.
+        """
+        cancelled = self.guard.cancel()
+        if cancelled:
+            print(f"QueryEngine: {cancelled} consulta(s) cancelada(s).")
+        return cancelled
+
+    def _data_changed(self, *table_names: str):
+        """
+        Pasa a una nueva versión de los datos y descarta los resultados en caché.
+        Las tablas indicadas cambian de versión, de modo que las tablas derivadas
+        calculadas a partir de ellas quedan desactualizadas.
+        """
+        self.data_version += 1
+        for name in table_names:
+            self._table_versions[name] = self._table_versions.get(name, 0) + 1
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        # Las tablas cambiaron: las sentencias preparadas se vuelven a preparar al usarse
+        with self._lock:
+            self.statements.clear(self.connection)
+
+    def _run_cached(self, version, query_string: str, execute, params: Optional[dict] = None):
+        """
+        Retorna el resultado en caché de la consulta (con esos valores de parámetros)
+        para esa versión de los datos o, si no está, lo calcula con execute() y lo guarda.
+        """
+        self.last_query_cached = False
+        cacheable = self.result_cache is not None and self.result_cache.is_cacheable(query_string)
+        cache_key = query_string + parameters_key(params)
+        if cacheable:
+            cached = self.result_cache.get(version, cache_key)
+            if cached is not None:
+                self.last_query_cached = True
+                return cached
+        result_df = execute()
+        if cacheable:
+            self.result_cache.put(version, cache_key, result_df)
+        return result_df
+
+    def _execute(self, connection: duckdb.DuckDBPyConnection, query_string: str, params: Optional[dict]):
+        """Ejecuta la consulta; con parámetros, como sentencia preparada de la conexión."""
+        if params is None:
+            return connection.execute(query_string)
+        return self.statements.execute(connection, query_string, params)
+
+    def _record(self, query_string: str, started: float, rows=None, source=None,
+                cached: bool = False, profiled: bool = False, error: Optional[Exception] = None,
+                params: Optional[dict] = None):
+        """Registra la ejecución en el historial (si hay uno), con su duración desde started."""
+        if self.history is None:
+            return
+        if error is None:
+            status = "ok"
+        elif isinstance(error, QueryCancelledError):
+            status = "cancelada"
+        elif isinstance(error, QueryLimitError):
+            status = "límite"
+        else:
+            status = "error"
+        self.history.record(query_string, time.perf_counter() - started, rows=rows, status=status,
+                            source=source, cached=cached, profiled=profiled,
+                            error=str(error) if error is not None else None, params=params)
+
+    def statement_stats(self):
+        """
+        Retorna los contadores de las sentencias preparadas.
+
+        Returns:
+            dict: 'hits' (planes reutilizados), 'misses' (consultas preparadas) y 'statements'.
+        """
+        return self.statements.stats()
+
+    def cache_stats(self):
+        """
+        Retorna los contadores de la caché de resultados.
+
+        Returns:
+            dict: 'hits', 'misses', 'hit_rate', 'entries' y 'bytes', o None sin caché.
+        """
+        return self.result_cache.stats() if self.result_cache is not None else None
+
+    def close(self):
+        """
+        Cierra la conexión de DuckDB del motor y borra los directorios temporales
+        que creó (con los datos volcados a disco por las consultas).
+        """
+        self._close_parameter_cursor()
+        self.unregister_dataframe()
+        for name in list(self.catalog):
+            self.remove_table(name)
+        self.connection.close()
+        for directory in self._created_temp_directories:
+            shutil.rmtree(directory, ignore_errors=True)
+        self._created_temp_directories.clear()
+
+    def execute_query_on_dataframe(self, df: pd.DataFrame, query_string: str, params: Optional[dict] = None):
         """
         Ejecuta una consulta SQL sobre el DataFrame de Pandas proporcionado.
 
         Args:
             df (pd.DataFrame): El DataFrame sobre el cual ejecutar la consulta.
-            query_string (str): La cadena de consulta SQL.
+                               Si no es el registrado, se registra antes de consultar.
+            query_string (str): La cadena de consulta SQL, con parámetros $nombre si se usan.
+            params (dict, optional): Valores de los parámetros. Con parámetros, la consulta
+                               se prepara una vez y las siguientes ejecuciones reutilizan el plan.
 
         Returns:
             pd.DataFrame: Un nuevo DataFrame con los resultados de la consulta.
                           Retorna un DataFrame vacío si la consulta no devuelve resultados
                           o si ocurre un error.
         Raises:
-            ValueError: Si el DataFrame de entrada es None o está vacío.
+            ValueError: Si el DataFrame de entrada es None o está vacío, o si faltan
+                        valores de parámetros.
+            duckdb.Error: Si hay un error en la ejecución de la consulta SQL.
+            QueryCancelledError: Si la consulta se cancela con cancel().
+            QueryLimitError: Si la consulta supera el tiempo o la memoria permitidos.
+        """
+        if df is None or df.empty:
+            raise ValueError("QueryEngine Error: No hay un DataFrame cargado o está vacío para consultar.")
+
+        started = time.perf_counter()
+        try:
+            # Normalmente ya está registrado desde AppState.load_dataframe
+            self.register_dataframe(df)
+            self.refresh_stale_tables()
+
+            def execute():
+                # Ejecutar la consulta SQL en la conexión persistente
+                with self._lock, self.guard.run(self.connection):
+                    return fetch_frame(self._execute(self.connection, query_string, params))
+
+            result_df = self._run_cached(self.data_version, query_string, execute, params)
+            origin = " (desde la caché)" if self.last_query_cached else ""
+            print(f"QueryEngine: Consulta SQL ejecutada exitosamente{origin}. Filas resultantes: {len(result_df)}")
+            self._record(query_string, started, rows=len(result_df), source=self.TABLE_NAME,
+                         cached=self.last_query_cached, params=params)
+            return result_df
+        except (duckdb.Error, QueryCancelledError, QueryLimitError) as e:
+            print(f"QueryEngine Error: Error al ejecutar la consulta SQL: {e}")
+            self._record(query_string, started, source=self.TABLE_NAME, error=e, params=params)
+            # Puedes relanzar la excepción si quieres que el error se propague a la UI
+            raise
+        except Exception as e:
+            print(f"QueryEngine Error: Error inesperado en el motor de consultas: {e}")
+            raise
+
+    def open_cursor_on_dataframe(self, df: pd.DataFrame, query_string: str,
+                                 page_size: Optional[int] = None, count_rows: bool = True,
+                                 params: Optional[dict] = None):
+        """
+        Ejecuta una consulta sobre el DataFrame y retorna un QueryCursor para leer
+        el resultado por páginas, sin materializarlo entero en Pandas.
+
+        La consulta usa un cursor propio de DuckDB (con el DataFrame registrado), de
+        modo que el resultado puede recorrerse sin bloquear otras consultas. Con
+        parámetros se usa el cursor compartido de las consultas con parámetros, donde
+        la consulta queda preparada para las siguientes ejecuciones; abrir otra
+        consulta con parámetros cierra el resultado anterior.
+
+        Args:
+            df (pd.DataFrame): El DataFrame a consultar (como 'my_table').
+            query_string (str): La cadena de consulta SQL, con parámetros $nombre si se usan.
+            page_size (int, optional): Filas por página. Por defecto, DEFAULT_PAGE_SIZE.
+            count_rows (bool): Si es True, calcula el total de filas del resultado.
+            params (dict, optional): Valores de los parámetros.
+
+        Returns:
+            QueryCursor: El resultado paginado. Debe cerrarse con close().
+        Raises:
+            ValueError: Si el DataFrame de entrada es None o está vacío, o si faltan
+                        valores de parámetros.
             duckdb.Error: Si hay un error en la ejecución de la consulta SQL.
+            QueryCancelledError: Si la consulta se cancela con cancel().
+            QueryLimitError: Si la consulta supera el tiempo o la memoria permitidos.
         """
         if df is None or df.empty:
             raise ValueError("QueryEngine Error: No hay un DataFrame cargado o está vacío para consultar.")
 
+        self.register_dataframe(df)
+        self.refresh_stale_tables()
+        return self._open_cursor(query_string, page_size, count_rows, self.data_version,
+                                 source=self.TABLE_NAME, params=params)
+
+    def open_cursor_on_dataset(self, dataset, query_string: str,
+                               page_size: Optional[int] = None, count_rows: bool = True,
+                               params: Optional[dict] = None):
+        """
+        Igual que open_cursor_on_dataframe, pero sobre un LazyDataset: la consulta
+        se resuelve en DuckDB y solo se traen las páginas pedidas.
+
+        Returns:
+            QueryCursor: El resultado paginado. Debe cerrarse con close().
+        Raises:
+            ValueError: Si no hay un dataset abierto o faltan valores de parámetros.
+            duckdb.Error: Si hay un error en la ejecución de la consulta SQL.
+            QueryCancelledError: Si la consulta se cancela con cancel().
+            QueryLimitError: Si la consulta supera el tiempo o la memoria permitidos.
+        """
+        if dataset is None:
+            raise ValueError("QueryEngine Error: No hay un dataset abierto para consultar.")
+        self.register_dataset(dataset)
+        self.refresh_stale_tables()
+        version = (self.data_version, id(dataset), os.path.getmtime(dataset.file_path))
+        return self._open_cursor(query_string, page_size, count_rows, version,
+                                 source=dataset.file_name, params=params)
+
+    def _open_cursor(self, query_string: str, page_size: Optional[int], count_rows: bool, version,
+                     source: Optional[str] = None, params: Optional[dict] = None):
+        """
+        Crea el QueryCursor en un cursor nuevo o, con parámetros, en el cursor
+        compartido. Si la consulta falla, cierra el cursor nuevo de DuckDB.
+        """
+        started = time.perf_counter()
+        if params is not None:
+            cursor = self._shared_parameter_cursor()
+        else:
+            cursor = self._new_cursor()
+        owns_cursor = params is None
         try:
-            # Conectar a una base de datos DuckDB en memoria
-            # DuckDB permite registrar DataFrames de Pandas como tablas temporales
-            # y luego consultarlas usando SQL.
-            con = duckdb.connect(database=':memory:', read_only=False)
+            query_cursor = QueryCursor(cursor, query_string, page_size or self.DEFAULT_PAGE_SIZE,
+                                       count_rows=count_rows, result_cache=self.result_cache,
+                                       version=version, guard=self.guard, params=params,
+                                       statements=self.statements, owns_cursor=owns_cursor)
+            if not owns_cursor:
+                self._parameter_query_cursor = query_cursor
+            total = query_cursor.total_rows
+            reused = " (plan preparado reutilizado)" if query_cursor.plan_reused else ""
+            print(f"QueryEngine: Consulta SQL abierta en modo paginado{reused}. "
+                  f"Filas resultantes: {total if total is not None else 'desconocidas'}")
+            # En modo paginado la duración registrada incluye el conteo de filas y abrir el flujo
+            self._record(query_string, started, rows=total, source=source,
+                         cached=query_cursor.total_cached, params=params)
+            return query_cursor
+        except (duckdb.Error, QueryCancelledError, QueryLimitError) as e:
+            if owns_cursor:
+                cursor.close()
+            print(f"QueryEngine Error: Error al ejecutar la consulta SQL: {e}")
+            self._record(query_string, started, source=source, error=e, params=params)
+            raise
+        except Exception as e:
+            if owns_cursor:
+                cursor.close()
+            print(f"QueryEngine Error: Error inesperado en el motor de consultas: {e}")
+            raise
 
-            # Registrar el DataFrame de Pandas como una tabla temporal llamada 'my_table'
-            con.register('my_table', df)
+    def _shared_parameter_cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        Retorna el cursor compartido de las consultas paginadas con parámetros, después
+        de cerrar el resultado abierto sobre él. Si los datos cambiaron desde que se
+        creó, se reemplaza por uno nuevo con las tablas actuales.
+        """
+        if self._parameter_query_cursor is not None:
+            self._parameter_query_cursor.close()
+            self._parameter_query_cursor = None
+        if self._parameter_cursor is None or self._parameter_cursor_version != self.data_version:
+            self._close_parameter_cursor()
+            self._parameter_cursor = self._new_cursor()
+            self._parameter_cursor_version = self.data_version
+        return self._parameter_cursor
 
-            # Ejecutar la consulta SQL
-            result_df = con.execute(query_string).fetchdf()
+    def _close_parameter_cursor(self):
+        """Cierra el cursor compartido de las consultas con parámetros y sus sentencias."""
+        if self._parameter_query_cursor is not None:
+            self._parameter_query_cursor.close()
+            self._parameter_query_cursor = None
+        if self._parameter_cursor is not None:
+            self.statements.forget(self._parameter_cursor)
+            self._parameter_cursor.close()
+            self._parameter_cursor = None
+
+    def execute_query_on_dataset(self, dataset, query_string: str, params: Optional[dict] = None):
+        """
+        Ejecuta una consulta SQL directamente en DuckDB sobre un LazyDataset.
+        El archivo no se carga en Pandas: solo se materializa el resultado.
 
-            # Cerrar la conexión (libera recursos)
-            con.close()
+        Args:
+            dataset (LazyDataset): El dataset diferido (disponible como 'my_table').
+            query_string (str): La cadena de consulta SQL, con parámetros $nombre si se usan.
+            params (dict, optional): Valores de los parámetros.
 
-            print(f"QueryEngine: Consulta SQL ejecutada exitosamente. Filas resultantes: {len(result_df)}")
+        Returns:
+            pd.DataFrame: Un nuevo DataFrame con los resultados de la consulta.
+        Raises:
+            ValueError: Si no hay un dataset abierto o faltan valores de parámetros.
+            duckdb.Error: Si hay un error en la ejecución de la consulta SQL.
+            QueryCancelledError: Si la consulta se cancela con cancel().
+            QueryLimitError: Si la consulta supera el tiempo o la memoria permitidos.
+        """
+        if dataset is None:
+            raise ValueError("QueryEngine Error: No hay un dataset abierto para consultar.")
+
+        started = time.perf_counter()
+        try:
+            self.register_dataset(dataset)
+            self.refresh_stale_tables()
+            # El archivo se lee en cada consulta: su fecha de modificación forma parte de la versión
+            version = (self.data_version, id(dataset), os.path.getmtime(dataset.file_path))
+
+            def execute():
+                with self._lock, self.guard.run(self.connection):
+                    return fetch_frame(self._execute(self.connection, query_string, params))
+
+            result_df = self._run_cached(version, query_string, execute, params)
+            origin = " (desde la caché)" if self.last_query_cached else ""
+            print(f"QueryEngine: Consulta SQL ejecutada en DuckDB sobre '{dataset.file_name}'{origin}. Filas resultantes: {len(result_df)}")
+            self._record(query_string, started, rows=len(result_df), source=dataset.file_name,
+                         cached=self.last_query_cached, params=params)
             return result_df
-        except duckdb.Error as e:
+        except (duckdb.Error, QueryCancelledError, QueryLimitError) as e:
             print(f"QueryEngine Error: Error al ejecutar la consulta SQL: {e}")
-            # Puedes relanzar la excepción si quieres que el error se propague a la UI
+            self._record(query_string, started, source=dataset.file_name, error=e, params=params)
             raise
         except Exception as e:
             print(f"QueryEngine Error: Error inesperado en el motor de consultas: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def profile_query_on_dataframe(self, df: pd.DataFrame, query_string: str,
+                                   page_size: Optional[int] = None, params: Optional[dict] = None):
+        """
+        Ejecuta la consulta sobre el DataFrame con el profiling de DuckDB activado.
+
+        A diferencia de open_cursor_on_dataframe, la consulta se ejecuta entera (es
+        lo que mide el perfil) y su resultado se guarda como tabla de Arrow, que
+        luego se recorre por páginas sin volver a ejecutar la consulta.
+
+        Args:
+            df (pd.DataFrame): El DataFrame a consultar (como 'my_table').
+            query_string (str): La cadena de consulta SQL.
+            page_size (int, optional): Filas por página. Por defecto, DEFAULT_PAGE_SIZE.
+            params (dict, optional): Valores de los parámetros $nombre (se enlazan sin
+                               preparar la consulta: el perfil mide una ejecución completa).
+
+        Returns:
+            tuple: (QueryCursor, QueryProfile). El cursor debe cerrarse con close().
+        Raises:
+            ValueError: Si el DataFrame de entrada es None o está vacío.
+            duckdb.Error: Si hay un error en la ejecución de la consulta SQL.
+            QueryCancelledError: Si la consulta se cancela con cancel().
+            QueryLimitError: Si la consulta supera el tiempo o la memoria permitidos.
+        """
+        if df is None or df.empty:
+            raise ValueError("QueryEngine Error: No hay un DataFrame cargado o está vacío para consultar.")
+
+        self.register_dataframe(df)
+        self.refresh_stale_tables()
+        return self._profile(self._new_cursor(), query_string, page_size, source=self.TABLE_NAME,
+                             params=params)
+
+    def profile_query_on_dataset(self, dataset, query_string: str, page_size: Optional[int] = None,
+                                 params: Optional[dict] = None):
+        """
+        Igual que profile_query_on_dataframe, pero sobre un LazyDataset.
+
+        Returns:
+            tuple: (QueryCursor, QueryProfile). El cursor debe cerrarse con close().
+        Raises:
+            ValueError: Si no hay un dataset abierto.
+            duckdb.Error: Si hay un error en la ejecución de la consulta SQL.
+            QueryCancelledError: Si la consulta se cancela con cancel().
+            QueryLimitError: Si la consulta supera el tiempo o la memoria permitidos.
+        """
+        if dataset is None:
+            raise ValueError("QueryEngine Error: No hay un dataset abierto para consultar.")
+        self.register_dataset(dataset)
+        self.refresh_stale_tables()
+        return self._profile(self._new_cursor(), query_string, page_size, source=dataset.file_name,
+                             params=params)
+
+    def _profile(self, cursor, query_string: str, page_size: Optional[int], source: Optional[str] = None,
+                 params: Optional[dict] = None):
+        """Ejecuta la consulta con profiling en el cursor y retorna (QueryCursor, QueryProfile)."""
+        # DuckDB escribe el perfil en un archivo JSON al terminar cada sentencia
+        fd, profile_path = tempfile.mkstemp(prefix="duckdb-profile-", suffix=".json")
+        os.close(fd)
+        started = time.perf_counter()
+        try:
+            cursor.execute("SET enable_profiling = 'json'")
+            cursor.execute(f"SET profiling_output = {quote_literal(profile_path)}")
+            with self.guard.run(cursor):
+                result = cursor.execute(query_string, params) if params is not None else cursor.execute(query_string)
+                result_table = fetch_arrow_table(result)
+            wall_seconds = time.perf_counter() - started
+            # El perfil se lee antes de ejecutar otra sentencia, que lo sobrescribiría
+            profile = QueryProfile.from_file(query_string, wall_seconds, profile_path)
+            cursor.execute("PRAGMA disable_profiling")
+            cursor.register(self.PROFILED_RESULT_NAME, result_table)
+            query_cursor = QueryCursor(cursor, f"SELECT * FROM {self.PROFILED_RESULT_NAME}",
+                                       page_size or self.DEFAULT_PAGE_SIZE)
+            print(f"QueryEngine: Consulta SQL perfilada en {wall_seconds * 1000:,.1f} ms. "
+                  f"Filas resultantes: {result_table.num_rows}")
+            self._record(query_string, started, rows=result_table.num_rows, source=source, profiled=True,
+                         params=params)
+            return query_cursor, profile
+        except (duckdb.Error, QueryCancelledError, QueryLimitError) as e:
+            cursor.close()
+            print(f"QueryEngine Error: Error al ejecutar la consulta SQL: {e}")
+            self._record(query_string, started, source=source, profiled=True, error=e, params=params)
+            raise
+        except Exception as e:
+            cursor.close()
+            print(f"QueryEngine Error: Error inesperado en el motor de consultas: {e}")
+            raise
+        finally:
+            os.remove(profile_path)
@@ -0,0 +1,103 @@
+import threading
+from contextlib import contextmanager
+from typing import Optional
+import duckdb
+
+class QueryCancelledError(Exception):
+    """Se lanza cuando el usuario cancela una consulta en ejecución."""
+
+class QueryLimitError(Exception):
+    """Se lanza cuando DuckDB detiene una consulta por superar un límite de recursos."""
+
+class QueryTimeoutError(QueryLimitError):
+    """Se lanza cuando una consulta supera el tiempo máximo permitido."""
+
+class QueryMemoryError(QueryLimitError):
+    """Se lanza cuando una consulta supera el límite de memoria del motor."""
+
+class QueryGuard:
+    """
+    Vigila las consultas en ejecución de un QueryEngine: aplica el tiempo máximo
+    por consulta y permite cancelarlas desde otro hilo con interrupt() de DuckDB.
+
+    Cada ejecución se envuelve en run(connection); si DuckDB la interrumpe o se
+    queda sin memoria, el error se traduce a QueryCancelledError, QueryTimeoutError
+    o QueryMemoryError con un mensaje claro.
+    """
+
+    def __init__(self, timeout_seconds: Optional[float] = None, memory_limit: Optional[str] = None):
+        """
+        Args:
+            timeout_seconds (float, optional): Tiempo máximo de cada consulta, en segundos.
+                       None o 0 desactiva el límite.
+            memory_limit (str, optional): Límite de memoria configurado, solo para los mensajes.
+        """
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit = memory_limit
+        # Conexiones ejecutando una consulta -> motivo de interrupción (None si sigue en curso)
+        self._running = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def run(self, connection: duckdb.DuckDBPyConnection):
+        """
+        Contexto que registra la consulta que se ejecuta en la conexión mientras dura.
+
+        Raises:
+            QueryTimeoutError: Si la consulta superó timeout_seconds.
+            QueryCancelledError: Si se canceló con cancel().
+            QueryMemoryError: Si la consulta superó el límite de memoria.
+        """
+        entry = {"reason": None}
+        with self._lock:
+            self._running[id(connection)] = (connection, entry)
+        timer = None
+        if self.timeout_seconds:
+            timer = threading.Timer(self.timeout_seconds, self._interrupt, (connection, entry, "timeout"))
+            timer.daemon = True
+            timer.start()
+        try:
+            yield
+        except duckdb.InterruptException as e:
+            if entry["reason"] == "timeout":
+                raise QueryTimeoutError(
+                    f"La consulta superó el tiempo máximo de {self.timeout_seconds:g} s y se detuvo."
+                ) from e
+            raise QueryCancelledError("La consulta fue cancelada.") from e
+        except duckdb.OutOfMemoryException as e:
+            limit = f" ({self.memory_limit})" if self.memory_limit else ""
+            raise QueryMemoryError(
+                f"La consulta superó el límite de memoria del motor{limit} y se detuvo. "
+                f"Reduce el resultado (filtros, LIMIT) o evita productos cruzados."
+            ) from e
+        finally:
+            if timer is not None:
+                timer.cancel()
+            with self._lock:
+                self._running.pop(id(connection), None)
+
+    def _interrupt(self, connection: duckdb.DuckDBPyConnection, entry: dict, reason: str):
+        """Interrumpe la consulta de la conexión si sigue en curso."""
+        with self._lock:
+            if self._running.get(id(connection), (None, None))[1] is not entry:
+                return
+            entry["reason"] = reason
+        connection.interrupt()
+
+    def cancel(self) -> int:
+        """
+        Interrumpe todas las consultas en ejecución.
+
+        Returns:
+            int: Número de consultas interrumpidas.
+        """
+        with self._lock:
+            running = list(self._running.values())
+        for connection, entry in running:
+            self._interrupt(connection, entry, "cancel")
+        return len(running)
+
+    def is_running(self) -> bool:
+        """Indica si hay alguna consulta en ejecución."""
+        with self._lock:
+            return bool(self._running)
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+class QueryHistory:
+    """
+    Historial persistente de consultas SQL con su duración.
+
+    Cada ejecución se añade como una línea JSON a un archivo, de modo que el
+    historial sobrevive entre sesiones. Al listar las entradas se indica la
+    duración de la ejecución anterior de la misma consulta, para detectar
+    consultas que se han vuelto más lentas.
+    """
+
+    def __init__(self, history_path: Optional[str] = None, max_entries: int = 500):
+        """
+        Args:
+            history_path (str, optional): Archivo del historial. Por defecto,
+                       '~/.analizador_datos/query_history.jsonl'.
+            max_entries (int): Número máximo de entradas que se conservan.
+        """
+        self.history_path = history_path or os.path.join(
+            os.path.expanduser("~"), ".analizador_datos", "query_history.jsonl"
+        )
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        """Lee las entradas del archivo; las líneas dañadas se ignoran."""
+        if not os.path.isfile(self.history_path):
+            return []
+        entries = []
+        try:
+            with open(self.history_path, encoding="utf-8") as history_file:
+                for line in history_file:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except OSError as e:
+            print(f"QueryHistory Error: No se pudo leer el historial '{self.history_path}': {e}")
+        return entries[-self.max_entries:]
+
+    @staticmethod
+    def _normalize(query_string: str) -> str:
+        """Compacta los espacios para agrupar las ejecuciones de una misma consulta."""
+        return " ".join(query_string.split()).rstrip("; ")
+
+    def record(self, query_string: str, seconds: float, rows: Optional[int] = None,
+               status: str = "ok", source: Optional[str] = None, cached: bool = False,
+               profiled: bool = False, error: Optional[str] = None, params: Optional[dict] = None):
+        """
+        Añade una ejecución al historial y la guarda en disco.
+
+        Args:
+            query_string (str): La consulta ejecutada.
+            seconds (float): Duración de la ejecución.
+            rows (int, optional): Filas del resultado, si se conocen.
+            status (str): 'ok', 'error', 'cancelada' o 'límite'.
+            source (str, optional): Datos consultados (p. ej. el nombre del archivo).
+            cached (bool): Si el resultado salió de la caché de resultados.
+            profiled (bool): Si la consulta se ejecutó con profiling.
+            error (str, optional): Mensaje de error, si falló.
+            params (dict, optional): Valores de los parámetros $nombre de la consulta.
+
+        Returns:
+            dict: La entrada añadida.
+        """
+        entry = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "query": self._normalize(query_string),
+            "seconds": round(seconds, 6),
+            "rows": rows,
+            "status": status,
+            "source": source,
+            "cached": cached,
+            "profiled": profiled,
+        }
+        if params:
+            entry["params"] = {name: value if isinstance(value, (str, int, float, bool)) or value is None
+                               else str(value) for name, value in params.items()}
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._entries.append(entry)
+            trimmed = len(self._entries) > self.max_entries
+            if trimmed:
+                self._entries = self._entries[-self.max_entries:]
+            self._save(entry, rewrite=trimmed)
+        return entry
+
+    def _save(self, entry: dict, rewrite: bool):
+        """Añade la entrada al archivo, o lo reescribe entero si se recortó el historial."""
+        try:
+            os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+            if rewrite:
+                with open(self.history_path, "w", encoding="utf-8") as history_file:
+                    history_file.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in self._entries)
+            else:
+                with open(self.history_path, "a", encoding="utf-8") as history_file:
+                    history_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"QueryHistory Error: No se pudo guardar el historial '{self.history_path}': {e}")
+
+    def entries(self, limit: Optional[int] = None):
+        """
+        Retorna las entradas más recientes primero. Cada una incluye
+        'previous_seconds': la duración de la ejecución correcta anterior de la
+        misma consulta en el mismo modo (sin caché, con o sin profiling), o None
+        si es la primera.
+
+        Args:
+            limit (int, optional): Número máximo de entradas a retornar.
+
+        Returns:
+            list: Lista de diccionarios con las entradas.
+        """
+        with self._lock:
+            entries = list(self._entries)
+        last_seconds = {}
+        result = []
+        for entry in entries:
+            # Con profiling la consulta se ejecuta entera: solo se compara con su mismo modo
+            key = (entry["query"], bool(entry.get("profiled")))
+            item = dict(entry, previous_seconds=last_seconds.get(key))
+            if entry.get("status") == "ok" and not entry.get("cached"):
+                last_seconds[key] = entry["seconds"]
+            result.append(item)
+        result.reverse()
+        return result[:limit] if limit is not None else result
+
+    def clear(self):
+        """Borra el historial en memoria y en disco."""
+        with self._lock:
+            self._entries = []
+            try:
+                if os.path.isfile(self.history_path):
+                    os.remove(self.history_path)
+            except OSError as e:
+                print(f"QueryHistory Error: No se pudo borrar el historial '{self.history_path}': {e}")
@@ -0,0 +1,69 @@
+import json
+
+class QueryProfile:
+    """
+    Perfil de ejecución de una consulta, obtenido con el profiling de DuckDB
+    (salida JSON). Contiene el árbol de operadores aplanado, con el tiempo, las
+    filas y el tamaño del resultado de cada operador, y los totales de la consulta.
+    """
+
+    def __init__(self, query_string: str, wall_seconds: float, profile: dict):
+        """
+        Args:
+            query_string (str): La consulta perfilada.
+            wall_seconds (float): Tiempo total medido desde Python (incluye traer el resultado).
+            profile (dict): El JSON de profiling de DuckDB ya decodificado.
+        """
+        self.query_string = query_string
+        self.wall_seconds = wall_seconds
+        # Las claves cambian entre versiones de DuckDB ('latency' antes era 'timing')
+        self.latency_seconds = profile.get("latency", profile.get("timing"))
+        self.cpu_seconds = profile.get("cpu_time")
+        self.rows_returned = profile.get("rows_returned")
+        self.peak_memory_bytes = profile.get("system_peak_buffer_memory")
+        self.peak_temp_bytes = profile.get("system_peak_temp_dir_size")
+        self.operators = []
+        for child in profile.get("children", []):
+            self._collect(child, 0)
+
+    @classmethod
+    def from_file(cls, query_string: str, wall_seconds: float, path: str):
+        """Crea el perfil a partir del archivo JSON que escribe DuckDB."""
+        with open(path, encoding="utf-8") as profile_file:
+            return cls(query_string, wall_seconds, json.load(profile_file))
+
+    def _collect(self, node: dict, depth: int):
+        """Añade el operador y sus hijos (en preorden) a la lista de operadores."""
+        extra_info = node.get("extra_info") or {}
+        if isinstance(extra_info, dict):
+            details = "; ".join(
+                f"{key}: {', '.join(value) if isinstance(value, list) else value}"
+                for key, value in extra_info.items()
+            )
+        else:
+            details = str(extra_info).strip()
+        self.operators.append({
+            "depth": depth,
+            "name": node.get("operator_name") or node.get("operator_type") or node.get("name", "?"),
+            "seconds": node.get("operator_timing", node.get("timing", 0.0)) or 0.0,
+            "rows": node.get("operator_cardinality", node.get("cardinality", 0)) or 0,
+            "bytes": node.get("result_set_size"),
+            "details": details,
+        })
+        for child in node.get("children", []):
+            self._collect(child, depth + 1)
+
+    def slowest_operator(self):
+        """Retorna el operador con más tiempo propio, o None si no hay operadores."""
+        return max(self.operators, key=lambda op: op["seconds"], default=None)
+
+    def to_text(self) -> str:
+        """Representación en texto del árbol de operadores, con sangría por nivel."""
+        lines = [f"Tiempo total: {self.wall_seconds * 1000:,.1f} ms"]
+        if self.latency_seconds is not None:
+            lines[0] += f" (DuckDB: {self.latency_seconds * 1000:,.1f} ms)"
+        for op in self.operators:
+            size = f", {op['bytes'] / 1024 ** 2:,.1f} MB" if op["bytes"] is not None else ""
+            lines.append(f"{'  ' * op['depth']}{op['name']}: {op['seconds'] * 1000:,.1f} ms, "
+                         f"{op['rows']:,} filas{size}")
+        return "\n".join(lines)
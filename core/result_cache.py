@@ -0,0 +1,127 @@
+import re
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+class QueryResultCache:
+    """
+    Caché en memoria de resultados de consultas SQL, con desalojo por menor uso
+    reciente (LRU) y un presupuesto total en bytes.
+
+    Cada entrada se identifica por la versión de los datos consultados y el texto
+    normalizado de la consulta, de modo que al cargar otros datos las entradas
+    anteriores dejan de coincidir. Lleva la cuenta de aciertos y fallos.
+
+    Los resultados se guardan y se entregan como copias completas: quien los
+    recibe puede modificarlos sin alterar la entrada guardada.
+    """
+
+    # Cadenas entre comillas simples o dobles (se conservan tal cual al normalizar)
+    _QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+
+    # Funciones cuyo resultado cambia entre ejecuciones: esas consultas no se guardan
+    NON_DETERMINISTIC = ('random(', 'uuid(', 'gen_random_uuid(', 'now(', 'current_', 'today(', 'setseed(')
+
+    def __init__(self, max_total_bytes: int = 256 * 1024 ** 2):
+        """
+        Args:
+            max_total_bytes (int): Memoria máxima de los resultados guardados, en bytes.
+        """
+        self.max_total_bytes = max_total_bytes
+        self._entries = OrderedDict() # clave -> (DataFrame, bytes)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def normalize_query(self, query_string: str) -> str:
+        """
+        Normaliza una consulta para que variaciones de formato compartan entrada:
+        compacta los espacios y saltos de línea fuera de las cadenas entre comillas
+        y quita el punto y coma final.
+        """
+        parts = self._QUOTED.split(query_string)
+        normalized = "".join(
+            part if i % 2 else re.sub(r"\s+", " ", part) for i, part in enumerate(parts)
+        )
+        return normalized.strip().rstrip("; ")
+
+    def is_cacheable(self, query_string: str) -> bool:
+        """Indica si la consulta es de solo lectura y determinista (SELECT o WITH)."""
+        normalized = self.normalize_query(query_string).lower()
+        if not normalized.startswith(("select", "with", "from")):
+            return False
+        unquoted = "".join(self._QUOTED.split(normalized)[::2])
+        return not any(function in unquoted for function in self.NON_DETERMINISTIC)
+
+    def get(self, version, query_string: str):
+        """
+        Retorna el resultado guardado de la consulta para esa versión de los datos,
+        o None si no está. Cuenta un acierto o un fallo.
+
+        Args:
+            version: Identificador de la versión de los datos consultados.
+            query_string (str): La consulta SQL.
+
+        Returns:
+            pd.DataFrame: Una copia del resultado guardado, o None.
+        """
+        key = (version, self.normalize_query(query_string))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key) # Marca la entrada como usada recientemente
+            self.hits += 1
+        return entry[0].copy(deep=True)
+
+    def put(self, version, query_string: str, result_df: pd.DataFrame):
+        """
+        Guarda el resultado de una consulta y desaloja las entradas menos usadas
+        si se supera el presupuesto. Los resultados mayores que el presupuesto
+        completo no se guardan.
+
+        Returns:
+            bool: True si el resultado se guardó, False en caso contrario.
+        """
+        size = int(result_df.memory_usage(deep=True).sum())
+        if size > self.max_total_bytes:
+            return False
+        key = (version, self.normalize_query(query_string))
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result_df.copy(deep=True), size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_total_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return True
+
+    def clear(self):
+        """Elimina todas las entradas (los contadores se conservan)."""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self.total_bytes = 0
+        if removed:
+            print(f"QueryResultCache: {removed} resultado(s) eliminado(s) de la caché.")
+        return removed
+
+    def stats(self):
+        """
+        Retorna el estado de la caché.
+
+        Returns:
+            dict: 'hits', 'misses', 'hit_rate', 'entries' y 'bytes'.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+            }
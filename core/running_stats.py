@@ -0,0 +1,215 @@
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import numpy as np
+import pandas as pd
+from core.column_profile import ColumnProfile
+from core.column_sketch import ColumnSketch
+
+class RunningStats:
+    """
+    Agregados acumulados y combinables de las columnas de un DataFrame, que se
+    actualizan con cada trozo de filas nuevas sin volver a recorrer las anteriores:
+    por columna, el número de valores, los nulos, el mínimo y el máximo, y en las
+    numéricas la suma y la suma de cuadrados de las desviaciones a la media (M2,
+    combinada con la fórmula de Chan et al.; más estable que la suma de cuadrados
+    directa); además, un ColumnSketch con los valores distintos, los cuantiles y
+    los valores más frecuentes.
+
+    update() cuesta un tiempo proporcional a las filas nuevas y merge() combina los
+    agregados de trozos procesados por separado (ver from_frame).
+    """
+
+    def __init__(self, numeric: dict, seed: int = 0, **sketch_options):
+        """
+        Args:
+            numeric (dict): Columna -> si es numérica.
+            seed (int): Semilla de los bocetos.
+            **sketch_options: Parámetros de ColumnSketch (hll_precision, quantile_k...).
+        """
+        self.numeric = numeric
+        self.sketch_options = sketch_options
+        self.num_rows = 0
+        self.columns = {
+            name: {
+                "count": 0,
+                "nulls": 0,
+                "sum": 0.0,
+                "m2": 0.0,
+                "min": None,
+                "max": None,
+                "sketch": ColumnSketch(is_numeric, seed=seed, **sketch_options),
+            }
+            for name, is_numeric in numeric.items()
+        }
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, chunk_rows: int = 1_000_000,
+                   max_workers: Optional[int] = None, **sketch_options) -> "RunningStats":
+        """
+        Calcula los agregados de un DataFrame completo, por trozos de chunk_rows
+        filas resumidos en paralelo y combinados al terminar.
+
+        Args:
+            df (pd.DataFrame): Los datos.
+            chunk_rows (int): Filas por trozo.
+            max_workers (int, optional): Hilos. Por defecto, uno por núcleo.
+            **sketch_options: Parámetros de ColumnSketch.
+
+        Returns:
+            RunningStats: Los agregados.
+        """
+        numeric = {col: pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+                   for col in df.columns}
+
+        def summarize(start):
+            stats = cls(numeric, seed=start // chunk_rows, **sketch_options)
+            stats.update(df.iloc[start:start + chunk_rows])
+            return stats
+
+        result = cls(numeric, **sketch_options)
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+            for stats in executor.map(summarize, range(0, len(df), chunk_rows)):
+                result.merge(stats)
+        return result
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Añade un trozo de filas a los agregados. Solo se recorre el trozo.
+
+        Args:
+            chunk (pd.DataFrame): Las filas nuevas, con las mismas columnas.
+        """
+        self.num_rows += len(chunk)
+        for name, stats in self.columns.items():
+            values = chunk[name].dropna()
+            count = len(values)
+            stats["nulls"] += len(chunk) - count
+            if not count:
+                continue
+            if self.numeric[name]:
+                values = values.to_numpy(dtype="float64")
+                chunk_sum = float(values.sum())
+                chunk_m2 = float(np.square(values - chunk_sum / count).sum())
+                self._merge_moments(stats, count, chunk_sum, chunk_m2)
+                low, high = float(values.min()), float(values.max())
+            else:
+                stats["count"] += count
+                present = values
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    # Rango de las categorías presentes (min() exige categorías ordenadas)
+                    present = pd.Series(values.cat.categories[np.unique(values.cat.codes)])
+                try:
+                    low, high = present.min(), present.max()
+                except TypeError:
+                    # Valores de tipos no comparables entre sí: sin rango
+                    low = high = None
+            self._merge_range(stats, low, high)
+            stats["sketch"].update(values)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """
+        Combina los agregados de otro trozo de las mismas columnas en estos.
+
+        Returns:
+            RunningStats: Estos mismos agregados, ya combinados.
+        """
+        if set(other.columns) != set(self.columns):
+            raise ValueError("RunningStats Error: Solo se pueden combinar agregados de las mismas columnas.")
+        self.num_rows += other.num_rows
+        for name, stats in self.columns.items():
+            theirs = other.columns[name]
+            stats["nulls"] += theirs["nulls"]
+            if not theirs["count"]:
+                continue
+            if self.numeric[name]:
+                self._merge_moments(stats, theirs["count"], theirs["sum"], theirs["m2"])
+            else:
+                stats["count"] += theirs["count"]
+            self._merge_range(stats, theirs["min"], theirs["max"])
+            stats["sketch"].merge(theirs["sketch"])
+        return self
+
+    @staticmethod
+    def _merge_moments(stats: dict, count: int, total: float, m2: float):
+        """Suma un grupo (conteo, suma, M2) a los de la columna (fórmula de Chan et al.)."""
+        previous = stats["count"]
+        if previous:
+            delta = total / count - stats["sum"] / previous
+            m2 += delta * delta * previous * count / (previous + count)
+        stats["count"] = previous + count
+        stats["sum"] += total
+        stats["m2"] += m2
+
+    @staticmethod
+    def _merge_range(stats: dict, low, high):
+        """Amplía el mínimo y el máximo de la columna."""
+        if low is None:
+            return
+        stats["min"] = low if stats["min"] is None else min(stats["min"], low)
+        stats["max"] = high if stats["max"] is None else max(stats["max"], high)
+
+    def mean(self, column: str) -> Optional[float]:
+        """Media de una columna numérica (None si no tiene valores)."""
+        stats = self.columns[column]
+        return stats["sum"] / stats["count"] if self.numeric[column] and stats["count"] else None
+
+    def std(self, column: str) -> Optional[float]:
+        """Desviación típica muestral de una columna numérica (None con menos de dos valores)."""
+        stats = self.columns[column]
+        if not self.numeric[column] or stats["count"] < 2:
+            return None
+        return math.sqrt(stats["m2"] / (stats["count"] - 1))
+
+    def sketch(self, column: str) -> ColumnSketch:
+        """Boceto acumulado de una columna."""
+        return self.columns[column]["sketch"]
+
+    def to_profile(self, dtypes: dict, top_k: int = 5, seconds: float = 0.0) -> ColumnProfile:
+        """
+        Construye un ColumnProfile a partir de los agregados, sin recorrer los datos.
+        Los valores distintos, los cuartiles y los valores más frecuentes salen de
+        los bocetos; los cuartiles llevan su cota de error de rango.
+
+        Args:
+            dtypes (dict): Columna -> tipo a mostrar.
+            top_k (int): Valores más frecuentes a guardar por columna no numérica.
+            seconds (float): Duración a registrar en el perfil.
+
+        Returns:
+            ColumnProfile: El perfil.
+        """
+        columns = {}
+        for name, stats in self.columns.items():
+            numeric = self.numeric[name]
+            sketch = stats["sketch"]
+            has_values = stats["count"] > 0
+            columns[name] = {
+                "name": name,
+                "type": dtypes[name],
+                "numeric": numeric,
+                "count": stats["count"],
+                "nulls": stats["nulls"],
+                "distinct": sketch.distinct(),
+                "min": stats["min"],
+                "max": stats["max"],
+                "mean": self.mean(name),
+                "std": self.std(name),
+                "quantiles": sketch.quantiles(ColumnProfile.QUANTILES) if numeric and has_values else None,
+                "quantile_rank_error": sketch.error_bounds()["quantile_rank_error"] if numeric else None,
+                "top_values": [] if numeric else sketch.top_values(top_k)["value"].tolist(),
+            }
+        return ColumnProfile(self.num_rows, columns, dtypes, seconds)
+
+# Ejemplo de uso (solo para pruebas)
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    df_test = pd.DataFrame({"x": rng.normal(size=100_000), "g": rng.choice(list("abc"), 100_000)})
+    started = time.perf_counter()
+    running = RunningStats.from_frame(df_test.iloc[:90_000], chunk_rows=25_000)
+    running.update(df_test.iloc[90_000:])
+    print(f"Agregados en {time.perf_counter() - started:.2f} s")
+    print(running.to_profile({"x": "float64", "g": "object"}).describe())
+    print(df_test.describe())
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.column_sketch import sketch_frame
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(1)
+    n = 200_000
+    return pd.DataFrame({
+        "x": rng.lognormal(0, 1, n),
+        "k": rng.zipf(1.5, n) % 5_000,
+    })
+
+@pytest.fixture
+def sketches(df):
+    # Trozos pequeños y niveles cortos: se prueban las compactaciones y la combinación
+    return sketch_frame(df, chunk_rows=30_000, max_workers=2, quantile_k=256)
+
+def test_distinct_within_error_bound(df, sketches):
+    """Los distintos estimados quedan dentro de cuatro veces el error típico de HyperLogLog."""
+    for col in df.columns:
+        sketch = sketches[col]
+        assert sketch.count == len(df)
+        expected = df[col].nunique()
+        bound = 4 * sketch.error_bounds()["distinct_relative_error"]
+        assert abs(sketch.distinct() - expected) <= bound * expected
+
+def test_quantile_rank_within_error_bound(df, sketches):
+    """El rango real de cada cuantil estimado no se desvía más que la cota declarada."""
+    sketch = sketches["x"]
+    rank_error = sketch.error_bounds()["quantile_rank_error"]
+    assert 0 < rank_error < 0.05
+    values = np.sort(df["x"].to_numpy())
+    probabilities = [0.01, 0.25, 0.5, 0.75, 0.99]
+    for q, estimate in zip(probabilities, sketch.quantiles(probabilities)):
+        rank = np.searchsorted(values, estimate, side="right") / len(values)
+        assert abs(rank - q) <= rank_error + 1 / len(values)
+
+def test_top_value_counts_within_bounds(df, sketches):
+    """El conteo real de cada valor frecuente queda entre las cotas inferior y superior."""
+    top = sketches["k"].top_values(10)
+    counts = df["k"].value_counts()
+    assert top["value"].iloc[0] == counts.index[0]
+    for value, lower, upper in top[["value", "lower", "upper"]].itertuples(index=False):
+        assert lower <= counts[value] <= upper
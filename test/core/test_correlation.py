@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.correlation import correlation_matrix
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(2)
+    base = rng.normal(size=(3_000, 1))
+    values = base + rng.normal(scale=[0.1 * i for i in range(1, 11)], size=(3_000, 10))
+    df = pd.DataFrame(values, columns=[f"c{i}" for i in range(10)])
+    df["constante"] = 1.0
+    return df
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_matches_dataframe_corr(df, method):
+    """Sin nulos, coincide con DataFrame.corr() (bloques más pequeños que el número de columnas)."""
+    result = correlation_matrix(df.to_numpy(), method=method, block_size=4)
+    np.testing.assert_allclose(result, df.corr(method=method).to_numpy(), rtol=1e-10, atol=1e-12)
+
+def test_pairwise_nulls_match_dataframe_corr(df):
+    """Con nulos, cada par usa las filas en que ambas columnas tienen valor, como DataFrame.corr()."""
+    rng = np.random.default_rng(3)
+    df = df.mask(rng.random(df.shape) < 0.2)
+    df.loc[:2_990, "c9"] = np.nan  # pares con muy pocas filas en común
+    result = correlation_matrix(df.to_numpy(), block_size=4)
+    np.testing.assert_allclose(result, df.corr().to_numpy(), rtol=1e-8, atol=1e-10)
+
+def test_rejects_unknown_method(df):
+    """Un método no admitido da ValueError."""
+    with pytest.raises(ValueError):
+        correlation_matrix(df.to_numpy(), method="kendall")
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.column_profile import ColumnProfile
+from core.data_analyzer import DataAnalyzer
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "x": rng.normal(10, 3, 20_000),
+        "n": rng.integers(0, 50, 20_000),
+        "g": rng.choice(["a", "b", "c"], 20_000),
+    })
+
+def test_append_rows_matches_full_recompute(df):
+    """Las estadísticas tras append_rows coinciden con las de recalcular sobre todos los datos."""
+    analyzer = DataAnalyzer(approximate=True)
+    base, extra = df.iloc[:15_000].reset_index(drop=True), df.iloc[15_000:].reset_index(drop=True)
+    analyzer.get_profile(base)
+    combined = analyzer.append_rows(base, extra)
+    pd.testing.assert_frame_equal(combined, df)
+
+    incremental = analyzer.get_profile(combined)
+    full = DataAnalyzer(approximate=True).get_profile(df.copy())
+    for col in ("x", "n"):
+        got, expected = incremental.columns[col], full.columns[col]
+        assert got["count"] == expected["count"]
+        assert got["min"] == expected["min"] and got["max"] == expected["max"]
+        assert got["mean"] == pytest.approx(expected["mean"], rel=1e-12)
+        assert got["std"] == pytest.approx(expected["std"], rel=1e-9)
+        assert got["distinct"] == pytest.approx(df[col].nunique(), rel=0.05)
+    assert incremental.columns["g"]["count"] == len(df)
+    assert incremental.columns["g"]["top_values"][:3] == df["g"].value_counts().index[:3].tolist()
+
+def test_append_rows_profile_is_reused_in_exact_mode(df, monkeypatch):
+    """En modo exacto, el perfil tras append_rows sale de los agregados sin recorrer los datos combinados."""
+    analyzer = DataAnalyzer(approximate=False, parallel=False)
+    base = df.iloc[:10_000].reset_index(drop=True)
+    before = analyzer.get_profile(base)
+    combined = analyzer.append_rows(base, df.iloc[10_000:].reset_index(drop=True))
+
+    def full_profile(*_, **__):
+        raise AssertionError("Se recalculó el perfil completo")
+    monkeypatch.setattr(ColumnProfile, "from_dataframe", full_profile)
+    profile = analyzer.get_profile(combined)
+    monkeypatch.undo()
+
+    full = ColumnProfile.from_dataframe(df)
+    for col in df.columns:
+        got, expected = profile.columns[col], full.columns[col]
+        assert got["type"] == before.columns[col]["type"]
+        assert got["count"] == expected["count"] and got["nulls"] == expected["nulls"]
+        assert got["min"] == expected["min"] and got["max"] == expected["max"]
+    for col in ("x", "n"):
+        got, expected = profile.columns[col], full.columns[col]
+        assert got["mean"] == pytest.approx(expected["mean"], rel=1e-12)
+        assert got["std"] == pytest.approx(expected["std"], rel=1e-9)
+        # Cuartiles del boceto, marcados con su cota de error de rango
+        rank_error = got["quantile_rank_error"]
+        assert rank_error is not None
+        values = np.sort(df[col].to_numpy())
+        for q, estimate in zip(ColumnProfile.QUANTILES, got["quantiles"]):
+            low = np.searchsorted(values, estimate, side="left") / len(values)
+            high = np.searchsorted(values, estimate, side="right") / len(values)
+            assert low - rank_error - 1e-9 <= q <= high + rank_error + 1e-9
+    assert "quantile_rank_error" in profile.describe().attrs
+
+def test_parallel_profile_matches_serial(df):
+    """El perfil en paralelo da los mismos tipos y estadísticas que el de DuckDB, con distintos exactos."""
+    analyzer = DataAnalyzer(parallel=True, max_workers=2)
+    try:
+        parallel = analyzer._parallel_profile(df)
+    finally:
+        analyzer.close()
+    assert parallel is not None
+    serial = ColumnProfile.from_dataframe(df)
+    for col in df.columns:
+        got, expected = parallel.columns[col], serial.columns[col]
+        for key in ("name", "type", "numeric", "count", "nulls", "min", "max"):
+            assert got[key] == expected[key]
+        assert got["distinct"] == df[col].nunique()
+    for col in ("x", "n"):
+        got, expected = parallel.columns[col], serial.columns[col]
+        assert got["mean"] == pytest.approx(expected["mean"], rel=1e-12)
+        assert got["std"] == pytest.approx(expected["std"], rel=1e-9)
+        assert got["quantiles"] == pytest.approx(expected["quantiles"])
+    assert parallel.columns["g"]["top_values"][:3] == df["g"].value_counts().index[:3].tolist()
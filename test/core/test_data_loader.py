@@ -0,0 +1,99 @@
+import threading
+import pandas as pd
+import pytest
+from core.data_loader import DataLoader
+from core.load_job import LoadCancelledError
+
+CSV_ENGINES = ('pandas', 'pyarrow', 'duckdb')
+
+@pytest.fixture
+def csv_with_nulls(tmp_path):
+    """CSV con nulos en una columna numérica y en una de texto."""
+    path = tmp_path / "datos.csv"
+    pd.DataFrame({
+        "id": [1, 2, 3, 4, 5, 6],
+        "valor": [10.0, None, 30.0, 40.0, None, 60.0],
+        "grupo": ["a", "b", None, "a", "c", "b"],
+    }).to_csv(path, index=False)
+    return str(path)
+
+@pytest.mark.parametrize("filters", [
+    [("valor", "in", [])],
+    [("valor", "not in", [])],
+    [("grupo", "not in", []), ("id", ">", 1)],
+    [("valor", "in", [10.0, 60.0])],
+    [("valor", "not in", [10.0])],
+    [("grupo", "in", ["a", "c"])],
+    [("grupo", "!=", "a")],
+    [("valor", ">=", 30.0), ("grupo", "==", "a")],
+])
+def test_filters_agree_across_engines(csv_with_nulls, filters):
+    """Los mismos filtros dan las mismas filas con cada motor (nulos y listas vacías incluidos)."""
+    loader = DataLoader()
+    ids = {engine: sorted(loader._read_csv(csv_with_nulls, engine, filters=filters)["id"].tolist())
+           for engine in CSV_ENGINES}
+    assert ids["pyarrow"] == ids["pandas"]
+    assert ids["duckdb"] == ids["pandas"]
+
+def test_empty_membership_filters(csv_with_nulls):
+    """'in' con lista vacía no devuelve filas; 'not in' devuelve las que tienen valor."""
+    loader = DataLoader()
+    for engine in CSV_ENGINES:
+        assert loader._read_csv(csv_with_nulls, engine, filters=[("valor", "in", [])]).empty
+        kept = loader._read_csv(csv_with_nulls, engine, filters=[("valor", "not in", [])])
+        assert sorted(kept["id"].tolist()) == [1, 3, 4, 6]
+
+@pytest.mark.parametrize("engine", ["pandas", "pyarrow"])
+def test_rows_appended_during_load_are_read_once(tmp_path, engine):
+    """Las filas añadidas mientras se carga el archivo no entran en la carga, sino en load_appended_rows."""
+    path = tmp_path / "creciente.csv"
+    pd.DataFrame({"a": range(20_000), "b": [0.5] * 20_000}).to_csv(path, index=False)
+    appended = []
+
+    def append_once(*_):
+        if not appended:
+            appended.append(True)
+            with open(path, "a") as f:
+                f.writelines(f"{i},1.5\n" for i in range(20_000, 20_010))
+
+    loader = DataLoader(cache=None)
+    df, _ = loader.load_data_from_file(str(path), engine=engine, chunksize=2_000,
+                                       progress_callback=append_once)
+    new_rows, _ = loader.load_appended_rows(df)
+    assert appended
+    assert df["a"].tolist() == list(range(20_000))
+    assert new_rows["a"].tolist() == list(range(20_000, 20_010))
+
+@pytest.mark.parametrize("engine", ["pandas", "pyarrow"])
+def test_chunked_load_equals_one_shot(tmp_path, engine):
+    """Leer por lotes da el mismo DataFrame que leer el archivo de una vez."""
+    path = tmp_path / "lotes.csv"
+    pd.DataFrame({
+        "a": range(10_001),
+        "b": [i / 3 if i % 7 else None for i in range(10_001)],
+        "c": [f"v{i % 13}" if i % 5 else None for i in range(10_001)],
+    }).to_csv(path, index=False)
+    loader = DataLoader(cache=None)
+    one_shot, _ = loader.load_data_from_file(str(path), engine=engine)
+    chunked, _ = loader.load_data_from_file(str(path), engine=engine, chunksize=1_000)
+    pd.testing.assert_frame_equal(chunked, one_shot)
+    assert len(chunked) == 10_001
+
+def test_sources_keep_existing_origen_column(tmp_path):
+    """Si las partes ya tienen la columna de origen, sus datos se conservan y el origen va en otra."""
+    for name in ("a.csv", "b.csv"):
+        pd.DataFrame({"origen": ["x", "y"], "v": [1, 2]}).to_csv(tmp_path / name, index=False)
+    loader = DataLoader(cache=None)
+    df, _ = loader.load_data_from_sources(str(tmp_path), max_workers=2)
+    assert loader.last_sources_report["source_column"] == "origen_1"
+    assert df["origen"].tolist() == ["x", "y", "x", "y"]
+    assert df["origen_1"].tolist() == ["a.csv", "a.csv", "b.csv", "b.csv"]
+
+def test_cancelled_sources_load_does_not_wait_for_parts(tmp_path):
+    """Con la cancelación ya pedida, la carga se interrumpe sin esperar a que terminen las partes."""
+    for name in ("a.csv", "b.csv"):
+        pd.DataFrame({"v": range(10)}).to_csv(tmp_path / name, index=False)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    with pytest.raises(LoadCancelledError):
+        DataLoader(cache=None).load_data_from_sources(str(tmp_path), max_workers=2, cancel_event=cancel_event)
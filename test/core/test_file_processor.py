@@ -0,0 +1,14 @@
+import pandas as pd
+from core.data_loader import DataLoader
+from core.file_processor import FileProcessor
+
+def test_header_only_sheet_yields_empty_frame(tmp_path):
+    """Una hoja con encabezado y sin filas da un DataFrame vacío con esas columnas, como read_excel."""
+    path = tmp_path / "vacia.xlsx"
+    pd.DataFrame(columns=["a", "b"]).to_excel(path, index=False)
+    chunks = list(FileProcessor().iter_xlsx_chunks(str(path)))
+    assert len(chunks) == 1 and chunks[0].empty
+    assert list(chunks[0].columns) == ["a", "b"]
+
+    df, _ = DataLoader(cache=None).load_data_from_file(str(path), chunksize=10)
+    assert df.empty and list(df.columns) == list(pd.read_excel(path).columns)
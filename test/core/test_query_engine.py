@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+from core.query_engine import QueryEngine
+from core.result_cache import QueryResultCache
+
+QUERY = "SELECT grupo, CAST(SUM(valor) AS BIGINT) AS total FROM my_table GROUP BY grupo ORDER BY grupo"
+
+@pytest.fixture
+def engine():
+    engine = QueryEngine(result_cache=QueryResultCache())
+    yield engine
+    engine.close()
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"grupo": ["a", "b", "a", "c"], "valor": [1, 2, 3, 4]})
+
+def test_repeated_query_hits_cache(engine, df):
+    """La segunda ejecución de la misma consulta sale de la caché con el mismo resultado."""
+    first = engine.execute_query_on_dataframe(df, QUERY)
+    assert not engine.last_query_cached
+    second = engine.execute_query_on_dataframe(df, "  " + QUERY.replace(" ", "\n", 1) + ";")
+    assert engine.last_query_cached
+    pd.testing.assert_frame_equal(first, second)
+    assert engine.cache_stats()["hits"] == 1
+
+def test_cached_result_is_not_shared_with_callers(engine, df):
+    """Modificar un resultado recibido no altera la entrada guardada."""
+    first = engine.execute_query_on_dataframe(df, QUERY)
+    first.loc[0, "total"] = -1
+    second = engine.execute_query_on_dataframe(df, QUERY)
+    second["total"] *= 100
+    third = engine.execute_query_on_dataframe(df, QUERY)
+    assert engine.last_query_cached
+    assert third["total"].tolist() == [4, 2, 4]
+
+def test_register_dataframe_invalidates_cache(engine, df):
+    """Registrar otros datos descarta los resultados anteriores."""
+    engine.execute_query_on_dataframe(df, QUERY)
+    changed = df.assign(valor=df["valor"] * 10)
+    assert engine.register_dataframe(changed)
+    result = engine.execute_query_on_dataframe(changed, QUERY)
+    assert not engine.last_query_cached
+    assert result["total"].tolist() == [40, 20, 40]
+
+def test_cursor_pages_match_full_result(engine):
+    """Las páginas cubren el resultado completo, en orden y sin solaparse."""
+    df = pd.DataFrame({"a": range(2_503), "g": [i % 7 for i in range(2_503)]})
+    query = "SELECT a, g FROM my_table WHERE a % 2 = 0 ORDER BY g, a"
+    expected = engine.execute_query_on_dataframe(df, query)
+    cursor = engine.open_cursor_on_dataframe(df, query, page_size=100)
+    try:
+        # El total se conoce antes de leer ninguna página
+        assert cursor.total_rows == len(expected) == 1_252
+        assert cursor.num_pages == 13
+        pages = []
+        for index in range(cursor.num_pages):
+            pages.append(cursor.page(index))
+            assert len(cursor._batches) <= cursor.WINDOW_PAGES
+        assert [len(page) for page in pages] == [100] * 12 + [52]
+        assert cursor.page(13).empty
+        rows = pd.concat(pages, ignore_index=True)
+        assert rows["a"].tolist() == expected["a"].tolist()
+        # Volver a una página fuera de la ventana reabre el flujo y da las mismas filas
+        assert cursor.page(3)["a"].tolist() == pages[3]["a"].tolist()
+        assert cursor.page(4)["a"].tolist() == pages[4]["a"].tolist()
+        assert len(cursor._batches) <= cursor.WINDOW_PAGES
+    finally:
+        cursor.close()
+
+def test_cursor_without_count_finds_total_at_end(engine):
+    """Sin conteo previo, el total se fija al agotar el flujo."""
+    df = pd.DataFrame({"a": range(250)})
+    cursor = engine.open_cursor_on_dataframe(df, "SELECT a FROM my_table", page_size=100, count_rows=False)
+    try:
+        assert cursor.total_rows is None
+        assert [len(cursor.page(i)) for i in range(4)] == [100, 100, 50, 0]
+        assert cursor.total_rows == 250
+    finally:
+        cursor.close()
+
+def test_cursor_pages_with_parameters(engine):
+    """Con parámetros, el conteo y el salto entre páginas usan los mismos valores."""
+    df = pd.DataFrame({"a": range(1_000)})
+    query = "SELECT a FROM my_table WHERE a >= $minimo ORDER BY a"
+    cursor = engine.open_cursor_on_dataframe(df, query, page_size=100, params={"minimo": 500})
+    assert cursor.total_rows == 500
+    assert cursor.page(3)["a"].tolist() == list(range(800, 900))
+    assert cursor.page(0)["a"].tolist() == list(range(500, 600))
+
+def test_cursor_total_from_cache(engine, df):
+    """Tras recorrer el resultado una vez, el total se conoce al abrir la misma consulta."""
+    cursor = engine.open_cursor_on_dataframe(df, QUERY, page_size=2)
+    cursor.page(5)
+    cursor.close()
+    cursor = engine.open_cursor_on_dataframe(df, QUERY, page_size=2)
+    try:
+        assert cursor.total_cached
+        assert cursor.total_rows == 3
+        assert cursor.num_pages == 2
+    finally:
+        cursor.close()
+
+def test_close_removes_created_temp_directory(tmp_path):
+    """close() borra el directorio temporal que creó el motor, pero no uno que ya existía."""
+    created = tmp_path / "sesion"
+    engine = QueryEngine(temp_directory=str(created))
+    assert created.is_dir()
+    engine.close()
+    assert not created.exists()
+
+    existing = tmp_path / "compartido"
+    existing.mkdir()
+    engine = QueryEngine(temp_directory=str(existing))
+    engine.close()
+    assert existing.is_dir()